@@ -5,8 +5,16 @@ Add more tools to reach exactly 1,000 tools in the enhanced dataset.
 
 import json
 import logging
+import os
+import sys
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'code'))
+from popularity_scoring import default_scorer
+from tool_schema import CANONICAL_TOOL_SCHEMA, load_canonical_tools
+from tool_selection import select_top
+from url_canonical import extract_domain
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -15,10 +23,11 @@ def add_more_tools():
     """Add more high-quality AI tools to reach exactly 1,000."""
     
     # Load current enhanced dataset
-    with open('/workspace/data/aiverse_tools_enhanced.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data, records, report = load_canonical_tools('/workspace/data/aiverse_tools_enhanced.json')
+    if report.invalid_total:
+        logger.warning(f"Skipped invalid rows: {report.summary()}")
     
-    tools = data['tools']
+    tools = [CANONICAL_TOOL_SCHEMA.to_row(record) for record in records]
     current_count = len(tools)
     needed = 1000 - current_count
     
@@ -394,12 +403,8 @@ def add_more_tools():
     
     # Generate logo and screenshot URLs
     def generate_logo_url(link: str) -> str:
-        from urllib.parse import urlparse
-        try:
-            domain = urlparse(link).netloc.replace('www.', '')
-            return f"https://logo.clearbit.com/{domain}"
-        except:
-            return "https://logo.clearbit.com/default.com"
+        domain = extract_domain(link)
+        return f"https://logo.clearbit.com/{domain or 'default.com'}"
 
     def generate_screenshot_url(link: str) -> str:
         return f"https://image.thum.io/get/fullpage/{link}"
@@ -416,19 +421,22 @@ def add_more_tools():
             "logo_url": generate_logo_url(tool["link"]),
             "screenshot_url": generate_screenshot_url(tool["link"]),
             "featured": tool["featured"],
-            "popularity_score": tool["popularity_score"],
+            "curated_score": tool["popularity_score"],
             "source": "final_addition"
         }
         new_tools.append(new_tool)
     
+    # The new tools' hand-set scores are mapped onto the 0-10 scale; the
+    # existing tools keep the scores consolidation gave them
+    default_scorer().rescore(new_tools)
+    for tool in new_tools:
+        del tool['curated_score']
+    
     # Add new tools to existing ones
     all_tools = tools + new_tools
     
-    # Sort by popularity score (highest first)
-    all_tools.sort(key=lambda x: x.get('popularity_score', 0), reverse=True)
-    
-    # Take exactly 1000 tools
-    final_tools = all_tools[:1000]
+    # Take exactly the 1000 highest scoring tools, best first
+    final_tools = select_top(all_tools, 1000)
     
     # Reassign sequential IDs
     for i, tool in enumerate(final_tools, 1):
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Hashed n-gram category classifier trained from the curated datasets.
+
+The keyword rules (consolidate_ai_tools.CATEGORIZER) file every tool they
+have no rule for under 'Productivity'. CategoryClassifier learns the
+categories from tools that are already labelled instead:
+
+    features   word unigrams and bigrams of the description and word
+               unigrams of the name, each hashed to a 32-bit column with
+               crc32, so no vocabulary is stored and the same text always
+               lands in the same column
+    model      multinomial naive Bayes over the hashed counts: one
+               log-probability weight per (column, category), plus a log
+               prior per category
+
+A batch of tools becomes one sparse count matrix (CSR: row offsets plus
+column indices) that is scored with one sparse-by-dense product against the
+weight table, and each tool gets the category with the highest score.
+
+Weights are stored as fixed-point integers with every category packed into
+one Python int, 64 bits per category. Adding two packed rows adds all their
+categories at once, so a tool's scores are a single C-level sum() over its
+columns' packed rows, unpacked into an array with one to_bytes() call.
+
+The model file stores the per-category feature counts, not the weights, so
+it stays small and the weights are recomputed on load.
+
+Usage:
+    python category_classifier.py train [--output MODEL] [FILE ...]
+    python category_classifier.py evaluate [FILE ...]
+    python category_classifier.py benchmark [--count 1000000]
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import re
+import time
+import zlib
+from array import array
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+# Additive (Laplace) smoothing of the feature counts
+ALPHA = 1.0
+# Fixed-point weights: 1 / SCALE nats per unit, LANE_BYTES per category
+SCALE = 1 << 20
+LANE_BYTES = 8
+# Tools per sparse matrix in categorize_many
+BATCH_SIZE = 10000
+
+MODEL_FILE = '/workspace/data/category_model.json'
+TRAINING_FILES = [
+    '/workspace/data/aiverse_tools_final.json',
+    '/workspace/aiverse_tools_2024_2025_comprehensive.json',
+]
+
+_WORD = re.compile(r'[^\W_]+')
+
+
+def _text(value: Any) -> str:
+    return value.lower() if isinstance(value, str) else ''
+
+
+def tool_tokens(tool: Any) -> List[str]:
+    """Feature tokens of a tool: description unigrams and bigrams, name unigrams."""
+    words = _WORD.findall(_text(tool.get('description', '')))
+    tokens = words + list(map(' '.join, zip(words, words[1:])))
+    # Name words are kept apart from description words: "name:jasper"
+    tokens.extend(map('name:'.__add__, _WORD.findall(_text(tool.get('name', '')))))
+    return tokens
+
+
+class SparseMatrix:
+    """Row-compressed (CSR) count matrix: row i holds columns indices[indptr[i]:indptr[i + 1]].
+
+    A column repeated within a row counts once per repetition.
+    """
+
+    __slots__ = ('indptr', 'indices')
+
+    def __init__(self, indptr: array, indices: array):
+        self.indptr = indptr
+        self.indices = indices
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    def row(self, i: int) -> array:
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+
+def transform(tools: Iterable[Any]) -> SparseMatrix:
+    """Hashed n-gram count matrix of tools, one row per tool."""
+    indptr = array('L', [0])
+    indices = array('I')
+    for tool in tools:
+        indices.extend(map(zlib.crc32, map(str.encode, tool_tokens(tool))))
+        indptr.append(len(indices))
+    return SparseMatrix(indptr, indices)
+
+
+class _WeightRows(dict):
+    """Column -> packed weight row; columns never seen in training share one row."""
+
+    def __init__(self, rows: Dict[int, int], unseen: int):
+        super().__init__(rows)
+        self.unseen = unseen
+
+    def __missing__(self, column: int) -> int:
+        return self.unseen
+
+
+def _pack(weights: Sequence[float]) -> int:
+    """Fixed-point weights of every category in one int, category k at bits 64k.
+
+    Subtracting the smallest weight keeps every lane non-negative and does
+    not change which category scores highest.
+    """
+    low = min(weights)
+    packed = 0
+    for lane, weight in enumerate(weights):
+        packed |= round((weight - low) * SCALE) << (8 * LANE_BYTES * lane)
+    return packed
+
+
+class CategoryClassifier:
+    """Multinomial naive Bayes over hashed n-gram counts.
+
+    class_counts[c] is the number of training tools in category c, and
+    feature_counts maps a column to {category index: count}. Counts are
+    smoothed by alpha over the columns seen in training.
+    """
+
+    def __init__(self, classes: Sequence[str], class_counts: Sequence[int],
+                 feature_counts: Dict[int, Dict[int, int]], alpha: float = ALPHA):
+        self.classes = list(classes)
+        self.class_counts = list(class_counts)
+        self.feature_counts = feature_counts
+        self.alpha = alpha
+
+        documents = sum(self.class_counts)
+        self.priors = tuple(math.log(count / documents) for count in self.class_counts)
+        totals = [0] * len(self.classes)
+        for counts in feature_counts.values():
+            for class_index, count in counts.items():
+                totals[class_index] += count
+        vocabulary = len(feature_counts) + 1
+        denominators = [math.log(total + alpha * vocabulary) for total in totals]
+        self.unseen = tuple(math.log(alpha) - denominator for denominator in denominators)
+        self.weights = {
+            column: tuple(math.log(counts.get(class_index, 0) + alpha) - denominator
+                          for class_index, denominator in enumerate(denominators))
+            for column, counts in feature_counts.items()
+        }
+        self._packed = _WeightRows({column: _pack(row) for column, row in self.weights.items()},
+                                   _pack(self.unseen))
+        self._packed_priors = _pack(self.priors)
+
+    @classmethod
+    def train(cls, tools: Iterable[Any], alpha: float = ALPHA) -> 'CategoryClassifier':
+        """Fit on tools that carry a 'category' label."""
+        labelled = [tool for tool in tools if isinstance(tool.get('category'), str) and tool.get('category')]
+        classes = sorted({tool['category'] for tool in labelled})
+        class_index = {category: i for i, category in enumerate(classes)}
+        class_counts = [0] * len(classes)
+        feature_counts: Dict[int, Dict[int, int]] = {}
+
+        matrix = transform(labelled)
+        for i, tool in enumerate(labelled):
+            label = class_index[tool['category']]
+            class_counts[label] += 1
+            for column, count in Counter(matrix.row(i)).items():
+                counts = feature_counts.setdefault(column, {})
+                counts[label] = counts.get(label, 0) + count
+        return cls(classes, class_counts, feature_counts, alpha)
+
+    def save(self, file_path: str = MODEL_FILE):
+        model = {
+            'alpha': self.alpha,
+            'classes': self.classes,
+            'class_counts': self.class_counts,
+            'feature_counts': {str(column): {str(label): count for label, count in sorted(counts.items())}
+                               for column, counts in sorted(self.feature_counts.items())}
+        }
+        os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(model, f, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, file_path: str = MODEL_FILE) -> 'CategoryClassifier':
+        with open(file_path, 'r', encoding='utf-8') as f:
+            model = json.load(f)
+        feature_counts = {int(column): {int(label): count for label, count in counts.items()}
+                          for column, counts in model['feature_counts'].items()}
+        return cls(model['classes'], model['class_counts'], feature_counts, model['alpha'])
+
+    def scores(self, matrix: SparseMatrix) -> List[array]:
+        """Fixed-point category scores of every row: the product matrix x weights, plus the priors.
+
+        Scores are log-probabilities times SCALE, each shifted by a constant
+        that is the same for every category of a row.
+        """
+        weights = self._packed.__getitem__
+        priors = self._packed_priors
+        width = LANE_BYTES * len(self.classes)
+        indptr = matrix.indptr
+        indices = matrix.indices
+        return [array('Q', sum(map(weights, indices[indptr[i]:indptr[i + 1]]), priors).to_bytes(width, 'little'))
+                for i in range(len(matrix))]
+
+    def predict(self, matrix: SparseMatrix) -> List[str]:
+        classes = self.classes
+        return [classes[row.index(max(row))] for row in self.scores(matrix)]
+
+    def categorize(self, tool: Any) -> str:
+        """Category of one tool: a dict, or anything with a dict-style get()."""
+        return self.predict(transform([tool]))[0]
+
+    def categorize_many(self, tools: Iterable[Any], batch_size: int = BATCH_SIZE) -> List[str]:
+        """Categories of many tools, one sparse matrix product per batch_size tools."""
+        return list(self.iter_categories(tools, batch_size))
+
+    def iter_categories(self, tools: Iterable[Any], batch_size: int = BATCH_SIZE) -> Iterator[str]:
+        batch: List[Any] = []
+        for tool in tools:
+            batch.append(tool)
+            if len(batch) >= batch_size:
+                yield from self.predict(transform(batch))
+                batch = []
+        if batch:
+            yield from self.predict(transform(batch))
+
+
+def load_labelled_tools(file_paths: Iterable[str]) -> List[Dict[str, Any]]:
+    """Tools with a category from dataset files ({"tools": [...]} or a bare list)."""
+    tools = []
+    for file_path in file_paths:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        records = data.get('tools', []) if isinstance(data, dict) else data
+        tools.extend(tool for tool in records if isinstance(tool, dict) and tool.get('category'))
+    return tools
+
+
+def evaluate(tools: List[Dict[str, Any]], folds: int = 5, seed: int = 0) -> Tuple[float, float]:
+    """k-fold accuracy of the classifier, and of always predicting the most common category."""
+    shuffled = tools[:]
+    random.Random(seed).shuffle(shuffled)
+    correct = 0
+    for fold in range(folds):
+        test = shuffled[fold::folds]
+        train = [tool for i, tool in enumerate(shuffled) if i % folds != fold]
+        predicted = CategoryClassifier.train(train).categorize_many(test)
+        correct += sum(category == tool['category'] for category, tool in zip(predicted, test))
+    majority = Counter(tool['category'] for tool in tools).most_common(1)[0][1]
+    return correct / len(tools), majority / len(tools)
+
+
+def benchmark(classifier: CategoryClassifier, tools: List[Dict[str, Any]],
+              count: int, seed: int = 0) -> float:
+    """Seconds to categorize `count` tools generated from the words of `tools`."""
+    rng = random.Random(seed)
+    words = [word for tool in tools for word in _WORD.findall(_text(tool.get('description', '')))]
+    names = [tool.get('name', '') for tool in tools]
+    generated = [{'name': rng.choice(names), 'description': ' '.join(rng.choices(words, k=rng.randint(5, 30)))}
+                 for _ in range(count)]
+    start = time.perf_counter()
+    classifier.categorize_many(generated)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train and run the hashed n-gram category classifier")
+    commands = parser.add_subparsers(dest='command', required=True)
+    train_parser = commands.add_parser('train', help="fit on labelled datasets and save the model")
+    train_parser.add_argument('files', nargs='*', default=TRAINING_FILES)
+    train_parser.add_argument('--output', default=MODEL_FILE)
+    train_parser.add_argument('--alpha', type=float, default=ALPHA)
+    evaluate_parser = commands.add_parser('evaluate', help="5-fold cross-validated accuracy")
+    evaluate_parser.add_argument('files', nargs='*', default=TRAINING_FILES)
+    benchmark_parser = commands.add_parser('benchmark', help="categorize generated tools with a saved model")
+    benchmark_parser.add_argument('--model', default=MODEL_FILE)
+    benchmark_parser.add_argument('--count', type=int, default=1_000_000)
+    benchmark_parser.add_argument('files', nargs='*', default=TRAINING_FILES)
+    options = parser.parse_args()
+
+    tools = load_labelled_tools(options.files)
+    print(f"Loaded {len(tools)} labelled tools from {len(options.files)} files")
+
+    if options.command == 'train':
+        classifier = CategoryClassifier.train(tools, alpha=options.alpha)
+        classifier.save(options.output)
+        print(f"✓ {len(classifier.classes)} categories, {len(classifier.feature_counts)} feature columns")
+        print(f"✓ Saved to {options.output}")
+    elif options.command == 'evaluate':
+        accuracy, baseline = evaluate(tools)
+        print(f"Cross-validated accuracy: {accuracy:.1%} (most common category: {baseline:.1%})")
+    else:
+        classifier = CategoryClassifier.load(options.model)
+        seconds = benchmark(classifier, tools, options.count)
+        print(f"Categorized {options.count:,} tools in {seconds:.2f}s: {options.count / seconds:,.0f} tools/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Public-suffix-aware blocking key for record linkage.
+
+Comparing every tool with every other is O(n^2). Blocking groups records by
+a key that true matches share, and a matcher then only compares records
+within the same block. The exact dedup key of consolidate_ai_tools and the
+tool registry's identity index are name|block.
+
+The key is the registrable domain of the tool's link, as url_canonical
+computes it from the bundled public suffix list. So app.jasper.ai,
+www.jasper.ai/blog and jasper.ai share the block jasper.ai, while
+user1.github.io and user2.github.io stay apart. Code hosts hold unrelated
+projects under one domain, so their links are keyed by owner instead:
+github.com/<owner> and huggingface.co/<org>.
+
+BlockingIndex files record ids by block. A record without a link could
+belong to any block, so it stays comparable with every record;
+near_duplicate_pairs uses the index to skip name-only candidates from other
+blocks.
+"""
+
+from collections import defaultdict
+from typing import Dict, List
+
+from url_canonical import canonicalize
+
+# Hosts keyed by the owner in the link path, with the path sections that
+# come before the owner (huggingface.co/spaces/<org>/<space>)
+OWNER_PATH_HOSTS = {
+    'github.com': (),
+    'huggingface.co': ('spaces', 'datasets', 'models'),
+}
+
+
+def blocking_key(url: str) -> str:
+    """Block of a link: its registrable domain, or host/owner on code hosts."""
+    canonical = canonicalize(url)
+    sections = OWNER_PATH_HOSTS.get(canonical.host)
+    if sections is not None:
+        parts = [part for part in canonical.path.split('/') if part]
+        if parts and parts[0].lower() in sections:
+            parts = parts[1:]
+        if parts:
+            return f"{canonical.host}/{parts[0].lower()}"
+        return canonical.host
+    return canonical.domain
+
+
+class BlockingIndex:
+    """Record ids grouped by the blocking key of their link."""
+
+    def __init__(self):
+        self.blocks: Dict[str, List[int]] = defaultdict(list)
+        self.keys: Dict[int, str] = {}
+        self.unblocked: List[int] = []
+
+    @property
+    def size(self) -> int:
+        return len(self.keys)
+
+    def add(self, record_id: int, url: str) -> str:
+        """File a record under its link's block and return the block key ('' without a link)."""
+        key = blocking_key(url) if url else ''
+        if key:
+            self.blocks[key].append(record_id)
+        else:
+            self.unblocked.append(record_id)
+        self.keys[record_id] = key
+        return key
+
+    def candidates(self, url: str) -> List[int]:
+        """Ids comparable with a record linking to url: its block plus the link-less ones."""
+        key = blocking_key(url) if url else ''
+        if not key:
+            return list(self.keys)
+        return self.blocks.get(key, []) + self.unblocked
+
+    def comparable(self, first: int, second: int) -> bool:
+        """Whether two filed records share a block, or either has no link."""
+        first_key, second_key = self.keys[first], self.keys[second]
+        return not first_key or not second_key or first_key == second_key
+
+    @property
+    def comparisons(self) -> int:
+        """Pairs of comparable records."""
+        within = sum(len(ids) * (len(ids) - 1) // 2 for ids in self.blocks.values())
+        unblocked = len(self.unblocked)
+        return within + unblocked * (self.size - unblocked) + unblocked * (unblocked - 1) // 2
+
+    def summary(self) -> str:
+        all_pairs = self.size * (self.size - 1) // 2
+        reduction = all_pairs / self.comparisons if self.comparisons else float('inf')
+        largest = max((len(ids) for ids in self.blocks.values()), default=0)
+        return (f"{self.size} records in {len(self.blocks)} blocks (largest {largest}), "
+                f"{len(self.unblocked)} without a link: "
+                f"{self.comparisons} comparisons instead of {all_pairs} ({reduction:.0f}x fewer)")
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Union-find clustering of duplicate tools, merged into golden records.
+
+Keep-first deduplication compares each tool with the ones already kept, so
+when A matches B and B matches C but A does not match C, C survives, and
+every field of a dropped listing is lost even when it is better than the
+kept one's. Here duplicates are clustered instead:
+
+    keys    tools sharing a key (e.g. name|domain block) are united through
+            one dict lookup each, without enumerating pairs
+    pairs   candidate pairs, e.g. every confirmed near-duplicate pair
+            (near_duplicate_pairs), are united one by one
+
+Union-find is transitive, so one false pair merges two whole clusters.
+near_duplicate_pairs therefore only joins tools whose links are on
+different sites when both their names and their descriptions match, and
+files the tools in a domain_blocking.BlockingIndex so that tools in
+different blocks are never compared on their names alone.
+
+UnionFind keeps the parents in an array, with union by size and path
+halving, so a union or find costs near-constant amortized time and
+millions of pairs cluster in near-linear time. golden_records then folds
+every cluster into one record in a single pass over the tools, grouped by
+their root in a dict:
+
+    name, link      of the earliest listing (the first non-empty link)
+    description     the best scored by description_quality: the longest, up to
+                    a cap, with scraped links and markup counting against it
+    categories      union of the listings' categories, in first-seen order
+    sources         distinct sources, in first-seen order
+    first_seen      earliest of the listings' seen dates, when given
+
+Usage:
+    python duplicate_clusters.py [--count 1000000] [--pairs 3000000] [--blocking-count 5000]
+"""
+
+import argparse
+import random
+import re
+import time
+from array import array
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from domain_blocking import BlockingIndex
+from near_duplicates import (DIFFERENT_SITES, PLACEHOLDER_DESCRIPTIONS, NearDuplicateIndex, confirm_candidates,
+                             earlier_candidates, link_agreement, link_site, similarity)
+
+# Description length past which a longer description is no better
+DESCRIPTION_LENGTH_CAP = 300
+# Traces of scraping in a description: link targets, URLs, markdown links, escapes, table pipes
+_SCRAPED_MARKUP = re.compile(r'https?:|www\.|\]\(|\\[nt]|\|')
+
+
+class UnionFind:
+    """Disjoint sets over 0..count-1, with union by size and path halving."""
+
+    def __init__(self, count: int):
+        self.parent = array('l', range(count))
+        self.size = array('l', [1]) * count
+        self.unions = 0
+
+    def __len__(self) -> int:
+        return len(self.parent)
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            # Path halving: point every other node on the way at its grandparent
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, first: int, second: int) -> bool:
+        """Join the sets of two items; False if they were already one set."""
+        first, second = self.find(first), self.find(second)
+        if first == second:
+            return False
+        size = self.size
+        if size[first] < size[second]:
+            first, second = second, first
+        self.parent[second] = first
+        size[first] += size[second]
+        self.unions += 1
+        return True
+
+    def union_pairs(self, pairs: Iterable[Tuple[int, int]]) -> int:
+        """Join every pair's sets; returns the number of sets merged."""
+        before = self.unions
+        union = self.union
+        for first, second in pairs:
+            union(first, second)
+        return self.unions - before
+
+    def union_keys(self, keys: Iterable[Optional[Hashable]]) -> int:
+        """Join the items that share a key (keys[i] for item i; None joins nothing)."""
+        before = self.unions
+        first_with_key: Dict[Hashable, int] = {}
+        union = self.union
+        for item, key in enumerate(keys):
+            if key is None:
+                continue
+            first = first_with_key.setdefault(key, item)
+            if first != item:
+                union(first, item)
+        return self.unions - before
+
+    def labels(self) -> List[int]:
+        """Root of every item's set, in item order."""
+        find = self.find
+        return [find(item) for item in range(len(self.parent))]
+
+    @property
+    def clusters(self) -> int:
+        return len(self.parent) - self.unions
+
+
+def _get(tool: Any, key: str) -> Any:
+    value = tool.get(key, '')
+    return '' if value is None else value
+
+
+def _strong_match(index: NearDuplicateIndex, first: tuple, second: tuple) -> bool:
+    """Whether two tools' (name, description) signatures both pass their thresholds."""
+    return bool(index.description_threshold
+                and similarity(first[0], second[0]) >= index.name_threshold
+                and similarity(first[1], second[1]) >= index.description_threshold)
+
+
+def block_tools(tools: Sequence[Any]) -> BlockingIndex:
+    """BlockingIndex of tools by their position."""
+    blocking = BlockingIndex()
+    for position, tool in enumerate(tools):
+        blocking.add(position, str(_get(tool, 'link')))
+    return blocking
+
+
+def near_duplicate_pairs(tools: Sequence[Any], index: Optional[NearDuplicateIndex] = None,
+                         blocked: bool = True) -> Iterator[Tuple[int, int]]:
+    """Every (earlier, later) pair of near-duplicate tools, by name and description.
+
+    Unlike iter_near_unique, later tools are compared with every earlier
+    tool that shares an LSH bucket, not only the kept ones, so chains of
+    near-duplicates are all found. Pairs whose links are on different
+    sites are only kept when both the names and the descriptions match.
+    When blocked, a shared name bucket only makes tools in the same block
+    (or without a link) candidates.
+    """
+    if index is None:
+        index = NearDuplicateIndex()
+    signatures = [index.signatures(str(_get(tool, 'name')), str(_get(tool, 'description'))) for tool in tools]
+    sites = [link_site(str(_get(tool, 'link'))) for tool in tools]
+    candidates = earlier_candidates(index, (index.bands(*signature) for signature in signatures),
+                                    block_tools(tools) if blocked else None)
+    for position, matches in enumerate(confirm_candidates(index, signatures, candidates, range(len(tools)), sites)):
+        for earlier in matches:
+            if (link_agreement(sites[earlier], sites[position]) == DIFFERENT_SITES
+                    and not _strong_match(index, signatures[earlier], signatures[position])):
+                continue
+            yield earlier, position
+
+
+def cluster_labels(count: int, key_columns: Iterable[Iterable[Optional[Hashable]]] = (),
+                   pairs: Iterable[Tuple[int, int]] = ()) -> List[int]:
+    """Cluster label of each of count tools, joined by shared keys and by pairs."""
+    clusters = UnionFind(count)
+    for keys in key_columns:
+        clusters.union_keys(keys)
+    clusters.union_pairs(pairs)
+    return clusters.labels()
+
+
+def _categories(value: Any) -> List[str]:
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item).strip()]
+    value = str(value).strip()
+    return [value] if value else []
+
+
+def _description(value: Any) -> str:
+    value = str(value).strip()
+    return '' if value.lower() in PLACEHOLDER_DESCRIPTIONS else value
+
+
+def description_quality(description: str) -> float:
+    """Score of a real description for a golden record (0 for none).
+
+    Longer is better up to DESCRIPTION_LENGTH_CAP; every trace of scraped
+    markup divides the score, so "(https:theresanai.comchatgpt) - ChatGPT
+    by OpenAI is..." loses to the clean "ChatGPT by OpenAI is...", and an
+    all-lowercase copy loses to the original.
+    """
+    score = float(min(len(description), DESCRIPTION_LENGTH_CAP))
+    if description[:1].islower():
+        score *= 0.9
+    return score / (1 + 2 * len(_SCRAPED_MARKUP.findall(description)))
+
+
+def golden_records(tools: Sequence[Any], labels: Sequence[int],
+                   seen: Optional[Sequence[Optional[str]]] = None) -> List[Dict[str, Any]]:
+    """One merged record per cluster, in order of each cluster's earliest tool.
+
+    tools are dicts, or anything with a dict-style get(); labels come from
+    cluster_labels. seen, when given, holds each tool's ISO date, and the
+    earliest becomes the record's first_seen. Records keep every field of
+    their earliest tool, with the merged fields above on top, plus
+    cluster_size.
+    """
+    golden: Dict[int, Dict[str, Any]] = {}
+    quality: Dict[int, float] = {}
+    for position, (tool, label) in enumerate(zip(tools, labels)):
+        date = seen[position] if seen is not None else None
+        record = golden.get(label)
+        if record is None:
+            record = dict(tool) if isinstance(tool, dict) else {}
+            record.update(
+                name=_get(tool, 'name'),
+                description=_description(_get(tool, 'description')),
+                link=_get(tool, 'link'),
+                categories=_categories(_get(tool, 'category')),
+                sources=[_get(tool, 'source')] if _get(tool, 'source') else [],
+                cluster_size=1
+            )
+            if seen is not None:
+                record['first_seen'] = date
+            golden[label] = record
+            quality[label] = description_quality(record['description'])
+            continue
+
+        record['cluster_size'] += 1
+        if not record['link']:
+            record['link'] = _get(tool, 'link')
+        description = _description(_get(tool, 'description'))
+        score = description_quality(description)
+        if score > quality[label]:
+            record['description'] = description
+            quality[label] = score
+        for category in _categories(_get(tool, 'category')):
+            if category not in record['categories']:
+                record['categories'].append(category)
+        source = _get(tool, 'source')
+        if source and source not in record['sources']:
+            record['sources'].append(source)
+        if date and (not record.get('first_seen') or date < record['first_seen']):
+            record['first_seen'] = date
+
+    for record in golden.values():
+        record['category'] = record['categories'][0] if record['categories'] else ''
+    return list(golden.values())
+
+
+def benchmark(count: int, pairs: int, seed: int = 0) -> dict:
+    """Cluster `count` tools joined by `pairs` random pairs and merge the clusters."""
+    rng = random.Random(seed)
+    tools = [{"name": f"Tool {i}", "description": "x" * rng.randint(0, 80), "link": f"https://tool{i}.example.com",
+              "category": f"Category {i % 24}", "source": f"source{i % 5}"} for i in range(count)]
+    candidate_pairs = [(rng.randrange(count), rng.randrange(count)) for _ in range(pairs)]
+
+    start = time.perf_counter()
+    clusters = UnionFind(count)
+    clusters.union_pairs(candidate_pairs)
+    labels = clusters.labels()
+    cluster_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    records = golden_records(tools, labels)
+    merge_seconds = time.perf_counter() - start
+
+    return {
+        'count': count,
+        'pairs': pairs,
+        'clusters': clusters.clusters,
+        'cluster_seconds': cluster_seconds,
+        'merge_seconds': merge_seconds,
+        'matches': len(records) == clusters.clusters and sum(r['cluster_size'] for r in records) == count
+    }
+
+
+def blocking_benchmark(count: int, seed: int = 0) -> dict:
+    """Near-duplicate pairs of `count` tools with colliding names, with and without blocking."""
+    rng = random.Random(seed)
+    words = ['chat', 'writer', 'pixel', 'voice', 'code', 'studio', 'flow', 'mind', 'sense', 'lens']
+    vocabulary = [f"word{i}" for i in range(500)]
+    tools = []
+    for i in range(count):
+        site = rng.randrange(count // 4)
+        description = ' '.join(rng.choice(vocabulary) for _ in range(12))
+        if tools and rng.random() < 0.1:
+            # A relisting: the same tool on the same site, or copied to another one
+            original = tools[rng.randrange(len(tools))]
+            tools.append({"name": original['name'], "description": original['description'],
+                          "link": original['link'] if rng.random() < 0.5 else f"https://site{site}.com"})
+            continue
+        tools.append({"name": f"{rng.choice(words).title()} {rng.choice(words).title()}",
+                      "description": description, "link": f"https://app.site{site}.com/tool{i}"})
+
+    index = NearDuplicateIndex()
+    bands = [index.bands(*index.signatures(tool['name'], tool['description'])) for tool in tools]
+    blocking = block_tools(tools)
+    unblocked_comparisons = sum(len(candidates) for candidates in earlier_candidates(index, bands))
+    blocked_comparisons = sum(len(candidates) for candidates in earlier_candidates(index, bands, blocking))
+
+    start = time.perf_counter()
+    unblocked_pairs = set(near_duplicate_pairs(tools, index, blocked=False))
+    unblocked_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    blocked_pairs = set(near_duplicate_pairs(tools, index))
+    blocked_seconds = time.perf_counter() - start
+
+    return {
+        'count': count,
+        'blocks': blocking.summary(),
+        'unblocked_comparisons': unblocked_comparisons,
+        'blocked_comparisons': blocked_comparisons,
+        'unblocked_seconds': unblocked_seconds,
+        'blocked_seconds': blocked_seconds,
+        'pairs': len(blocked_pairs),
+        'fewer': blocked_comparisons < unblocked_comparisons,
+        'matches': blocked_pairs == unblocked_pairs
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark union-find clustering and golden-record merging")
+    parser.add_argument('--count', type=int, default=1_000_000, help="tools to cluster")
+    parser.add_argument('--pairs', type=int, default=3_000_000, help="random candidate pairs")
+    parser.add_argument('--blocking-count', type=int, default=5000, help="tools for the blocking benchmark")
+    options = parser.parse_args()
+
+    result = benchmark(options.count, options.pairs)
+    print(f"Clustered {result['count']:,} tools with {result['pairs']:,} candidate pairs "
+          f"into {result['clusters']:,} clusters")
+    print(f"  union-find: {result['cluster_seconds']:.2f}s "
+          f"({result['pairs'] / result['cluster_seconds']:,.0f} pairs/s)")
+    print(f"  golden records: {result['merge_seconds']:.2f}s")
+    print("✓ Every tool in exactly one golden record" if result['matches'] else "✗ Cluster sizes do not add up")
+
+    result = blocking_benchmark(options.blocking_count)
+    print(f"\nNear-duplicate pairs of {result['count']:,} tools: {result['blocks']}")
+    print(f"  LSH candidates: {result['unblocked_comparisons']:,} comparisons "
+          f"({result['unblocked_seconds']:.2f}s), {result['blocked_comparisons']:,} with blocking "
+          f"({result['blocked_seconds']:.2f}s)")
+    print("✓ Blocking compares fewer candidates" if result['fewer'] else "✗ Blocking did not reduce comparisons")
+    print(f"✓ Same {result['pairs']:,} near-duplicate pairs with blocking" if result['matches']
+          else "✗ Blocking lost near-duplicate pairs")
+
+
+if __name__ == "__main__":
+    main()
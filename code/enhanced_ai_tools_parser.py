@@ -8,71 +8,32 @@ import os
 import re
 from typing import List, Dict, Any
 
+from tool_tokenizer import recover_tool_records
+
 def extract_tools_with_categories(content: str, source: str) -> List[Dict[str, Any]]:
-    """Enhanced regex extraction with better category detection."""
+    """Recover tools from malformed JSON, keeping the section category.
+
+    A single tokenizer pass replaces the category-section and general regex
+    patterns; tools inherit the category of the section they appear in and
+    fall back to keyword inference when there is none.
+    """
     tools = []
     
-    # Pattern to extract category and tools sections
-    category_section_patterns = [
-        r'"category":\s*"([^"]+)"[^}]*?"tools":\s*\[(.*?)\]',
-        r'"category":\s*"([^"]+)"[^{]*?\{[^}]*?"name":\s*"([^"]+)"[^}]*?"description":\s*"([^"]*?)"[^}]*?"link":\s*"([^"]*?)"'
-    ]
-    
-    # First try to extract category sections
-    for pattern in category_section_patterns:
-        matches = re.findall(pattern, content, re.DOTALL)
-        for match in matches:
-            if len(match) >= 2:
-                category = match[0].strip()
-                if len(match) == 2:
-                    # Tools array format
-                    tools_content = match[1]
-                    # Extract individual tools from the array
-                    tool_matches = re.findall(r'"name":\s*"([^"]+)"[^}]*?"description":\s*"([^"]*?)"[^}]*?"link":\s*"([^"]*?)"', tools_content, re.DOTALL)
-                    for tool_match in tool_matches:
-                        if len(tool_match) >= 3 and tool_match[2].startswith('http'):
-                            tools.append({
-                                'name': tool_match[0].strip(),
-                                'description': tool_match[1].strip(),
-                                'link': tool_match[2].strip(),
-                                'category': category,
-                                'source': source
-                            })
-                else:
-                    # Direct tool format
-                    if len(match) >= 4 and match[3].startswith('http'):
-                        tools.append({
-                            'name': match[1].strip(),
-                            'description': match[2].strip(),
-                            'link': match[3].strip(),
-                            'category': category,
-                            'source': source
-                        })
-    
-    # If no category-specific tools found, try general patterns
-    if not tools:
-        general_patterns = [
-            r'"name":\s*"([^"]+)"[^}]*?"description":\s*"([^"]*?)"[^}]*?"link":\s*"([^"]*?)"[^}]*?"category":\s*"([^"]*?)"',
-            r'"name":\s*"([^"]+)"[^}]*?"description":\s*"([^"]*?)"[^}]*?"link":\s*"([^"]*?)"'
-        ]
+    for record in recover_tool_records(content, name_keys=('name',)):
+        name = str(record.get('name') or '').strip()
+        description = str(record.get('description') or '').strip()
+        link = str(record.get('link') or '').strip()
+        category = record.get('category')
+        category = category.strip() if isinstance(category, str) else ''
         
-        for pattern in general_patterns:
-            matches = re.findall(pattern, content, re.DOTALL)
-            for match in matches:
-                if len(match) >= 3:
-                    name = match[0].strip()
-                    description = match[1].strip()
-                    link = match[2].strip()
-                    category = match[3].strip() if len(match) > 3 else infer_category_from_description(name, description)
-                    
-                    if name and link and link.startswith('http'):
-                        tools.append({
-                            'name': name,
-                            'description': description,
-                            'link': link,
-                            'category': category or 'Unknown',
-                            'source': source
-                        })
+        if name and link and link.startswith('http'):
+            tools.append({
+                'name': name,
+                'description': description,
+                'link': link,
+                'category': category or infer_category_from_description(name, description) or 'Unknown',
+                'source': source
+            })
     
     return tools
 
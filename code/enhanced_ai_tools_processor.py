@@ -10,42 +10,20 @@ from typing import List, Dict, Any
 import requests
 from urllib.parse import urljoin, urlparse
 
+from json_repair import loads_with_repair
+
 def safe_json_loads(content: str) -> Dict[str, Any]:
-    """Safely parse JSON content with fallback strategies"""
+    """Safely parse JSON content, repairing defects where the decoder reports them"""
+    repairs = []
     try:
-        return json.loads(content)
+        data = loads_with_repair(content, repairs)
     except json.JSONDecodeError as e:
         print(f"JSON decode error: {e}")
-        
-        # Try to fix common issues
-        # Remove trailing commas
-        content = re.sub(r',(\s*[}\]])', r'\1', content)
-        
-        # Try parsing again
-        try:
-            return json.loads(content)
-        except json.JSONDecodeError:
-            # Extract the valid portion of JSON
-            try:
-                # Find the last complete object
-                bracket_count = 0
-                last_valid_pos = 0
-                
-                for i, char in enumerate(content):
-                    if char == '{':
-                        bracket_count += 1
-                    elif char == '}':
-                        bracket_count -= 1
-                        if bracket_count == 0:
-                            last_valid_pos = i + 1
-                
-                if last_valid_pos > 0:
-                    truncated_content = content[:last_valid_pos]
-                    return json.loads(truncated_content)
-            except:
-                pass
-                
         return {}
+    
+    if repairs:
+        print(f"Repaired {len(repairs)} JSON defects (first at char {repairs[0][0]}: {repairs[0][1]})")
+    return data
 
 def extract_tools_from_raw_content(raw_content: str) -> List[Dict[str, Any]]:
     """Extract tools from raw content using regex patterns"""
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+External merge sort for rankings larger than memory.
+
+ExternalSorter collects records with their sort key, sorts every run_size
+of them in memory and spills the run to a temporary file, then merges the
+runs k ways with heapq.merge when it is iterated. Only one run, plus one
+block per run being merged, is in memory at a time, so sorting works the
+same for a thousand records and for tens of millions.
+
+Run files are a sequence of blocks, each a length-prefixed, zlib
+compressed marshal dump of BLOCK_SIZE (key, record) pairs. Keys are stored
+with the records, so the merge never recomputes them, and the repeated
+field names and category values of tool dicts compress well. Records and
+keys must be marshal-able: dicts, lists, tuples, strings and numbers.
+
+The sort is stable, like list.sort: records with equal keys come out in
+the order they were added, reverse=True included. More than MAX_FANOUT
+runs are merged in passes, MAX_FANOUT at a time, to keep the number of
+open files bounded.
+
+Usage:
+    python external_sort.py [--count 1000000] [--run-size 100000]
+"""
+
+import argparse
+import heapq
+import json
+import marshal
+import os
+import random
+import shutil
+import struct
+import tempfile
+import time
+import zlib
+from itertools import islice
+from operator import itemgetter
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+# Records sorted in memory per run
+RUN_SIZE = 100_000
+# Runs merged at once
+MAX_FANOUT = 64
+# Records per compressed block of a run file
+BLOCK_SIZE = 1000
+COMPRESSION_LEVEL = 1
+# Records per file written by write_shards
+SHARD_SIZE = 10_000
+
+_BLOCK_LENGTH = struct.Struct('<I')
+_pair_key = itemgetter(0)
+
+
+def _identity(record: Any) -> Any:
+    return record
+
+
+def write_run(file_path: str, pairs: Iterable[Any]) -> int:
+    """Write (key, record) pairs to a run file; returns the number written."""
+    count = 0
+    with open(file_path, 'wb') as f:
+        iterator = iter(pairs)
+        while True:
+            block = list(islice(iterator, BLOCK_SIZE))
+            if not block:
+                return count
+            data = zlib.compress(marshal.dumps(block), COMPRESSION_LEVEL)
+            f.write(_BLOCK_LENGTH.pack(len(data)))
+            f.write(data)
+            count += len(block)
+
+
+def read_run(file_path: str) -> Iterator[Any]:
+    """The (key, record) pairs of a run file, one block in memory at a time."""
+    with open(file_path, 'rb') as f:
+        while True:
+            header = f.read(_BLOCK_LENGTH.size)
+            if not header:
+                return
+            (length,) = _BLOCK_LENGTH.unpack(header)
+            yield from marshal.loads(zlib.decompress(f.read(length)))
+
+
+class ExternalSorter:
+    """Sorts records by key with bounded memory, spilling sorted runs to disk.
+
+    Add records with add() or extend(), then iterate the sorter once to
+    get them in order; the run files are removed when the iteration ends
+    or close() is called. Records that fit in one run are sorted in memory
+    without touching the disk.
+    """
+
+    def __init__(self, key: Optional[Callable[[Any], Any]] = None, reverse: bool = False,
+                 run_size: int = RUN_SIZE, temp_dir: Optional[str] = None, fanout: int = MAX_FANOUT):
+        self.key = key or _identity
+        self.reverse = reverse
+        self.run_size = max(1, run_size)
+        self.temp_dir = temp_dir
+        self.fanout = max(2, fanout)
+        self.count = 0
+        self.runs_written = 0
+        self.bytes_written = 0
+        self._buffer: List[Any] = []
+        self._runs: List[str] = []
+        self._directory: Optional[str] = None
+
+    def __enter__(self) -> 'ExternalSorter':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add(self, record: Any):
+        self._buffer.append((self.key(record), record))
+        self.count += 1
+        if len(self._buffer) >= self.run_size:
+            self._spill()
+
+    def extend(self, records: Iterable[Any]):
+        iterator = iter(records)
+        while True:
+            chunk = list(islice(iterator, self.run_size - len(self._buffer)))
+            if not chunk:
+                return
+            self._buffer.extend(zip(map(self.key, chunk), chunk))
+            self.count += len(chunk)
+            if len(self._buffer) >= self.run_size:
+                self._spill()
+
+    def _new_run_path(self) -> str:
+        if self._directory is None:
+            self._directory = tempfile.mkdtemp(prefix='external_sort_', dir=self.temp_dir)
+        self.runs_written += 1
+        return os.path.join(self._directory, f"run_{self.runs_written:06d}.bin")
+
+    def _write(self, pairs: Iterable[Any]) -> str:
+        path = self._new_run_path()
+        write_run(path, pairs)
+        self.bytes_written += os.path.getsize(path)
+        return path
+
+    def _spill(self):
+        self._buffer.sort(key=_pair_key, reverse=self.reverse)
+        self._runs.append(self._write(self._buffer))
+        self._buffer = []
+
+    def _merge(self, paths: List[str]) -> Iterator[Any]:
+        # heapq.merge takes equal keys from earlier runs first, which keeps the sort stable
+        return heapq.merge(*map(read_run, paths), key=_pair_key, reverse=self.reverse)
+
+    def __iter__(self) -> Iterator[Any]:
+        try:
+            if not self._runs:
+                self._buffer.sort(key=_pair_key, reverse=self.reverse)
+                pairs, self._buffer = self._buffer, []
+                for _, record in pairs:
+                    yield record
+                return
+
+            if self._buffer:
+                self._spill()
+            runs = self._runs
+            while len(runs) > self.fanout:
+                # Merge consecutive groups, so earlier records stay in earlier runs
+                merged = []
+                for start in range(0, len(runs), self.fanout):
+                    group = runs[start:start + self.fanout]
+                    if len(group) == 1:
+                        merged.append(group[0])
+                        continue
+                    merged.append(self._write(self._merge(group)))
+                    for path in group:
+                        os.remove(path)
+                runs = self._runs = merged
+            for _, record in self._merge(runs):
+                yield record
+        finally:
+            self.close()
+
+    def close(self):
+        """Remove the run files."""
+        self._buffer = []
+        self._runs = []
+        if self._directory is not None:
+            shutil.rmtree(self._directory, ignore_errors=True)
+            self._directory = None
+
+
+def external_sort(records: Iterable[Any], key: Optional[Callable[[Any], Any]] = None, reverse: bool = False,
+                  run_size: int = RUN_SIZE, temp_dir: Optional[str] = None) -> Iterator[Any]:
+    """Records in key order, like sorted() but with memory bounded by run_size."""
+    sorter = ExternalSorter(key, reverse, run_size, temp_dir)
+    sorter.extend(records)
+    return iter(sorter)
+
+
+def write_shards(records: Iterable[Any], directory: str, shard_size: int = SHARD_SIZE,
+                 prefix: str = 'shard') -> List[str]:
+    """Write records, in order, as numbered JSON files of shard_size records each.
+
+    Each file is {"shard": n, "tools": [...]}; returns the paths written.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    iterator = iter(records)
+    while True:
+        shard = list(islice(iterator, shard_size))
+        if not shard:
+            return paths
+        path = os.path.join(directory, f"{prefix}_{len(paths) + 1:05d}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"shard": len(paths) + 1, "tools": shard}, f, indent=2, ensure_ascii=False)
+        paths.append(path)
+
+
+def benchmark(count: int, run_size: int = RUN_SIZE, seed: int = 0) -> dict:
+    """Rank `count` generated tool dicts by popularity, externally and in memory."""
+    rng = random.Random(seed)
+    categories = [f"Category {i}" for i in range(24)]
+    tools = [{
+        "name": f"Tool {i}",
+        "description": f"Generated tool number {i} for the sort benchmark",
+        "link": f"https://tool{i}.example.com",
+        "category": rng.choice(categories),
+        "popularity_score": round(rng.random() * 10, 1)
+    } for i in range(count)]
+    key = itemgetter('popularity_score')
+
+    start = time.perf_counter()
+    sorter = ExternalSorter(key, reverse=True, run_size=run_size)
+    sorter.extend(tools)
+    ranked = list(sorter)
+    external_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = sorted(tools, key=key, reverse=True)
+    memory_seconds = time.perf_counter() - start
+
+    return {
+        'count': count,
+        'runs': sorter.runs_written,
+        'bytes_per_record': sorter.bytes_written / count if count else 0.0,
+        'external_seconds': external_seconds,
+        'memory_seconds': memory_seconds,
+        'matches': ranked == expected
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the external merge sort against an in-memory sort")
+    parser.add_argument('--count', type=int, default=1_000_000, help="records to sort")
+    parser.add_argument('--run-size', type=int, default=RUN_SIZE, help="records sorted in memory per run")
+    options = parser.parse_args()
+
+    result = benchmark(options.count, options.run_size)
+    print(f"Sorted {result['count']:,} records in {result['runs']} run files "
+          f"({result['bytes_per_record']:.1f} bytes per record on disk)")
+    print(f"  external: {result['external_seconds']:.2f}s")
+    print(f"  in memory: {result['memory_seconds']:.2f}s")
+    print("✓ Same order as sorted()" if result['matches'] else "✗ Order differs from sorted()")
+
+
+if __name__ == "__main__":
+    main()
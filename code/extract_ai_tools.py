@@ -8,6 +8,11 @@ import json
 import re
 from typing import Dict, List, Any
 
+from duplicate_clusters import cluster_labels, golden_records
+
+# Keys golden_records adds on top of the tool fields
+GOLDEN_RECORD_KEYS = ('categories', 'sources', 'cluster_size')
+
 def normalize_free_version(value: Any) -> str:
     """Normalize free version indicators to consistent strings"""
     if value is True or value == "Yes" or value == "✅":
@@ -77,32 +82,22 @@ def extract_tools_from_source(file_path: str) -> List[Dict[str, Any]]:
     return tools
 
 def merge_and_deduplicate_tools(tools_list1: List[Dict], tools_list2: List[Dict]) -> List[Dict]:
-    """Merge two lists of tools and remove duplicates based on name"""
-    merged = {}
-    
-    # Add tools from first list
-    for tool in tools_list1:
-        key = tool['name'].lower().strip()
-        if key and key not in merged:
-            merged[key] = tool
-    
-    # Add tools from second list, preferring ones with more complete data
-    for tool in tools_list2:
-        key = tool['name'].lower().strip()
-        if key:
-            if key not in merged:
-                merged[key] = tool
-            else:
-                # If the new tool has a link and the existing one doesn't, replace it
-                existing = merged[key]
-                if tool.get('link') and not existing.get('link'):
-                    merged[key] = tool
-                # If the new tool has a better description, update it
-                elif (len(tool.get('description', '')) > len(existing.get('description', '')) and 
-                      tool.get('description') != '.'):
-                    merged[key] = tool
+    """Merge two lists of tools, folding tools with the same name into one record
     
-    return list(merged.values())
+    Same-name tools are clustered and merged field by field (see
+    duplicate_clusters): the first tool's name, category and other fields,
+    the first link, and the best description by description_quality (the
+    longest up to a cap, with scraped links and markup counting against
+    it). The records keep the tool fields of the output file; the merge
+    bookkeeping golden_records adds is dropped.
+    """
+    tools = [tool for tool in tools_list1 + tools_list2 if tool['name'].lower().strip()]
+    labels = cluster_labels(len(tools), [[tool['name'].lower().strip() for tool in tools]])
+    records = golden_records(tools, labels)
+    for record in records:
+        for key in GOLDEN_RECORD_KEYS:
+            record.pop(key, None)
+    return records
 
 def main():
     """Main extraction function"""
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Format-sniffing dispatcher for the scrapes in extract/.
+
+Reads the first SNIFF_BYTES of each file to tell the layouts apart and sends
+the file straight to the parser for its layout:
+
+    raw_content   {"raw_content": "<inner JSON>"} wrappers - streamed decoder
+    markdown      raw_content wrappers whose inner document holds a README in
+                  {"data": {"extracted_information": "<markdown>"}} - the
+                  streamed decoder, twice, into markdown_ingest
+    record_list   {"extracted_information": [...]} - streamed record parser
+    prose         {"extracted_information": "..."} plus optional sections
+    error         {"error_details": ...} stubs - skipped
+    empty         empty files, or small prose-only files with no data - skipped
+
+Error and empty stubs are skipped after the sniff, so a whole-directory run
+never makes a failed parse attempt.
+"""
+
+import argparse
+import json
+import os
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from markdown_ingest import iter_markdown_lines
+from parse_cache import ParseCache, add_cache_argument
+from raw_content_stream import CHUNK_SIZE, iter_inner_text, iter_raw_content, iter_text_lines, iter_tool_records
+from tool_tokenizer import RecordStreamParser
+
+SNIFF_BYTES = 1024
+
+FORMAT_RAW_CONTENT = 'raw_content'
+FORMAT_MARKDOWN = 'markdown'
+FORMAT_RECORD_LIST = 'record_list'
+FORMAT_PROSE = 'prose'
+FORMAT_ERROR = 'error'
+FORMAT_EMPTY = 'empty'
+FORMAT_UNKNOWN = 'unknown'
+
+SKIPPED_FORMATS = (FORMAT_ERROR, FORMAT_EMPTY)
+
+# First key of the top-level object and the first character of its value
+_FIRST_FIELD = re.compile(r'\{\s*"([^"\\]+)"\s*:\s*(\S)')
+# Inner document whose extracted_information string is a README: it has a
+# markdown header, table row or bullet line, unlike a summary sentence
+_INNER_TEXT = re.compile(r'"extracted_information"\s*:\s*"(?:[^"\\]|\\.)*?\\n(?:#{1,6} |\||[-*+] )')
+
+_LINK_KEYS = ('link', 'url', 'website_url', 'tool_url', 'website')
+
+
+def _classify_complete(head: str) -> str:
+    """Classify a document that fit entirely in the sniffed head."""
+    try:
+        data = json.loads(head)
+    except json.JSONDecodeError:
+        return ''
+    if data in ({}, [], None, ''):
+        return FORMAT_EMPTY
+    if isinstance(data, dict):
+        if data.get('error_details'):
+            return FORMAT_ERROR
+        if not any(value for value in data.values() if isinstance(value, (list, dict))):
+            # Only a prose summary, e.g. "The webpage returned a 404 error"
+            if not isinstance(data.get('raw_content'), str):
+                return FORMAT_EMPTY
+    return ''
+
+
+def _inner_is_text(file_path: str, sniff_bytes: int) -> bool:
+    """Whether a raw_content wrapper's inner document opens with a README in extracted_information."""
+    head = ''
+    for text in iter_raw_content(file_path, sniff_bytes):
+        head += text
+        if len(head) >= sniff_bytes:
+            break
+    return _INNER_TEXT.search(head[:sniff_bytes]) is not None
+
+
+def sniff_format(file_path: str, sniff_bytes: int = SNIFF_BYTES) -> str:
+    """Classify an extract file from its first sniff_bytes bytes."""
+    with open(file_path, 'rb') as f:
+        raw = f.read(sniff_bytes + 1)
+
+    complete = len(raw) <= sniff_bytes
+    head = raw[:sniff_bytes].decode('utf-8', errors='ignore').strip()
+    if not head:
+        return FORMAT_EMPTY
+
+    if complete:
+        verdict = _classify_complete(head)
+        if verdict:
+            return verdict
+
+    if head[0] == '[':
+        return FORMAT_RECORD_LIST
+    match = _FIRST_FIELD.match(head)
+    if not match:
+        return FORMAT_UNKNOWN
+
+    key, value_start = match.groups()
+    if key == 'raw_content':
+        return FORMAT_MARKDOWN if _inner_is_text(file_path, sniff_bytes) else FORMAT_RAW_CONTENT
+    if key == 'error_details':
+        return FORMAT_ERROR
+    if key == 'extracted_information':
+        return FORMAT_RECORD_LIST if value_start == '[' else FORMAT_PROSE
+    return FORMAT_UNKNOWN
+
+
+def iter_file_records(file_path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """Stream tool records out of a plain (not double-encoded) JSON file."""
+    parser = RecordStreamParser()
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for chunk in iter(lambda: f.read(chunk_size), ''):
+            yield from parser.feed(chunk)
+    yield from parser.feed('', final=True)
+
+
+def iter_markdown_records(file_path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """Stream tool records out of the README inside a raw_content wrapper file."""
+    return iter_markdown_lines(iter_text_lines(iter_inner_text(file_path, chunk_size=chunk_size)))
+
+
+PARSERS = {
+    FORMAT_RAW_CONTENT: iter_tool_records,
+    FORMAT_MARKDOWN: iter_markdown_records,
+    FORMAT_RECORD_LIST: iter_file_records,
+    FORMAT_PROSE: iter_file_records,
+    FORMAT_UNKNOWN: iter_file_records,
+}
+
+
+def normalize_record(record: Dict[str, Any], source: str) -> Dict[str, Any]:
+    """Map the per-site field names onto name/description/link/category."""
+    link = next((record[key] for key in _LINK_KEYS if isinstance(record.get(key), str) and record[key]), '')
+    category = record.get('category')
+    if not isinstance(category, str) or not category:
+        categories = record.get('categories')
+        category = categories[0] if isinstance(categories, list) and categories and isinstance(categories[0], str) else 'Unknown'
+    return {
+        'name': str(record.get('name') or record.get('tool_name') or '').strip(),
+        'description': str(record.get('description') or '').strip(),
+        'link': link.strip(),
+        'category': category.strip(),
+        'source': source
+    }
+
+
+def parse_file(file_path: str, file_format: str) -> List[Dict[str, Any]]:
+    """Run the parser for file_format and normalize its records."""
+    source = os.path.splitext(os.path.basename(file_path))[0]
+    records = [normalize_record(record, source) for record in PARSERS[file_format](file_path)]
+    return [record for record in records if record['name']]
+
+
+def dispatch_file(file_path: str, cache: Optional[ParseCache] = None) -> Tuple[str, List[Dict[str, Any]]]:
+    """Sniff a file and run the matching parser; stubs return no records."""
+    file_format = sniff_format(file_path)
+    if file_format in SKIPPED_FORMATS:
+        return file_format, []
+    if cache is None:
+        return file_format, parse_file(file_path, file_format)
+    return file_format, cache.load_or_parse(file_path, parse_file, file_format)
+
+
+def dispatch_directory(extract_dir: str, cache: Optional[ParseCache] = None) -> Dict[str, Dict[str, Any]]:
+    """Dispatch every JSON file in a directory, in name order."""
+    results = {}
+    for filename in sorted(os.listdir(extract_dir)):
+        if not filename.endswith('.json'):
+            continue
+        file_path = os.path.join(extract_dir, filename)
+        try:
+            file_format, tools = dispatch_file(file_path, cache)
+            results[filename] = {'format': file_format, 'tools': tools}
+        except Exception as e:
+            print(f"Error processing {filename}: {e}")
+            results[filename] = {'format': FORMAT_UNKNOWN, 'tools': [], 'error': str(e)}
+    return results
+
+
+def main():
+    """Dispatch the whole extract directory and save the recovered tools."""
+    parser = argparse.ArgumentParser(description="Parse extract/*.json by sniffed format")
+    add_cache_argument(parser)
+    options = parser.parse_args()
+
+    print("Dispatching extract files by sniffed format...")
+
+    extract_dir = '/workspace/extract'
+    cache = ParseCache(enabled=not options.no_cache)
+    results = dispatch_directory(extract_dir, cache)
+
+    all_tools = []
+    format_counts = {}
+    for filename, result in results.items():
+        file_format = result['format']
+        format_counts[file_format] = format_counts.get(file_format, 0) + 1
+        if file_format in SKIPPED_FORMATS:
+            print(f"  - {filename}: skipped ({file_format} stub)")
+            continue
+        all_tools.extend(result['tools'])
+        print(f"  ✓ {filename}: {len(result['tools'])} tools ({file_format})")
+
+    print(f"\nFiles by format: {format_counts}")
+    print(f"Total tools: {len(all_tools)}")
+    print(cache.summary())
+
+    os.makedirs('/workspace/data', exist_ok=True)
+    output_file = '/workspace/data/dispatched_extract_tools.json'
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            'metadata': {
+                'total_tools': len(all_tools),
+                'files_by_format': format_counts
+            },
+            'tools': all_tools
+        }, f, indent=2, ensure_ascii=False)
+    print(f"✓ Saved to {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,21 +5,20 @@ Fixed robust parser for AI tools extraction from GitHub repositories.
 
 import json
 import os
-import re
 from typing import List, Dict, Any
 
+from json_repair import loads_with_repair
+from near_duplicates import remove_near_duplicates
+from parallel_extraction import ExtractionTask, merge_results, parse_options, run_extraction
+from parse_cache import ParseCache
+from tool_schema import PARSED_TOOL_SCHEMA, ValidationReport
+
 def safe_json_parse(content: str) -> Dict[str, Any]:
-    """Safely parse JSON with proper error handling and cleaning."""
+    """Safely parse JSON, repairing trailing commas, bad escapes and truncation in place."""
     try:
-        # First, try direct JSON parsing
-        return json.loads(content)
+        return loads_with_repair(content)
     except json.JSONDecodeError:
-        try:
-            # Try fixing common issues like trailing commas
-            content = re.sub(r',(\s*[}\]])', r'\1', content)
-            return json.loads(content)
-        except:
-            return {}
+        return {}
 
 def extract_from_mahseema(file_path: str) -> List[Dict[str, Any]]:
     """Extract tools from mahseema/awesome-ai-tools repository."""
@@ -187,36 +186,19 @@ def extract_from_jamesmurdza(file_path: str) -> List[Dict[str, Any]]:
     
     return tools
 
-def validate_tool(tool: Dict[str, Any]) -> bool:
-    """Validate that a tool entry is properly formatted."""
-    # Check required fields
-    required_fields = ['name', 'description', 'link', 'category', 'source']
-    for field in required_fields:
-        if field not in tool:
-            return False
-    
-    # Check that name and link are not empty
-    if not tool['name'].strip() or not tool['link'].strip():
-        return False
-    
-    # Check that link is valid URL
-    if not tool['link'].startswith(('http://', 'https://')):
-        return False
-    
-    # Check for malformed JSON in name (common parsing error)
-    if tool['name'].strip().startswith(('{', '[')):
-        return False
-    
-    return True
+def validate_tool(tool: Dict[str, Any], report: ValidationReport = None) -> bool:
+    """Validate that a tool entry is properly formatted (see tool_schema),
+    counting a rejected one per source and reason in report."""
+    return PARSED_TOOL_SCHEMA.validate(tool, report, 'unknown')
 
-def clean_and_deduplicate(tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Clean and deduplicate tools list."""
+def clean_and_deduplicate(tools: List[Dict[str, Any]], report: ValidationReport = None) -> List[Dict[str, Any]]:
+    """Clean and deduplicate tools list, dropping exact and then near-duplicates."""
     cleaned_tools = []
     seen_keys = set()
     
     for tool in tools:
         # Validate tool
-        if not validate_tool(tool):
+        if not validate_tool(tool, report):
             continue
         
         # Create unique key for deduplication (name + link)
@@ -236,9 +218,9 @@ def clean_and_deduplicate(tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
             
             cleaned_tools.append(cleaned_tool)
     
-    return cleaned_tools
+    return remove_near_duplicates(cleaned_tools)
 
-def main():
+def main(workers: int = None, use_cache: bool = True):
     """Main function to extract and process all AI tools."""
     print("Starting fixed AI tools extraction...")
     
@@ -254,27 +236,26 @@ def main():
         ('jamesmurdza_awesome_ai_devtools.json', extract_from_jamesmurdza)
     ]
     
-    all_tools = []
-    
-    # Extract from each repository
+    # Extract from the repositories in parallel; results come back in list order
+    tasks = []
     for filename, extractor_func in extractors:
         file_path = os.path.join(extract_dir, filename)
-        print(f"Processing {filename}...")
-        
         if os.path.exists(file_path):
-            try:
-                tools = extractor_func(file_path)
-                all_tools.extend(tools)
-                print(f"  ✓ Extracted {len(tools)} tools from {filename}")
-            except Exception as e:
-                print(f"  ❌ Error processing {filename}: {e}")
+            tasks.append(ExtractionTask(filename, extractor_func, (file_path,)))
         else:
             print(f"  ❌ File not found: {filename}")
     
+    print(f"Processing {len(tasks)} repositories...")
+    cache = ParseCache(enabled=use_cache)
+    all_tools = merge_results(run_extraction(tasks, workers, cache))
+    print(cache.summary())
+    
     print(f"\nTotal tools before cleaning: {len(all_tools)}")
     
     # Clean and deduplicate
-    cleaned_tools = clean_and_deduplicate(all_tools)
+    report = ValidationReport()
+    cleaned_tools = clean_and_deduplicate(all_tools, report)
+    print(f"Validation: {report.summary()}")
     print(f"Total tools after cleaning: {len(cleaned_tools)}")
     
     # Create final data structure
@@ -350,4 +331,5 @@ def main():
         print(f"❌ Error saving/validating output: {e}")
 
 if __name__ == "__main__":
-    main()
+    options = parse_options()
+    main(options.workers, not options.no_cache)
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Repair engines for truncated and malformed scrape JSON.
+
+The scanner jumps from one structural token to the next with a compiled
+regex: whole strings, and whole `"key": "value"` pairs, are consumed in a
+single match, and commas, colons and scalars between tokens are skipped
+without visiting them in Python. It keeps a stack of open containers and
+remembers where the last complete element ended, so a truncated document is
+cut back to that element and the containers still open there are closed,
+instead of throwing away everything after the last balanced top-level brace.
+
+loads_with_repair handles defects in the middle of a document. It lets the
+C decoder parse as much as it can and, where JSONDecodeError reports a
+problem, re-enters only the container that failed, parsing its elements one
+at a time. The bad element is repaired in place (bad escape, trailing comma,
+stray quote, missing delimiter, truncation) and parsing resumes at the next
+element, so the cost grows with the number of defects rather than with
+defects times document size, and the text is never rewritten and re-parsed.
+"""
+
+import json
+import re
+from json.scanner import make_scanner
+from typing import Any, List, Optional, Tuple
+
+_STRING = r'"[^"\\]*(?:\\.[^"\\]*)*"'
+_SCALAR = r'(?:-?\d[\d.eE+\-]*|true|false|null)'
+
+# A string, optionally followed by ": <string>" (a complete pair), a bracket,
+# or a lone quote that opens a string cut off by truncation
+_TOKEN = re.compile(_STRING + r'(\s*:\s*' + _STRING + r')?|[{}\[\]]|"', re.DOTALL)
+
+# Complete scalar elements after the last token, e.g. `, "stars": 120,`
+_OBJECT_SCALAR = re.compile(r'\s*,?\s*' + _STRING + r'\s*:\s*' + _SCALAR + r'(?=\s*[,}])', re.DOTALL)
+_ARRAY_SCALAR = re.compile(r'\s*,?\s*' + _SCALAR + r'(?=\s*[,\]])')
+
+# Any escape; group 1 is set only for the ones JSON allows
+_ESCAPE = re.compile(r'\\(["\\/bfnrt]|u[0-9a-fA-F]{4})?')
+
+_CLOSERS = {'{': '}', '[': ']'}
+
+
+def _scan(text: str) -> Tuple[int, List[str]]:
+    """Walk the structure of text.
+
+    Returns the end of the last complete element and the containers that
+    are open at that point.
+    """
+    stack: List[str] = []
+    checkpoint = 0
+    checkpoint_depth = 0
+
+    for match in _TOKEN.finditer(text):
+        token = match.group()
+        first = token[0]
+
+        if first == '"':
+            if len(token) == 1:
+                # Truncated inside a string
+                break
+            if stack and stack[-1] == '{' and match.group(1) is None:
+                # A key whose value is a scalar or container - not complete yet
+                continue
+        elif first == '{' or first == '[':
+            stack.append(first)
+        else:
+            if stack:
+                stack.pop()
+            if not stack:
+                # Top-level value complete; ignore anything after it
+                return match.end(), []
+
+        if stack:
+            checkpoint, checkpoint_depth = match.end(), len(stack)
+
+    if checkpoint_depth:
+        # Keep scalar elements that are known to be complete
+        tail = _OBJECT_SCALAR if stack[checkpoint_depth - 1] == '{' else _ARRAY_SCALAR
+        match = tail.match(text, checkpoint)
+        while match:
+            checkpoint = match.end()
+            match = tail.match(text, checkpoint)
+
+    return checkpoint, stack[:checkpoint_depth]
+
+
+def _keep_valid_escape(match) -> str:
+    return match.group(0) if match.group(1) else ''
+
+
+def repair_truncated_json(text: str, fix_escapes: bool = True) -> str:
+    """Cut text back to its last complete element and close what is open.
+
+    With fix_escapes, invalid escape sequences (e.g. \\* or \\_ copied from
+    markdown) are dropped as well, since they make json.loads reject
+    otherwise valid scrapes.
+    """
+    text = text.strip()
+    end, open_containers = _scan(text)
+    if end == 0:
+        return text
+
+    repaired = text[:end]
+    if fix_escapes and '\\' in repaired:
+        # Backslashes only occur inside strings in JSON, so one pass suffices
+        repaired = _ESCAPE.sub(_keep_valid_escape, repaired)
+
+    return repaired + ''.join(_CLOSERS[char] for char in reversed(open_containers))
+
+
+_DECODER = json.JSONDecoder(strict=False)
+_scan_once = make_scanner(_DECODER)
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_STRING_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_DELIMITER = re.compile(r'[,\]}]')
+
+# Initial size of the text window the C decoder sees for one element
+_WINDOW = 4096
+
+
+class _NoValue(Exception):
+    """No value can be parsed at the given position."""
+
+
+def _decode_lenient(raw: str) -> str:
+    """Decode a string body, dropping the backslash of invalid escapes."""
+    try:
+        return _DECODER.decode('"' + raw + '"')
+    except ValueError:
+        try:
+            return _DECODER.decode('"' + _ESCAPE.sub(_keep_valid_escape, raw) + '"')
+        except ValueError:
+            return raw
+
+
+class _IncrementalRepairer:
+    """Parses text, repairing defects element by element where the decoder fails."""
+
+    def __init__(self, text: str, repairs: Optional[list]):
+        self.text = text
+        self.length = len(text)
+        self.repairs = repairs
+
+    def note(self, pos: int, kind: str):
+        if self.repairs is not None:
+            self.repairs.append((pos, kind))
+
+    def skip(self, pos: int) -> int:
+        return _WHITESPACE.match(self.text, pos).end()
+
+    def scan(self, pos: int) -> Optional[Tuple[Any, int]]:
+        """Run the C decoder on the value at pos; None if it is malformed.
+
+        Below the top level the decoder sees a window of text starting at
+        pos, doubled while a failure is caused by the window's end. Building
+        a JSONDecodeError counts the lines before the error, so this keeps
+        each failure proportional to the element instead of the document.
+        """
+        text = self.text
+        size = self.length if pos == 0 else _WINDOW
+        while True:
+            cut = pos + size < self.length
+            window = text[pos:pos + size] if pos or cut else text
+            try:
+                value, end = _scan_once(window, 0)
+                if not (cut and end == len(window)):
+                    return value, pos + end
+                # A number may continue past the window
+            except StopIteration as error:
+                if not cut or error.value < len(window) - 6:
+                    return None
+            except json.JSONDecodeError as error:
+                if not cut or (error.pos < len(window) - 6
+                               and not error.msg.startswith('Unterminated string')):
+                    return None
+            size *= 2
+
+    def value(self, pos: int, followers: Optional[str]) -> Tuple[Any, int]:
+        """Parse the value at pos with the C decoder, repairing only on failure."""
+        text = self.text
+        scanned = self.scan(pos)
+        if scanned is None:
+            first = text[pos]
+            if first == '{' or first == '[':
+                return self.container(pos)
+            if first == '"':
+                return self.string(pos, followers)
+            raise _NoValue(pos)
+
+        value, end = scanned
+        if followers is not None and text[pos] == '"':
+            follow = self.skip(end)
+            if follow < self.length and text[follow] not in followers:
+                # The string closed early on an unescaped quote
+                return self.string(pos, followers)
+        return value, end
+
+    def string(self, pos: int, followers: Optional[str]) -> Tuple[str, int]:
+        """Parse a string with bad escapes, stray quotes or no closing quote."""
+        text = self.text
+        pieces = []
+        start = end = pos + 1
+        while True:
+            match = _STRING_BODY.match(text, end)
+            if match is None:
+                self.note(pos, 'unterminated string')
+                pieces.append(_decode_lenient(text[start:]))
+                return '"'.join(pieces), self.length
+            end = match.end()
+            pieces.append(_decode_lenient(text[start:end - 1]))
+            follow = self.skip(end)
+            if (followers is None or follow >= self.length or text[follow] in followers
+                    or text[follow] in '"{['):
+                break
+            # An unescaped quote inside the string - keep it and read on
+            self.note(end - 1, 'stray quote')
+            start = end
+
+        if len(pieces) == 1 and text.find('\\', pos, end) != -1:
+            self.note(pos, 'invalid escape')
+        return '"'.join(pieces), end
+
+    def resync(self, pos: int) -> int:
+        """Skip unparseable input up to the next delimiter."""
+        self.note(pos, 'invalid value')
+        match = _DELIMITER.search(self.text, pos)
+        return match.start() if match else self.length
+
+    def container(self, pos: int) -> Tuple[Any, int]:
+        """Parse an object or array one element at a time."""
+        text = self.text
+        is_object = text[pos] == '{'
+        closer = '}' if is_object else ']'
+        followers = ',' + closer
+        result: Any = {} if is_object else []
+        expect_element = True
+        pos += 1
+
+        while True:
+            pos = self.skip(pos)
+            if pos >= self.length:
+                self.note(pos, 'truncated')
+                return result, pos
+            char = text[pos]
+
+            if char == closer or char == '}' or char == ']':
+                if char != closer:
+                    # Mismatched closer - close this container and let the parent consume it
+                    self.note(pos, 'missing ' + closer)
+                    return result, pos
+                if expect_element and result:
+                    self.note(pos, 'trailing comma')
+                return result, pos + 1
+            if char == ',':
+                if expect_element:
+                    self.note(pos, 'extra comma')
+                expect_element = True
+                pos += 1
+                continue
+            if not expect_element:
+                self.note(pos, 'missing comma')
+
+            try:
+                if is_object:
+                    if char != '"':
+                        raise _NoValue(pos)
+                    key, pos = self.string(pos, ':')
+                    pos = self.skip(pos)
+                    if pos < self.length and text[pos] == ':':
+                        pos = self.skip(pos + 1)
+                    else:
+                        self.note(pos, 'missing colon')
+                    if pos >= self.length:
+                        continue
+                    result[key], pos = self.value(pos, followers)
+                else:
+                    value, pos = self.value(pos, followers)
+                    result.append(value)
+            except _NoValue as error:
+                pos = self.resync(error.args[0])
+            expect_element = False
+
+
+def loads_with_repair(text: str, repairs: Optional[list] = None) -> Any:
+    """Parse JSON text, repairing defects at the positions the decoder reports.
+
+    Well-formed text is parsed by the C decoder in one call. If repairs is a
+    list, a (position, kind) entry is appended for every defect repaired.
+    Raises json.JSONDecodeError when no value can be recovered at all.
+    """
+    repairer = _IncrementalRepairer(text, repairs)
+    pos = repairer.skip(0)
+    try:
+        value, _ = repairer.value(pos, None)
+    except (_NoValue, IndexError):
+        raise json.JSONDecodeError('Expecting value', text, pos)
+    return value
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Multi-keyword categorizer built on an Aho-Corasick automaton.
+
+Categorizing a tool by testing each keyword with `keyword in text` costs one
+scan of the text per keyword, and substring tests hit inside words: 'ai'
+matches "detail", 'art' matches "smart", 'hr' matches "chrome".
+KeywordCategorizer compiles every keyword of every rule into one automaton
+and finds all of them in a single pass over a tool's fields, keeping only
+hits that are whole words:
+
+    - a hit must start and end at a word boundary: a non-alphanumeric
+      character, the end of a field, a lower-to-upper case change
+      ("ChatGPT", "OpenAI") or a letter-digit change ("GPT4")
+    - a trailing plural s is allowed ("chatbots", "images")
+
+Rules are tried in order, and the first rule with a hit in one of its fields
+gives the category. Fields are scanned in the order rules use them, and a
+tool whose category an earlier field already settled is not scanned again,
+so most tools with a known source category never have their description
+scanned. The automaton is a complete transition table over the
+keyword alphabet, upper case included, so the scan is one dict lookup per
+character with no failure-link walks and no lowercasing of the input.
+categorize_many() scans a whole batch of tools as one text.
+"""
+
+from bisect import bisect_right
+from collections import deque, namedtuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Tools scanned together by categorize_many
+BATCH_SIZE = 1000
+
+# Fields joined with this character can never produce a hit across fields
+_FIELD_SEPARATOR = '\n'
+
+CategoryRule = namedtuple('CategoryRule', ['keywords', 'category', 'fields'])
+
+
+def _field_text(value: Any) -> str:
+    if isinstance(value, list):
+        value = ', '.join(str(item) for item in value)
+    if not isinstance(value, str):
+        return ''
+    return value.replace(_FIELD_SEPARATOR, ' ')
+
+
+def _is_boundary(text: str, i: int) -> bool:
+    """Whether a word can start or end between text[i - 1] and text[i]."""
+    if i <= 0 or i >= len(text):
+        return True
+    before, after = text[i - 1], text[i]
+    if not before.isalnum() or not after.isalnum():
+        return True
+    if before.isdigit() != after.isdigit():
+        return True
+    if before.islower() and after.isupper():
+        return True
+    # "AIAssistant": a new capitalized word after an acronym
+    return before.isupper() and after.isupper() and i + 1 < len(text) and text[i + 1].islower()
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton reporting whole-word hits of lowercase keywords."""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = []
+        ids: Dict[str, int] = {}
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        for keyword in keywords:
+            keyword = keyword.lower().strip()
+            if not keyword or keyword in ids:
+                continue
+            ids[keyword] = len(self.keywords)
+            self.keywords.append(keyword)
+            state = 0
+            for ch in keyword:
+                next_state = goto[state].get(ch)
+                if next_state is None:
+                    next_state = goto[state][ch] = len(goto)
+                    goto.append({})
+                    outputs.append([])
+                state = next_state
+            outputs[state].append(ids[keyword])
+        self._ids = ids
+
+        # Complete the transition table breadth first: a missing edge goes
+        # where the failure state's edge goes, so scanning never backtracks
+        alphabet = {ch for keyword in self.keywords for ch in keyword}
+        delta: List[Dict[str, int]] = [{} for _ in goto]
+        delta[0] = dict(goto[0])
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            outputs[state].extend(outputs[fail[state]])
+            for ch in alphabet:
+                child = goto[state].get(ch)
+                if child is None:
+                    target = delta[fail[state]].get(ch, 0)
+                    if target:
+                        delta[state][ch] = target
+                else:
+                    delta[state][ch] = child
+                    fail[child] = delta[fail[state]].get(ch, 0)
+                    queue.append(child)
+
+        # Upper case input follows the same edges, so text is scanned as is
+        for table in delta:
+            for ch, target in list(table.items()):
+                upper = ch.upper()
+                if len(upper) == 1 and upper != ch:
+                    table[upper] = target
+
+        self._step = [table.get for table in delta]
+        self._outputs: List[Optional[Tuple[int, ...]]] = [tuple(ids_) if ids_ else None for ids_ in outputs]
+        self._lengths = [len(keyword) for keyword in self.keywords]
+        self._word_start = [keyword[0].isalnum() for keyword in self.keywords]
+        self._word_end = [keyword[-1].isalnum() for keyword in self.keywords]
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def keyword_id(self, keyword: str) -> int:
+        return self._ids[keyword.lower().strip()]
+
+    def _raw_hits(self, text: str) -> List[Tuple[int, Tuple[int, ...]]]:
+        step = self._step
+        outputs = self._outputs
+        hits = []
+        state = 0
+        end = 0
+        for ch in text:
+            end += 1
+            state = step[state](ch, 0)
+            if outputs[state] is not None:
+                hits.append((end, outputs[state]))
+        return hits
+
+    def iter_hits(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """(start, end, keyword id) of every whole-word keyword hit in text, by end position."""
+        lengths = self._lengths
+        word_start = self._word_start
+        word_end = self._word_end
+        for end, keyword_ids in self._raw_hits(text):
+            for keyword_id in keyword_ids:
+                start = end - lengths[keyword_id]
+                if word_start[keyword_id] and not _is_boundary(text, start):
+                    continue
+                if word_end[keyword_id] and not _is_boundary(text, end):
+                    # Allow a plural s: "chatbots", "APIs"
+                    if not (text[end] in 'sS' and _is_boundary(text, end + 1)):
+                        continue
+                yield start, end, keyword_id
+
+    def find_all(self, text: str) -> List[str]:
+        """Whole-word keywords found in text, in order of where they end."""
+        return [self.keywords[keyword_id] for _, _, keyword_id in self.iter_hits(text)]
+
+
+class KeywordCategorizer:
+    """Assigns the category of the first rule with a whole-word keyword hit.
+
+    rules are CategoryRule(keywords, category, fields) in priority order;
+    fields names the tool fields a rule's keywords count in. A field value
+    found verbatim (case-insensitively) in exact_categories maps straight
+    to its category before any keyword is considered. Tools no rule
+    matches get the default category, or are passed in one batch to
+    fallback.categorize_many() when a fallback categorizer is given.
+    """
+
+    def __init__(self, rules: Sequence[CategoryRule], default: str,
+                 exact_categories: Optional[Dict[str, str]] = None,
+                 exact_field: str = 'category', fallback: Any = None):
+        self.rules = list(rules)
+        self.default = default
+        self.fallback = fallback
+        self.exact_categories = {key.lower().strip(): value for key, value in (exact_categories or {}).items()}
+        self.exact_field = exact_field
+        self.fields: List[str] = []
+        for rule in self.rules:
+            for field in rule.fields:
+                if field not in self.fields:
+                    self.fields.append(field)
+        if exact_categories and exact_field not in self.fields:
+            self.fields.append(exact_field)
+
+        self.automaton = KeywordAutomaton(keyword for rule in self.rules for keyword in rule.keywords)
+        # Best (lowest) rule index per keyword and field, and the best any
+        # keyword can reach in each field
+        no_rule = len(self.rules)
+        self._priority = [[no_rule] * len(self.fields) for _ in range(len(self.automaton))]
+        self._field_floor = [no_rule] * len(self.fields)
+        for index, rule in enumerate(self.rules):
+            for field in rule.fields:
+                position = self.fields.index(field)
+                self._field_floor[position] = min(self._field_floor[position], index)
+            for keyword in rule.keywords:
+                if not keyword.strip():
+                    continue
+                priorities = self._priority[self.automaton.keyword_id(keyword)]
+                for field in rule.fields:
+                    position = self.fields.index(field)
+                    priorities[position] = min(priorities[position], index)
+
+    def _categorize_batch(self, tools: Sequence[Any]) -> List[str]:
+        no_rule = len(self.rules)
+        categories: List[Optional[str]] = [None] * len(tools)
+        best = [no_rule] * len(tools)
+        if self.exact_categories:
+            exact_field = self.exact_field
+            for index, tool in enumerate(tools):
+                exact = self.exact_categories.get(_field_text(tool.get(exact_field, '')).lower().strip())
+                if exact is not None:
+                    categories[index] = exact
+                    best[index] = -1
+
+        # Fields are scanned in rule order, each only for the tools an
+        # earlier field has not already settled on a better rule
+        priority = self._priority
+        for position, field in enumerate(self.fields):
+            floor = self._field_floor[position]
+            pending = [index for index in range(len(tools)) if best[index] > floor]
+            if not pending:
+                continue
+            parts: List[str] = []
+            starts: List[int] = []
+            offset = 0
+            for index in pending:
+                value = _field_text(tools[index].get(field, ''))
+                starts.append(offset)
+                parts.append(value)
+                offset += len(value) + 1
+            for start, _, keyword_id in self.automaton.iter_hits(_FIELD_SEPARATOR.join(parts)):
+                index = pending[bisect_right(starts, start) - 1]
+                rule_index = priority[keyword_id][position]
+                if rule_index < best[index]:
+                    best[index] = rule_index
+
+        for index, rule_index in enumerate(best):
+            if categories[index] is None and rule_index < no_rule:
+                categories[index] = self.rules[rule_index].category
+        unmatched = [index for index, category in enumerate(categories) if category is None]
+        if unmatched and self.fallback is not None:
+            fallback_categories = self.fallback.categorize_many([tools[index] for index in unmatched])
+            for index, category in zip(unmatched, fallback_categories):
+                categories[index] = category
+        return [self.default if category is None else category for category in categories]
+
+    def categorize(self, tool: Any) -> str:
+        """Category of one tool: a dict, or anything with a dict-style get()."""
+        return self._categorize_batch([tool])[0]
+
+    def substring_categorize(self, tool: Any) -> str:
+        """Category of one tool with keywords matched as plain substrings, as
+        the rules were applied before whole-word matching; for reviewing what
+        whole-word matching changes, not for categorizing."""
+        texts = {field: _field_text(tool.get(field, '')).lower() for field in self.fields}
+        exact = self.exact_categories.get(texts.get(self.exact_field, '').strip()) if self.exact_categories else None
+        if exact is not None:
+            return exact
+        for rule in self.rules:
+            if any(keyword.strip() and keyword.lower().strip() in texts[field]
+                   for keyword in rule.keywords for field in rule.fields):
+                return rule.category
+        return self.default
+
+    def categorize_many(self, tools: Iterable[Any], batch_size: int = BATCH_SIZE) -> List[str]:
+        """Categories of many tools, scanning batch_size tools per automaton pass."""
+        return list(self.iter_categories(tools, batch_size))
+
+    def iter_categories(self, tools: Iterable[Any], batch_size: int = BATCH_SIZE) -> Iterator[str]:
+        batch: List[Any] = []
+        for tool in tools:
+            batch.append(tool)
+            if len(batch) >= batch_size:
+                yield from self._categorize_batch(batch)
+                batch = []
+        if batch:
+            yield from self._categorize_batch(batch)
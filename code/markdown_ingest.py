@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Streaming markdown ingester for awesome-list READMEs.
+
+Reads a README one line at a time and yields tool records as soon as they
+are complete, so memory stays flat however long the file is. One pass
+handles all three layouts the scraped lists use:
+
+    ## / ### Category                    sets the category of what follows
+    | [Name](url) | ... | Description |  GFM table rows (\\| is a literal pipe)
+    - **Name**: description              bullet entries, also `- [Name](url) - ...`
+
+Bullet descriptions may continue on following lines; an entry is finished by
+a blank line, the next bullet, a header or a table. Table rows that were
+broken across lines are joined until they have a cell for every column.
+Fenced code blocks are skipped, as are links to in-page anchors (tables of
+contents).
+"""
+
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from parallel_extraction import ExtractionTask, run_extraction
+from parse_cache import ParseCache
+
+# Header levels that name a category; shallower headers clear it
+CATEGORY_LEVELS = (2, 3)
+
+# Header cells that name the tool, the link and the description column
+NAME_HEADERS = ('name', 'tool', 'tool_name', 'project')
+LINK_HEADERS = ('link', 'url', 'website')
+DESCRIPTION_HEADERS = ('description', 'desc')
+
+_HEADER = re.compile(r'(#{1,6})\s+(.*?)(?:\s+#+)?\s*$')
+_FENCE = re.compile(r'(`{3,}|~{3,})')
+_BULLET = re.compile(r'([-*+]|\d+[.)])\s+(.*)')
+_DELIMITER_ROW = re.compile(r'\|?\s*:?-+:?\s*(?:\|\s*:?-+:?\s*)*\|?')
+_CELL_SEPARATOR = re.compile(r'(?<!\\)\|')
+_LINK = re.compile(r'\[([^\[\]]*(?:\[[^\[\]]*\][^\[\]]*)*)\]\(\s*<?([^)\s>]*)>?(?:\s+"[^"]*")?\s*\)')
+_IMAGE = re.compile(r'!\[[^\[\]]*\]\([^)]*\)')
+_SEPARATOR = ' \t:-–—|'
+_RECORD_KEYS = ('name', 'link', 'description', 'category', 'line')
+
+
+def _header_key(cell: str) -> str:
+    """Normalize a table header cell, e.g. 'Offer Free Version' -> 'offer_free_version'."""
+    return re.sub(r'[^a-z0-9]+', '_', cell.lower()).strip('_')
+
+
+def split_table_row(line: str) -> List[str]:
+    """Split a GFM table row on unescaped pipes and unescape \\| in the cells."""
+    line = line.strip()
+    if line.startswith('|'):
+        line = line[1:]
+    if line.endswith('|') and not line.endswith('\\|'):
+        line = line[:-1]
+    return [cell.strip().replace('\\|', '|') for cell in _CELL_SEPARATOR.split(line)]
+
+
+def split_name_link(text: str) -> tuple:
+    """(name, link) from `[Name](url)`, `**Name**` or plain text."""
+    text = _IMAGE.sub('', text).strip()
+    match = _LINK.search(text)
+    if match and match.group(1).strip():
+        name, link = match.group(1), match.group(2)
+    else:
+        name, link = text, ''
+    return name.replace('**', '').replace('__', '').strip().strip('*_`:').strip(), link.strip()
+
+
+class MarkdownIngester:
+    """Line-at-a-time markdown state machine that yields tool records.
+
+    Records have name, link, description, category and line (1-based line of
+    the entry); table rows also carry their other columns under normalized
+    header names.
+    """
+
+    def __init__(self, category_levels: tuple = CATEGORY_LEVELS):
+        self.category_levels = category_levels
+        self.category: Optional[str] = None
+        self.line_number = 0
+        self._fence = ''
+        self._candidate_header: Optional[List[str]] = None
+        self._columns: Optional[List[str]] = None
+        self._name_column = self._link_column = self._description_column = None
+        self._extra_columns: List[str] = []
+        self._row = ''
+        self._row_line = 0
+        self._bullet: Optional[Dict[str, Any]] = None
+
+    def feed(self, line: str) -> Iterator[Dict[str, Any]]:
+        """Consume one line and yield any records it completes."""
+        self.line_number += 1
+        stripped = line.strip()
+
+        if self._fence:
+            if stripped.startswith(self._fence):
+                self._fence = ''
+            return
+        fence = _FENCE.match(stripped)
+        if fence:
+            yield from self._end_block()
+            self._fence = fence.group(1)
+            return
+
+        if not stripped:
+            yield from self._end_block()
+            return
+
+        header = _HEADER.match(stripped) if stripped.startswith('#') else None
+        if header:
+            yield from self._end_block()
+            level = len(header.group(1))
+            if level in self.category_levels:
+                self.category = header.group(2).strip()
+            elif level < min(self.category_levels):
+                self.category = None
+            return
+
+        if self._columns is not None:
+            if '|' in stripped or self._row:
+                if stripped.startswith('|') and self._row.endswith('|'):
+                    # A new row after a complete but short one
+                    yield from self._end_row()
+                if not self._row:
+                    self._row_line = self.line_number
+                self._row = f"{self._row} {stripped}" if self._row else stripped
+                cells = split_table_row(self._row)
+                if len(cells) >= len(self._columns):
+                    self._row = ''
+                    record = self._table_row(cells)
+                    if record:
+                        yield record
+                return
+            self._columns = None
+
+        if self._candidate_header is not None and _DELIMITER_ROW.fullmatch(stripped):
+            yield from self._end_bullet()
+            self._set_columns([_header_key(cell) for cell in self._candidate_header])
+            self._candidate_header = None
+            return
+        self._candidate_header = split_table_row(stripped) if '|' in stripped else None
+
+        bullet = _BULLET.match(stripped)
+        if bullet:
+            yield from self._end_bullet()
+            self._bullet = self._start_bullet(bullet.group(2))
+        elif self._bullet is not None and self._candidate_header is None:
+            # Continuation line of the current bullet's description
+            self._bullet['description'] = f"{self._bullet['description']} {stripped}".strip()
+
+    def close(self) -> Iterator[Dict[str, Any]]:
+        """Yield the record still pending at the end of the input."""
+        yield from self._end_block()
+
+    def _end_block(self) -> Iterator[Dict[str, Any]]:
+        yield from self._end_row()
+        self._columns = None
+        self._candidate_header = None
+        yield from self._end_bullet()
+
+    def _end_row(self) -> Iterator[Dict[str, Any]]:
+        if self._row:
+            record = self._table_row(split_table_row(self._row))
+            self._row = ''
+            if record:
+                yield record
+
+    def _end_bullet(self) -> Iterator[Dict[str, Any]]:
+        if self._bullet is not None:
+            record, self._bullet = self._bullet, None
+            yield record
+
+    def _record(self, name: str, link: str, description: str, line: int) -> Optional[Dict[str, Any]]:
+        if not name or link.startswith('#'):
+            return None
+        return {
+            'name': name,
+            'link': link,
+            'description': description,
+            'category': self.category,
+            'line': line
+        }
+
+    def _start_bullet(self, body: str) -> Optional[Dict[str, Any]]:
+        """Tool record for `**Name**: desc` or `[Name](url) - desc`, else None."""
+        if body.startswith(('**', '__')):
+            end = body.find(body[:2], 2)
+            if end == -1:
+                return None
+            name, link = split_name_link(body[2:end])
+            rest = body[end + 2:]
+        elif body.startswith('['):
+            match = _LINK.match(body)
+            if not match:
+                return None
+            name, link = split_name_link(match.group(0))
+            rest = body[match.end():]
+        else:
+            return None
+
+        if not link:
+            # `**Name** [site](url): ...` keeps the link after the bold name
+            match = _LINK.match(rest.lstrip())
+            if match:
+                link = match.group(2).strip()
+                rest = rest.lstrip()[match.end():]
+        return self._record(name, link, rest.strip(_SEPARATOR), self.line_number)
+
+    def _set_columns(self, columns: List[str]):
+        """Start a table and work out which columns hold the name, link and description."""
+        self._columns = columns
+        self._name_column = next((key for key in NAME_HEADERS if key in columns), None)
+        self._link_column = next((key for key in LINK_HEADERS if key in columns), None)
+        self._description_column = next((key for key in DESCRIPTION_HEADERS if key in columns), None)
+        roles = (self._name_column, self._link_column, self._description_column)
+        self._extra_columns = [key for key in columns if key and key not in roles and key not in _RECORD_KEYS]
+
+    def _table_row(self, cells: List[str]) -> Optional[Dict[str, Any]]:
+        if self._name_column is None:
+            return None
+
+        row = dict(zip(self._columns, cells))
+        name, link = split_name_link(row.get(self._name_column, ''))
+        site = row.get(self._link_column, '') if self._link_column else ''
+        if site:
+            link = split_name_link(site)[1] or site
+
+        description = row.get(self._description_column, '') if self._description_column else ''
+        record = self._record(name, link, description, self._row_line)
+        if record is not None:
+            for key in self._extra_columns:
+                record[key] = row.get(key, '')
+        return record
+
+
+def iter_markdown_lines(lines: Iterable[str], category_levels: tuple = CATEGORY_LEVELS) -> Iterator[Dict[str, Any]]:
+    """Yield tool records from an iterable of markdown lines."""
+    ingester = MarkdownIngester(category_levels)
+    for line in lines:
+        yield from ingester.feed(line)
+    yield from ingester.close()
+
+
+def iter_markdown_file(file_path: str, category_levels: tuple = CATEGORY_LEVELS) -> Iterator[Dict[str, Any]]:
+    """Stream tool records out of a markdown file, reading it line by line."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        yield from iter_markdown_lines(f, category_levels)
+
+
+def ingest_markdown_file(file_path: str, category_levels: tuple = CATEGORY_LEVELS) -> List[Dict[str, Any]]:
+    """All tool records of one markdown file (module-level, so it can run in a worker)."""
+    return list(iter_markdown_file(file_path, category_levels))
+
+
+def ingest_markdown_files(file_paths: List[str], workers: Optional[int] = None,
+                          cache: Optional[ParseCache] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """Ingest many READMEs across the extraction process pool.
+
+    Each worker streams its own file, so only the records, never the full
+    README texts, are held at once. Files that fail to parse are reported
+    and map to an empty list.
+    """
+    tasks = [ExtractionTask(file_path, ingest_markdown_file, (file_path,)) for file_path in file_paths]
+    records = {}
+    for result in run_extraction(tasks, workers, cache):
+        if result.error:
+            print(f"  ❌ {result.label}: {result.error.splitlines()[0]}")
+        records[result.label] = result.tools
+    return records
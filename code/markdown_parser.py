@@ -5,85 +5,35 @@ Parses the complete README.md file to extract all 1000+ AI tools
 """
 
 import json
-import re
 from datetime import datetime
 from typing import List, Dict, Any
 
+from markdown_ingest import iter_markdown_file, iter_markdown_lines
+from url_canonical import clean_url
+
 def parse_markdown_tables(content: str) -> List[Dict[str, Any]]:
     """Parse markdown content to extract all AI tools from tables"""
-    tools = []
-    lines = content.split('\n')
-    
-    current_category = None
-    in_table = False
-    header_processed = False
-    
-    for i, line in enumerate(lines):
-        line = line.strip()
-        
-        # Check for category headers (### Category Name)
-        if line.startswith('### '):
-            current_category = line[4:].strip()
-            in_table = False
-            header_processed = False
-            continue
-        
-        # Check for table headers
-        if '| Name |' in line and '| Title |' in line:
-            in_table = True
-            header_processed = False
-            continue
-        
-        # Skip table separator line
-        if in_table and not header_processed and '|---|' in line:
-            header_processed = True
-            continue
-        
-        # Process table rows
-        if in_table and header_processed and line.startswith('|') and line.endswith('|'):
-            tool = parse_table_row(line, current_category)
-            if tool:
-                tools.append(tool)
-    
-    return tools
+    return [to_tool(record) for record in iter_markdown_lines(content.splitlines()) if 'title' in record]
 
-def parse_table_row(line: str, category: str) -> Dict[str, Any]:
-    """Parse a single table row to extract tool information"""
-    # Split by | and clean up
-    parts = [part.strip() for part in line.split('|')[1:-1]]  # Remove empty first and last parts
-    
-    if len(parts) < 4:
-        return None
-    
-    name_part = parts[0].strip()
-    title = parts[1].strip()
-    description = parts[2].strip()
-    free_version_part = parts[3].strip()
-    
-    # Extract name and link from markdown link format [Name](URL)
-    name_match = re.search(r'\[([^\]]+)\]\(([^)]+)\)', name_part)
-    if name_match:
-        name = name_match.group(1).strip()
-        link = name_match.group(2).strip()
-    else:
-        # Fallback if not in link format
-        name = name_part
-        link = ""
-    
-    # Convert emoji to text for free version
-    free_version = convert_emoji_to_text(free_version_part)
+def parse_markdown_file(file_path: str) -> List[Dict[str, Any]]:
+    """Parse a README line by line without loading it whole"""
+    return [to_tool(record) for record in iter_markdown_file(file_path) if 'title' in record]
+
+def to_tool(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Map an ingested table row onto the dataset's tool format"""
+    description = record['description']
     
     # Clean description
     if description == "." or description == "":
         description = "No description available"
     
     return {
-        "name": name,
-        "title": title,
+        "name": record['name'],
+        "title": record.get('title', ''),
         "description": description,
-        "link": clean_url(link),
-        "category": category or "Uncategorized",
-        "free_version": free_version,
+        "link": clean_url(record['link']),
+        "category": record['category'] or "Uncategorized",
+        "free_version": convert_emoji_to_text(record.get('offer_free_version', '')),
         "source": "https://github.com/yousefebrahimi0/1000-AI-collection-tools"
     }
 
@@ -100,36 +50,17 @@ def convert_emoji_to_text(emoji_text: str) -> str:
     else:
         return "Unknown"
 
-def clean_url(url: str) -> str:
-    """Clean and normalize URLs"""
-    if not url:
-        return ""
-    
-    # Remove any extra spaces
-    url = url.strip()
-    
-    # Ensure URLs have proper protocol
-    if url.startswith('http://') or url.startswith('https://'):
-        return url
-    elif url.startswith('//'):
-        return f"https:{url}"
-    else:
-        return f"https://{url}"
-
 def create_comprehensive_dataset():
     """Create the comprehensive AI tools dataset from markdown"""
-    print("📖 Reading original README.md file...")
+    print("📖 Streaming original README.md file...")
+    print("🔍 Parsing markdown tables...")
     
     try:
-        with open('/workspace/download/original_readme.md', 'r', encoding='utf-8') as f:
-            content = f.read()
+        tools_list = parse_markdown_file('/workspace/download/original_readme.md')
     except Exception as e:
         print(f"❌ Error reading file: {e}")
         return
     
-    print("🔍 Parsing markdown tables...")
-    tools_list = parse_markdown_tables(content)
-    
     print(f"✅ Successfully parsed {len(tools_list)} tools!")
     
     # Create comprehensive dataset structure
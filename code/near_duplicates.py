@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""
+MinHash/LSH near-duplicate detection for tool records.
+
+The exact dedup keys (name|domain, the squashed lowercase name, name|link)
+let "Jasper", "Jasper AI" and "jasper.ai" from different directories all
+through. NearDuplicateIndex compares tools on two shingle sets instead:
+
+    name          character trigrams of the name, lowercased, with
+                  punctuation and filler tokens ("ai", "app", ".io") removed
+    description   word bigrams of the description
+
+Each set is reduced to a fixed-size MinHash signature, and signatures are
+banded into an LSH index, so looking up a tool only touches the buckets it
+hashes to, never the whole pool. Candidates from the buckets are confirmed
+on their estimated Jaccard similarity against the configured thresholds.
+
+Placeholder descriptions ("No description available") and ones too short
+to tell tools apart get no description signature, so they never match.
+Filler removal makes "LLM App" and "LLM" the same name, so a match on the
+name alone also needs the links to agree: the same host, or the same
+registrable domain and an identical name ("Artflow" on app.artflow.ai and
+artflow.ai, but not "Amazon Q Developer CLI" on docs.aws.amazon.com and
+"Amazon Q Developer" on aws.amazon.com). A link-less tool agrees with any;
+a description match needs no link agreement.
+
+Signatures use one-permutation hashing with optimal densification: every
+shingle is hashed once and kept as the minimum of the bin it falls in, and
+empty bins borrow from the next non-empty bin in a fixed probe order. That
+estimates Jaccard similarity like k independent hash functions would, at
+the cost of one hash per shingle instead of k.
+"""
+
+import hashlib
+import random
+import re
+import sys
+from array import array
+from functools import lru_cache
+from operator import eq
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from domain_blocking import BlockingIndex
+from url_canonical import canonicalize
+
+NUM_PERM = 64
+NAME_THRESHOLD = 0.8
+DESCRIPTION_THRESHOLD = 0.7
+# Name similarity still required when the descriptions match
+MIN_NAME_SIMILARITY = 0.5
+# Descriptions with fewer words are too generic to match on ("Now available in beta.")
+MIN_DESCRIPTION_WORDS = 5
+
+# How far the links of two tools agree (see link_agreement)
+DIFFERENT_SITES, SAME_DOMAIN, SAME_HOST = 0, 1, 2
+
+# Descriptions that carry no information
+PLACEHOLDER_DESCRIPTIONS = frozenset(('', '.', '-', 'n/a', 'none', 'no description available'))
+
+# Tokens that do not tell tools apart: "Jasper AI", "jasper.ai", "Jasper App"
+NAME_FILLER_TOKENS = frozenset(('ai', 'app', 'io', 'co', 'com', 'net', 'org', 'so', 'hq', 'inc', 'the'))
+
+_WORD = re.compile(r'[^\W_]+')
+_EMPTY = 1 << 32
+_MASK32 = 0xFFFFFFFF
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase alphanumerics of a name without filler tokens, e.g. 'Jasper.AI' -> 'jasper'."""
+    tokens = _WORD.findall(name.lower())
+    kept = [token for token in tokens if token not in NAME_FILLER_TOKENS]
+    return ''.join(kept or tokens)
+
+
+def name_shingles(name: str) -> set:
+    """Character trigrams of the normalized name, with start and end markers."""
+    normalized = normalize_name(name)
+    if not normalized:
+        return set()
+    padded = f"^{normalized}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def link_site(link: str) -> Tuple[str, str]:
+    """(host, registrable domain) of a link, empty without one."""
+    if not link:
+        return '', ''
+    canonical = canonicalize(link)
+    return canonical.host, canonical.domain
+
+
+def link_agreement(first: Tuple[str, str], second: Tuple[str, str]) -> int:
+    """SAME_HOST, SAME_DOMAIN or DIFFERENT_SITES for two link_site results."""
+    if not first[0] or not second[0] or first[0] == second[0]:
+        return SAME_HOST
+    return SAME_DOMAIN if first[1] == second[1] else DIFFERENT_SITES
+
+
+def description_shingles(description: str) -> set:
+    """Word bigrams of a description (its single word, if it has only one)."""
+    words = _WORD.findall(description.lower())
+    if len(words) < 2:
+        return set(words)
+    return {f"{first} {second}" for first, second in zip(words, words[1:])}
+
+
+def is_informative(description: str) -> bool:
+    """Whether a description says enough to match tools on: not a placeholder, not a few words."""
+    if description.strip().lower() in PLACEHOLDER_DESCRIPTIONS:
+        return False
+    return len(_WORD.findall(description)) >= MIN_DESCRIPTION_WORDS
+
+
+@lru_cache(maxsize=1 << 18)
+def _shingle_hash(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def stable_hash(data: bytes) -> int:
+    """Signed 64-bit digest of data, the same on every Python build and run.
+
+    Unlike hash() of a tuple, it can be stored (e.g. as an SQLite INTEGER)
+    and looked up again by another interpreter.
+    """
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little', signed=True)
+
+
+class MinHasher:
+    """One-permutation MinHash signatures of num_perm 32-bit slots.
+
+    The probe order used to fill empty bins is fixed by seed, so signatures
+    are comparable across processes and runs that use the same seed.
+    """
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        self.num_perm = num_perm
+        rng = random.Random(seed)
+        self._probes = []
+        for slot in range(num_perm):
+            others = [other for other in range(num_perm) if other != slot]
+            rng.shuffle(others)
+            self._probes.append(others)
+
+    def signature(self, shingles: Iterable[str]) -> Optional[array]:
+        """Signature of a shingle set, or None for an empty set."""
+        num_perm = self.num_perm
+        bins = [_EMPTY] * num_perm
+        for shingle in shingles:
+            h = _shingle_hash(shingle)
+            slot = h % num_perm
+            value = (h // num_perm) & _MASK32
+            if value < bins[slot]:
+                bins[slot] = value
+
+        if _EMPTY in bins:
+            if bins.count(_EMPTY) == num_perm:
+                return None
+            filled = bins[:]
+            probes = self._probes
+            for slot, value in enumerate(bins):
+                if value == _EMPTY:
+                    for other in probes[slot]:
+                        value = bins[other]
+                        if value != _EMPTY:
+                            filled[slot] = value
+                            break
+            bins = filled
+        return array('I', bins)
+
+
+def similarity(first: Optional[array], second: Optional[array]) -> float:
+    """Estimated Jaccard similarity of two signatures (0.0 if either is missing)."""
+    if first is None or second is None:
+        return 0.0
+    return sum(map(eq, first, second)) / len(first)
+
+
+def _probability(threshold: float, bands: int, rows: int, false_positive: bool) -> float:
+    """Area under the LSH candidate curve above (false_positive) or below the threshold."""
+    steps = 100
+    if false_positive:
+        low, high = 0.0, threshold
+    else:
+        low, high = threshold, 1.0
+    width = (high - low) / steps
+    total = 0.0
+    for step in range(steps):
+        s = low + (step + 0.5) * width
+        candidate = 1.0 - (1.0 - s ** rows) ** bands
+        total += candidate if false_positive else 1.0 - candidate
+    return total * width
+
+
+@lru_cache(maxsize=None)
+def optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """(bands, rows) with bands * rows <= num_perm that best separates pairs at threshold."""
+    best, best_error = (1, num_perm), float('inf')
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            error = (_probability(threshold, bands, rows, True)
+                     + _probability(threshold, bands, rows, False))
+            if error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+
+class LSHIndex:
+    """Banded LSH over signatures: keys whose signatures agree on a whole band share a bucket."""
+
+    def __init__(self, threshold: float, num_perm: int = NUM_PERM):
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+        self._buckets: List[Dict[int, Any]] = [{} for _ in range(self.bands)]
+
+    def band_hashes(self, signature: array) -> List[int]:
+        """Bucket of signature in each band; pass to insert or query instead of the signature."""
+        if sys.byteorder == 'big':
+            signature = array(signature.typecode, signature)
+            signature.byteswap()
+        data = signature.tobytes()
+        width = self.rows * signature.itemsize
+        return [stable_hash(data[start:start + width]) for start in range(0, self.bands * width, width)]
+
+    def insert(self, key: int, signature: Any):
+        """Add key under a signature or its band_hashes."""
+        if isinstance(signature, array):
+            signature = self.band_hashes(signature)
+        for buckets, band_hash in zip(self._buckets, signature):
+            bucket = buckets.get(band_hash)
+            if bucket is None:
+                # Most buckets hold one key; store it bare until a second arrives
+                buckets[band_hash] = key
+            elif isinstance(bucket, list):
+                bucket.append(key)
+            else:
+                buckets[band_hash] = [bucket, key]
+
+    def query(self, signature: Any) -> set:
+        """Keys sharing at least one band bucket with a signature or its band_hashes."""
+        if isinstance(signature, array):
+            signature = self.band_hashes(signature)
+        candidates = set()
+        for buckets, band_hash in zip(self._buckets, signature):
+            bucket = buckets.get(band_hash)
+            if bucket is None:
+                continue
+            if isinstance(bucket, list):
+                candidates.update(bucket)
+            else:
+                candidates.add(bucket)
+        return candidates
+
+
+class NearDuplicateIndex:
+    """Incremental near-duplicate detector over tool names and descriptions.
+
+    Two tools are near-duplicates when their names are at least
+    name_threshold similar and their links agree (see link_agreement), or
+    when their descriptions are at least description_threshold similar and
+    their names at least min_name_similarity. Pass
+    description_threshold=None to compare names only.
+    """
+
+    def __init__(self, name_threshold: float = NAME_THRESHOLD,
+                 description_threshold: Optional[float] = DESCRIPTION_THRESHOLD,
+                 min_name_similarity: float = MIN_NAME_SIMILARITY,
+                 num_perm: int = NUM_PERM, seed: int = 1):
+        self.name_threshold = name_threshold
+        self.description_threshold = description_threshold
+        self.min_name_similarity = min_name_similarity
+        self.hasher = MinHasher(num_perm, seed)
+        self._name_index = LSHIndex(name_threshold, num_perm)
+        self._description_index = LSHIndex(description_threshold, num_perm) if description_threshold else None
+        self._name_signatures: List[Optional[array]] = []
+        self._description_signatures: List[Optional[array]] = []
+        self._sites: List[Tuple[str, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._name_signatures)
+
+    def is_match(self, name_similarity: float, description_similarity: float, links: int = SAME_HOST) -> bool:
+        """Verdict for a pair, with links the link_agreement of the two tools."""
+        if links == SAME_HOST and name_similarity >= self.name_threshold:
+            return True
+        if links == SAME_DOMAIN and name_similarity >= 1.0:
+            return True
+        return bool(
+            self.description_threshold
+            and description_similarity >= self.description_threshold
+            and name_similarity >= self.min_name_similarity)
+
+    def signatures(self, name: str, description: str = '') -> Tuple[Optional[array], Optional[array]]:
+        name_signature = self.hasher.signature(name_shingles(name))
+        description_signature = None
+        if self._description_index is not None and is_informative(description):
+            description_signature = self.hasher.signature(description_shingles(description))
+        return name_signature, description_signature
+
+    def bands(self, name_signature: Optional[array],
+               description_signature: Optional[array]) -> Tuple[Optional[List[int]], Optional[List[int]]]:
+        return (self._name_index.band_hashes(name_signature) if name_signature is not None else None,
+                self._description_index.band_hashes(description_signature)
+                if description_signature is not None else None)
+
+    def _matches(self, name_signature: Optional[array], description_signature: Optional[array],
+                 name_bands: Optional[List[int]], description_bands: Optional[List[int]],
+                 site: Tuple[str, str]) -> List[Tuple[int, float, float]]:
+        candidates = set()
+        if name_bands is not None:
+            candidates = self._name_index.query(name_bands)
+        if description_bands is not None:
+            candidates |= self._description_index.query(description_bands)
+
+        matches = []
+        for key in candidates:
+            name_similarity = similarity(name_signature, self._name_signatures[key])
+            description_similarity = similarity(description_signature, self._description_signatures[key])
+            if self.is_match(name_similarity, description_similarity, link_agreement(site, self._sites[key])):
+                matches.append((key, name_similarity, description_similarity))
+        matches.sort(key=lambda match: (-(match[1] + match[2]), match[0]))
+        return matches
+
+    def find(self, name: str, description: str = '', link: str = '') -> List[Tuple[int, float, float]]:
+        """(key, name similarity, description similarity) of every indexed near-duplicate, best first."""
+        signatures = self.signatures(name, description)
+        return self._matches(*signatures, *self.bands(*signatures), link_site(link))
+
+    def add(self, name: str, description: str = '', skip_duplicates: bool = False,
+            link: str = '') -> Tuple[Optional[int], Optional[int]]:
+        """Index a tool; returns (its key, key of the best near-duplicate already indexed or None).
+
+        With skip_duplicates, a near-duplicate is not indexed and its key is None.
+        """
+        name_signature, description_signature = self.signatures(name, description)
+        name_bands, description_bands = self.bands(name_signature, description_signature)
+        site = link_site(link)
+        matches = self._matches(name_signature, description_signature, name_bands, description_bands, site)
+        if matches and skip_duplicates:
+            return None, matches[0][0]
+
+        key = len(self._name_signatures)
+        self._name_signatures.append(name_signature)
+        self._description_signatures.append(description_signature)
+        self._sites.append(site)
+        if name_bands is not None:
+            self._name_index.insert(key, name_bands)
+        if description_bands is not None:
+            self._description_index.insert(key, description_bands)
+        return key, (matches[0][0] if matches else None)
+
+
+def _get(tool: Any, key: str) -> str:
+    value = tool.get(key, '')
+    return value if isinstance(value, str) else ''
+
+
+def iter_near_unique(tools: Iterable[Any], index: Optional[NearDuplicateIndex] = None,
+                     on_duplicate: Optional[Callable[[Any, Any], None]] = None) -> Iterator[Any]:
+    """Yield the tools that are not near-duplicates of an earlier one.
+
+    Tools are dicts or anything with a dict-style get() for name,
+    description and link. Only the kept tools are indexed; on_duplicate(tool, kept)
+    is called for each dropped tool with the kept tool it duplicates.
+    """
+    if index is None:
+        index = NearDuplicateIndex()
+    kept: Dict[int, Any] = {}
+    for tool in tools:
+        key, duplicate_of = index.add(_get(tool, 'name'), _get(tool, 'description'), skip_duplicates=True,
+                                      link=_get(tool, 'link'))
+        if key is None:
+            if on_duplicate is not None:
+                on_duplicate(tool, kept.get(duplicate_of))
+            continue
+        kept[key] = tool
+        yield tool
+
+
+def remove_near_duplicates(tools: Iterable[Any], index: Optional[NearDuplicateIndex] = None,
+                           on_duplicate: Optional[Callable[[Any, Any], None]] = None) -> List[Any]:
+    """List form of iter_near_unique."""
+    return list(iter_near_unique(tools, index, on_duplicate))
+
+
+def earlier_candidates(index: NearDuplicateIndex,
+                       bands: Iterable[Tuple[Optional[List[int]], Optional[List[int]]]],
+                       blocking: Optional[BlockingIndex] = None) -> List[List[int]]:
+    """For each tool's (name bands, description bands), in order, the positions
+    of the earlier tools that share an LSH bucket with it.
+
+    Together with confirm_candidates and keep_first_of_duplicates this gives
+    the same verdicts as iter_near_unique from precomputed signatures, with
+    the similarity checks free to run in parallel: iter_near_unique only
+    compares a tool with the kept ones, which are among these candidates.
+
+    blocking, when given, holds every position's link: a name bucket then
+    only yields tools in a comparable block, and only a shared description
+    bucket crosses blocks.
+    """
+    name_index = LSHIndex(index.name_threshold, index.hasher.num_perm)
+    description_index = (LSHIndex(index.description_threshold, index.hasher.num_perm)
+                         if index.description_threshold else None)
+    candidates = []
+    for position, (name_bands, description_bands) in enumerate(bands):
+        earlier = set()
+        if name_bands is not None:
+            earlier = name_index.query(name_bands)
+            if blocking is not None:
+                earlier = {other for other in earlier if blocking.comparable(position, other)}
+            name_index.insert(position, name_bands)
+        if description_bands is not None and description_index is not None:
+            earlier |= description_index.query(description_bands)
+            description_index.insert(position, description_bands)
+        candidates.append(sorted(earlier))
+    return candidates
+
+
+def confirm_candidates(index: NearDuplicateIndex, signatures: Sequence[Tuple[Optional[array], Optional[array]]],
+                       candidates: Sequence[List[int]], positions: Iterable[int],
+                       sites: Optional[Sequence[Tuple[str, str]]] = None) -> List[List[int]]:
+    """For each of positions, the candidates whose signatures are near-duplicates of its own.
+
+    sites, when given, holds each tool's link_site, for the link check of
+    name-only matches.
+    """
+    confirmed = []
+    for position in positions:
+        name_signature, description_signature = signatures[position]
+        matches = []
+        for other in candidates[position]:
+            other_name, other_description = signatures[other]
+            links = SAME_HOST if sites is None else link_agreement(sites[position], sites[other])
+            if index.is_match(similarity(name_signature, other_name),
+                              similarity(description_signature, other_description), links):
+                matches.append(other)
+        confirmed.append(matches)
+    return confirmed
+
+
+def keep_first_of_duplicates(confirmed: Iterable[List[int]]) -> List[bool]:
+    """Whether each tool is kept: it is dropped only if it matches an earlier kept tool."""
+    kept: List[bool] = []
+    for matches in confirmed:
+        kept.append(not any(kept[other] for other in matches))
+    return kept
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Process-pool runner for per-source extraction.
+
+Each source is an ExtractionTask: a label, a module-level extractor function
+and its arguments. run_extraction fans the tasks out across worker processes
+(JSON decoding and regex work is CPU-bound, so threads would not help) and
+returns one ExtractionResult per task in task order, whatever order the
+workers finish in. An exception in one extractor, or a worker process dying,
+is recorded on that source's result and the rest of the batch carries on: a
+dead worker breaks the whole pool, so the tasks it left unfinished are rerun
+one at a time in fresh single-worker pools, and only the source that kills
+its worker again fails.
+
+When a ParseCache is given, tasks whose first argument is a source file are
+looked up in it first and only the misses are sent to the pool.
+"""
+
+import argparse
+import os
+import time
+import traceback
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional
+
+from parse_cache import ParseCache, add_cache_argument
+
+ExtractionTask = namedtuple('ExtractionTask', ['label', 'extractor', 'args'])
+ExtractionResult = namedtuple('ExtractionResult', ['label', 'tools', 'error', 'seconds'])
+
+
+def default_workers() -> int:
+    """Worker count from EXTRACTION_WORKERS, defaulting to the CPU count."""
+    configured = os.environ.get('EXTRACTION_WORKERS', '')
+    if configured.isdigit() and int(configured) > 0:
+        return int(configured)
+    return os.cpu_count() or 1
+
+
+def parse_options(description: str = "Extract AI tools from the scraped sources") -> argparse.Namespace:
+    """Read --workers and --no-cache from the command line."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--workers', type=int, default=default_workers(),
+                        help="number of extraction processes (1 runs in-process)")
+    add_cache_argument(parser)
+    options = parser.parse_args()
+    options.workers = max(1, options.workers)
+    return options
+
+
+def _run_task(extractor: Callable[..., List[Dict[str, Any]]], args: tuple) -> tuple:
+    """Run one extractor, capturing any failure instead of raising it."""
+    start = time.perf_counter()
+    try:
+        tools = extractor(*args)
+        return list(tools or []), None, time.perf_counter() - start
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}\n{traceback.format_exc(limit=3)}"
+        return [], error, time.perf_counter() - start
+
+
+def _cache_key(cache: Optional[ParseCache], task: ExtractionTask) -> Optional[str]:
+    """Cache key for a task that parses a source file, else None."""
+    if cache is None or not cache.enabled or not task.args:
+        return None
+    file_path = task.args[0]
+    if not isinstance(file_path, str) or not os.path.isfile(file_path):
+        return None
+    return cache.key(file_path, task.extractor, task.args[1:])
+
+
+def _run_in_pool(tasks: List[ExtractionTask], indexes: List[int], workers: int,
+                 outcomes: List[Optional[tuple]]) -> List[int]:
+    """Run the tasks at indexes across a process pool into outcomes; returns the
+    indexes left unfinished because a worker process died and broke the pool."""
+    broken = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for index in indexes:
+            try:
+                futures[index] = pool.submit(_run_task, tasks[index].extractor, tasks[index].args)
+            except BrokenProcessPool as e:
+                outcomes[index] = ([], f"{type(e).__name__}: {e}", 0.0)
+                broken.append(index)
+        for index, future in futures.items():
+            try:
+                outcomes[index] = future.result()
+            except BrokenProcessPool as e:
+                outcomes[index] = ([], f"{type(e).__name__}: {e}", 0.0)
+                broken.append(index)
+            except Exception as e:
+                # The task itself could not be run or returned (e.g. unpicklable result)
+                outcomes[index] = ([], f"{type(e).__name__}: {e}", 0.0)
+    return sorted(broken)
+
+
+def run_extraction(tasks: List[ExtractionTask], workers: Optional[int] = None,
+                   cache: Optional[ParseCache] = None) -> List[ExtractionResult]:
+    """Run every task and return the results in task order."""
+    outcomes: List[Optional[tuple]] = [None] * len(tasks)
+    keys = [_cache_key(cache, task) for task in tasks]
+    for index, key in enumerate(keys):
+        if key is not None:
+            start = time.perf_counter()
+            tools = cache.get(key)
+            if tools is not None:
+                outcomes[index] = (tools, None, time.perf_counter() - start)
+
+    pending = [index for index, outcome in enumerate(outcomes) if outcome is None]
+    workers = workers or default_workers()
+    workers = min(workers, len(pending)) or 1
+
+    if workers == 1:
+        for index in pending:
+            outcomes[index] = _run_task(tasks[index].extractor, tasks[index].args)
+    else:
+        # Isolated reruns keep the BrokenProcessPool error only for the task that died
+        for index in _run_in_pool(tasks, pending, workers, outcomes):
+            _run_in_pool(tasks, [index], 1, outcomes)
+
+    for index in pending:
+        tools, error, _ = outcomes[index]
+        if keys[index] is not None and error is None:
+            cache.misses += 1
+            cache.put(keys[index], tools)
+
+    return [ExtractionResult(task.label, tools, error, seconds)
+            for task, (tools, error, seconds) in zip(tasks, outcomes)]
+
+
+def merge_results(results: List[ExtractionResult]) -> List[Dict[str, Any]]:
+    """Print a per-source summary and concatenate the tools in task order."""
+    all_tools = []
+    for result in results:
+        if result.error:
+            print(f"  ❌ {result.label}: {result.error.splitlines()[0]}")
+            continue
+        all_tools.extend(result.tools)
+        print(f"  ✓ Extracted {len(result.tools)} tools from {result.label} ({result.seconds:.2f}s)")
+    return all_tools
@@ -7,6 +7,10 @@ import json
 import os
 from typing import List, Dict, Any
 
+from parallel_extraction import ExtractionTask, merge_results, parse_options, run_extraction
+from parse_cache import ParseCache
+from tool_schema import PARSED_TOOL_SCHEMA, ValidationReport
+
 def load_json_file(file_path: str) -> Dict[str, Any]:
     """Load and parse a JSON file."""
     try:
@@ -140,30 +144,25 @@ def extract_tools_from_jamesmurdza(data: Dict[str, Any]) -> List[Dict[str, Any]]
     
     return tools
 
-def clean_and_validate_tools(tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Clean and validate tool data."""
+def clean_and_validate_tools(tools: List[Dict[str, Any]], report: ValidationReport = None) -> List[Dict[str, Any]]:
+    """Clean tool data and keep the tools that pass the parsed-tool schema."""
     cleaned_tools = []
     seen_names = set()
     
     for tool in tools:
-        # Skip if no name or empty name
-        if not tool.get('name', '').strip():
-            continue
-            
-        # Skip if no link or invalid link
-        link = tool.get('link', '').strip()
-        if not link or link == 'null' or link == '':
-            continue
-            
         # Clean up the data
         cleaned_tool = {
-            'name': tool.get('name', '').strip(),
-            'description': tool.get('description', '').strip(),
-            'link': link,
-            'category': tool.get('category', '').strip() or 'Unknown',
-            'source': tool.get('source', '').strip()
+            'name': str(tool.get('name') or '').strip(),
+            'description': str(tool.get('description') or '').strip(),
+            'link': str(tool.get('link') or '').strip(),
+            'category': str(tool.get('category') or '').strip() or 'Unknown',
+            'source': str(tool.get('source') or '').strip()
         }
         
+        # Skip tools without a usable name or http(s) link, counting them per source
+        if not PARSED_TOOL_SCHEMA.validate(cleaned_tool, report, 'unknown'):
+            continue
+        
         # Avoid duplicates based on name (case-insensitive)
         name_key = cleaned_tool['name'].lower()
         if name_key not in seen_names:
@@ -172,7 +171,14 @@ def clean_and_validate_tools(tools: List[Dict[str, Any]]) -> List[Dict[str, Any]
     
     return cleaned_tools
 
-def main():
+def extract_from_file(file_path: str, extractor_func) -> List[Dict[str, Any]]:
+    """Load a repository file and run its extractor on it."""
+    data = load_json_file(file_path)
+    if not data:
+        raise ValueError(f"Failed to load {os.path.basename(file_path)}")
+    return extractor_func(data)
+
+def main(workers: int = None, use_cache: bool = True):
     """Main function to process all repositories and create consolidated JSON."""
     print("Starting AI tools extraction...")
     
@@ -187,25 +193,22 @@ def main():
         ('jamesmurdza_awesome_ai_devtools.json', extract_tools_from_jamesmurdza)
     ]
     
-    all_tools = []
-    
-    # Process each file
-    for filename, extractor_func in files_to_process:
-        file_path = os.path.join(extract_dir, filename)
-        print(f"Processing {filename}...")
-        
-        data = load_json_file(file_path)
-        if data:
-            tools = extractor_func(data)
-            all_tools.extend(tools)
-            print(f"  Extracted {len(tools)} tools from {filename}")
-        else:
-            print(f"  Failed to load {filename}")
+    # Process the files in parallel; results come back in list order
+    tasks = [
+        ExtractionTask(filename, extract_from_file, (os.path.join(extract_dir, filename), extractor_func))
+        for filename, extractor_func in files_to_process
+    ]
+    print(f"Processing {len(tasks)} files...")
+    cache = ParseCache(enabled=use_cache)
+    all_tools = merge_results(run_extraction(tasks, workers, cache))
+    print(cache.summary())
     
     print(f"Total tools before cleaning: {len(all_tools)}")
     
     # Clean and validate tools
-    cleaned_tools = clean_and_validate_tools(all_tools)
+    report = ValidationReport()
+    cleaned_tools = clean_and_validate_tools(all_tools, report)
+    print(f"Validation: {report.summary()}")
     print(f"Total tools after cleaning: {len(cleaned_tools)}")
     
     # Create final data structure
@@ -256,4 +259,5 @@ def main():
         print(f"Error saving to {output_file}: {e}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    options = parse_options()
+    main(options.workers, not options.no_cache)
\ No newline at end of file
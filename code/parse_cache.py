@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Content-addressed on-disk cache for parsed tool lists.
+
+Entries are keyed by a SHA-256 of the source file's bytes plus the parser's
+identity and version, so an unchanged file parsed by unchanged code is
+loaded from the cache instead of going through the JSON repair and regex
+fallbacks again. A parser's version is its module-level PARSER_VERSION if it
+defines one, otherwise a hash of its module's source and of every local
+(not standard library or installed) module it uses, wherever it lives, so
+editing a parser (or e.g. the tokenizer or URL helpers it relies on)
+invalidates its entries without any bookkeeping.
+
+Entries are marshal-encoded and zlib-compressed (marshal cannot execute code
+on load, unlike pickle). The directory is kept under max_bytes by evicting
+the least recently used entries; a cache hit refreshes an entry's mtime.
+"""
+
+import hashlib
+import marshal
+import os
+import site
+import sys
+import sysconfig
+import tempfile
+import types
+import zlib
+from typing import Any, Callable, Dict, List, Optional
+
+CACHE_DIR = os.environ.get('PARSE_CACHE_DIR', '/workspace/.cache/parsed_tools')
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+_MAGIC = b'PTC1'
+_SUFFIX = '.ptc'
+_READ_SIZE = 1024 * 1024
+
+_module_versions: Dict[str, str] = {}
+
+# Directories of the standard library and installed packages, which are not hashed
+_LIBRARY_DIRS = tuple(sorted({
+    os.path.join(os.path.abspath(path), '')
+    for path in [sysconfig.get_paths()[name] for name in ('stdlib', 'platstdlib', 'purelib', 'platlib')]
+    + [site.getusersitepackages()]
+}))
+
+
+def file_digest(file_path: str) -> str:
+    """SHA-256 of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(_READ_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _local_sources(module) -> List[str]:
+    """Source files of a module and of the local modules it uses, directly or not."""
+    seen = {}
+    pending = [module]
+    while pending:
+        current = pending.pop()
+        source_file = os.path.abspath(getattr(current, '__file__', '') or '')
+        if not source_file.endswith('.py') or source_file in seen or source_file.startswith(_LIBRARY_DIRS):
+            continue
+        seen[source_file] = True
+        for value in vars(current).values():
+            if isinstance(value, types.ModuleType):
+                pending.append(value)
+            elif getattr(value, '__module__', None) in sys.modules:
+                pending.append(sys.modules[value.__module__])
+    return sorted(seen)
+
+
+def parser_version(parser: Callable) -> str:
+    """PARSER_VERSION of the parser's module, or a hash of the parser's local sources."""
+    module = sys.modules.get(getattr(parser, '__module__', ''), None)
+    explicit = getattr(module, 'PARSER_VERSION', None)
+    if explicit is not None:
+        return str(explicit)
+    if not getattr(module, '__file__', None):
+        return '0'
+
+    source_file = module.__file__
+    if source_file not in _module_versions:
+        digest = hashlib.sha256()
+        for path in _local_sources(module):
+            digest.update(file_digest(path).encode('ascii'))
+        _module_versions[source_file] = digest.hexdigest()[:16]
+    return _module_versions[source_file]
+
+
+def _stable_repr(value: Any) -> str:
+    """repr() that names functions instead of printing their addresses."""
+    if callable(value):
+        return f"{value.__module__}.{getattr(value, '__qualname__', value.__name__)}"
+    if isinstance(value, (tuple, list)):
+        return '(' + ', '.join(_stable_repr(item) for item in value) + ')'
+    return repr(value)
+
+
+class ParseCache:
+    """Size-bounded, content-addressed store of parsed tool lists."""
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_bytes: int = MAX_CACHE_BYTES, enabled: bool = True):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, file_path: str, parser: Callable, extra: tuple = ()) -> str:
+        """Cache key for parsing file_path with parser (and extra arguments)."""
+        parser_id = f"{parser.__module__}.{getattr(parser, '__qualname__', parser.__name__)}"
+        material = '\0'.join([
+            file_digest(file_path),
+            parser_id,
+            parser_version(parser),
+            _stable_repr(extra),
+            str(marshal.version)
+        ])
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + _SUFFIX)
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Return the cached tool list for key, or None."""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                blob = f.read()
+            if not blob.startswith(_MAGIC):
+                return None
+            tools = marshal.loads(zlib.decompress(blob[len(_MAGIC):]))
+            os.utime(path)
+            self.hits += 1
+            return tools
+        except (OSError, ValueError, EOFError, TypeError, zlib.error):
+            return None
+
+    def put(self, key: str, tools: List[Dict[str, Any]]):
+        """Store a tool list, then evict old entries if over the size bound."""
+        if not self.enabled:
+            return
+        try:
+            blob = _MAGIC + zlib.compress(marshal.dumps(tools), 6)
+        except ValueError:
+            # Not marshal-serializable (e.g. custom objects); skip caching
+            return
+
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(blob)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: could not write parse cache entry: {e}")
+            return
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits max_bytes."""
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(_SUFFIX):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def load_or_parse(self, file_path: str, parser: Callable[..., List[Dict[str, Any]]], *args) -> List[Dict[str, Any]]:
+        """Return parser(file_path, *args), served from the cache when the file is unchanged."""
+        if not self.enabled:
+            return parser(file_path, *args)
+
+        key = self.key(file_path, parser, args)
+        tools = self.get(key)
+        if tools is not None:
+            return tools
+
+        self.misses += 1
+        tools = parser(file_path, *args)
+        self.put(key, tools)
+        return tools
+
+    def summary(self) -> str:
+        if not self.enabled:
+            return "Parse cache disabled"
+        return f"Parse cache: {self.hits} hits, {self.misses} misses"
+
+
+def add_cache_argument(parser):
+    """Add the shared --no-cache flag to an argparse parser."""
+    parser.add_argument('--no-cache', action='store_true',
+                        help="re-parse every source instead of using the parse cache")
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Columnar popularity scoring with configurable weights.
+
+Tools used to be scored one at a time, with the popular domains matched as
+substrings (so notgoogle.com counted as google.com), and the hand-curated
+lists in enhance_tools_dataset and add_more_tools set scores on their own
+scale, some of them negative. PopularityScorer scores a whole batch at
+once: one pass over the tools collects every feature into a column, each
+column is weighted with map() over the whole array, and the raw sums are
+mapped onto the 0-10, one-decimal range of tools.popularity_score
+(DECIMAL(3,1)).
+
+Features and their weights (popularity_weights.json):
+
+    presence            name, description and link are present
+    description_length  bonus for each length threshold the description exceeds
+    short_description   description missing or shorter than `below`
+    popular_domains     registrable domain in the set (hash lookup)
+    categories          bonus per category, by exact name
+    category_substrings bonus for a category containing the substring ("AI"
+                        in "AI Copywriting Tools"), when no exact name matched
+    sources             each extra source listing the tool, up to max_extra
+    curated             tool comes from a hand-curated source list
+
+A tool from a curated list that carries the list's hand-set curated_score
+is scored by that instead: `curated.scales` gives each list's scale, which
+is mapped linearly onto 0-10.
+
+The 0-10 mapping uses the lowest and highest raw score the weights allow,
+not the range of the batch, so a tool's score does not depend on which
+other tools are scored with it.
+"""
+
+import json
+import os
+from array import array
+from bisect import bisect_left
+from itertools import accumulate, repeat
+from operator import mul, sub
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from url_canonical import canonicalize
+
+WEIGHTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'popularity_weights.json')
+
+# tools.popularity_score is DECIMAL(3,1)
+MAX_SCORE = 10.0
+SCORE_DECIMALS = 1
+
+
+def _text(value: Any) -> str:
+    return value if isinstance(value, str) else ''
+
+
+class PopularityScorer:
+    """Scores batches of tools (dicts, or anything with a dict-style get())."""
+
+    def __init__(self, weights: Dict[str, Any]):
+        presence = weights.get('presence', {})
+        self.presence_weights = (presence.get('name', 0.0), presence.get('description', 0.0),
+                                 presence.get('link', 0.0))
+        thresholds = sorted(weights.get('description_length', []))
+        self.length_thresholds = [threshold for threshold, _ in thresholds]
+        # Bonus for a description longer than the first i thresholds
+        self.length_bonus = [0.0] + list(accumulate(bonus for _, bonus in thresholds))
+        short = weights.get('short_description', {})
+        self.short_below = short.get('below', 0)
+        self.short_weight = short.get('weight', 0.0)
+        popular = weights.get('popular_domains', {})
+        self.popular_domains = frozenset(domain.lower() for domain in popular.get('domains', []))
+        self.popular_weight = popular.get('weight', 0.0)
+        self.category_weights = dict(weights.get('categories', {}))
+        self.category_substrings = list(weights.get('category_substrings', {}).items())
+        self._category_bonus: Dict[str, float] = {}
+        sources = weights.get('sources', {})
+        self.source_weight = sources.get('weight', 0.0)
+        self.max_extra_sources = sources.get('max_extra', 0)
+        curated = weights.get('curated', {})
+        self.curated_weight = curated.get('weight', 0.0)
+        self.curated_sources = frozenset(curated.get('sources', []))
+        self.curated_scales = {source: tuple(scale) for source, scale in curated.get('scales', {}).items()}
+
+        # Every feature's smallest and largest contribution bound the raw score
+        contributions = [(0.0, weight) for weight in self.presence_weights]
+        contributions += [(min(self.length_bonus), max(self.length_bonus)),
+                          (0.0, self.short_weight),
+                          (0.0, self.popular_weight),
+                          (0.0, self.source_weight * self.max_extra_sources),
+                          (0.0, self.curated_weight)]
+        category_values = (list(self.category_weights.values())
+                           + [weight for _, weight in self.category_substrings] + [0.0])
+        contributions.append((min(category_values), max(category_values)))
+        self.low = sum(min(pair) for pair in contributions)
+        self.high = sum(max(pair) for pair in contributions)
+
+    @classmethod
+    def load(cls, file_path: str = WEIGHTS_FILE) -> 'PopularityScorer':
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def category_bonus(self, category: str) -> float:
+        """Weight of a category: its exact entry, else the first substring it contains."""
+        bonus = self._category_bonus.get(category)
+        if bonus is None:
+            bonus = self.category_weights.get(category)
+            if bonus is None:
+                bonus = next((weight for substring, weight in self.category_substrings if substring in category), 0.0)
+            self._category_bonus[category] = bonus
+        return bonus
+
+    def curated_score(self, tool: Any) -> Optional[float]:
+        """A curated tool's hand-set score mapped from its list's scale onto 0-10, if it has one."""
+        scale = self.curated_scales.get(tool.get('source', ''))
+        score = tool.get('curated_score')
+        if scale is None or not isinstance(score, (int, float)) or isinstance(score, bool):
+            return None
+        low, high = scale
+        mapped = (score - low) * MAX_SCORE / (high - low)
+        return round(min(MAX_SCORE, max(0.0, mapped)), SCORE_DECIMALS)
+
+    def columns(self, tools: Sequence[Any]) -> Dict[str, Any]:
+        """Feature columns of a batch, collected in one pass over the tools."""
+        curated_sources = self.curated_sources
+        has_name = array('b')
+        has_link = array('b')
+        lengths = array('l')
+        domains: List[str] = []
+        categories: List[str] = []
+        listings = array('l')
+        is_curated = array('b')
+        curated_scores: List[Optional[float]] = []
+        for tool in tools:
+            name = _text(tool.get('name', ''))
+            link = _text(tool.get('link', ''))
+            has_name.append(bool(name))
+            has_link.append(bool(link))
+            lengths.append(len(_text(tool.get('description', ''))))
+            domains.append(canonicalize(link).domain)
+            categories.append(_text(tool.get('category', '')))
+            listings.append(tool.get('listings', 1) or 1)
+            is_curated.append(tool.get('source', '') in curated_sources)
+            curated_scores.append(self.curated_score(tool) if is_curated[-1] else None)
+        return {
+            'has_name': has_name,
+            'has_link': has_link,
+            'description_length': lengths,
+            'domain': domains,
+            'category': categories,
+            'listings': listings,
+            'curated': is_curated,
+            'curated_score': curated_scores,
+        }
+
+    def raw_scores(self, columns: Dict[str, Any]) -> List[float]:
+        """Weighted sum of the feature columns, row by row."""
+        name_weight, description_weight, link_weight = self.presence_weights
+        lengths = columns['description_length']
+        extra_sources = map(min, map(sub, columns['listings'], repeat(1)), repeat(self.max_extra_sources))
+        weighted = [
+            map(mul, columns['has_name'], repeat(name_weight)),
+            map(mul, map(bool, lengths), repeat(description_weight)),
+            map(mul, columns['has_link'], repeat(link_weight)),
+            map(self.length_bonus.__getitem__, map(bisect_left, repeat(self.length_thresholds), lengths)),
+            map(mul, map(self.short_below.__gt__, lengths), repeat(self.short_weight)),
+            map(mul, map(self.popular_domains.__contains__, columns['domain']), repeat(self.popular_weight)),
+            map(self.category_bonus, columns['category']),
+            map(mul, extra_sources, repeat(self.source_weight)),
+            map(mul, columns['curated'], repeat(self.curated_weight)),
+        ]
+        return list(map(sum, zip(*weighted)))
+
+    def normalize(self, raw: Iterable[float]) -> List[float]:
+        """Raw scores mapped linearly from the weights' range onto 0-10, one decimal."""
+        span = self.high - self.low
+        if span <= 0:
+            return [0.0 for _ in raw]
+        scale = MAX_SCORE / span
+        return [round(min(MAX_SCORE, max(0.0, (score - self.low) * scale)), SCORE_DECIMALS) for score in raw]
+
+    def score_many(self, tools: Sequence[Any]) -> List[float]:
+        """0-10 popularity scores of a batch of tools."""
+        columns = self.columns(tools)
+        scores = self.normalize(self.raw_scores(columns))
+        return [score if curated is None else curated for score, curated in zip(scores, columns['curated_score'])]
+
+    def rescore(self, tools: Sequence[Any]) -> Sequence[Any]:
+        """Set popularity_score on every tool in one call and return the tools."""
+        for tool, score in zip(tools, self.score_many(tools)):
+            if isinstance(tool, dict):
+                tool['popularity_score'] = score
+            else:
+                tool.popularity_score = score
+        return tools
+
+
+_default_scorer = None
+
+
+def default_scorer() -> PopularityScorer:
+    """Scorer with the bundled weights, loaded on first use."""
+    global _default_scorer
+    if _default_scorer is None:
+        _default_scorer = PopularityScorer.load()
+    return _default_scorer
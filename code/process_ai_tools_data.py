@@ -6,26 +6,11 @@ Script to process AI tools data from multiple directory websites and create a un
 import json
 import os
 from typing import List, Dict, Any
-from urllib.parse import urljoin, urlparse
 import re
 
-def clean_url(url: str, source_domain: str = None) -> str:
-    """Clean and normalize URLs"""
-    if not url:
-        return ""
-    
-    # Handle relative URLs
-    if url.startswith('/') and source_domain:
-        return urljoin(f"https://{source_domain}", url)
-    
-    # Handle URLs that don't start with http/https
-    if not url.startswith(('http://', 'https://')):
-        if '.' in url:
-            return f"https://{url}"
-        elif source_domain:
-            return urljoin(f"https://{source_domain}", url)
-    
-    return url
+from near_duplicates import remove_near_duplicates
+from parallel_extraction import ExtractionTask, merge_results, parse_options, run_extraction
+from parse_cache import ParseCache
 
 def clean_description(description: str) -> str:
     """Clean and truncate descriptions to one line"""
@@ -199,7 +184,7 @@ def process_theresanaiforthat(file_path: str) -> List[Dict[str, Any]]:
         return []
 
 def remove_duplicates(tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Remove duplicate tools based on name similarity"""
+    """Remove duplicate tools: same normalized name, then near-duplicate names and descriptions"""
     seen_names = set()
     unique_tools = []
     
@@ -213,7 +198,10 @@ def remove_duplicates(tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         else:
             print(f"Removing duplicate: {tool['name']} from {tool['source']}")
     
-    return unique_tools
+    def report_near_duplicate(tool: Dict[str, Any], kept: Dict[str, Any]):
+        print(f"Removing near-duplicate: {tool['name']} from {tool['source']} (kept {kept['name']})")
+    
+    return remove_near_duplicates(unique_tools, on_duplicate=report_near_duplicate)
 
 def ensure_category_diversity(tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Ensure diverse representation across categories"""
@@ -228,37 +216,31 @@ def ensure_category_diversity(tools: List[Dict[str, Any]]) -> List[Dict[str, Any
     
     return tools
 
-def main():
+def main(workers: int = None, use_cache: bool = True):
     """Main processing function"""
     print("Starting AI Tools Data Processing...")
     
     # Create data directory if it doesn't exist
     os.makedirs('/workspace/data', exist_ok=True)
     
-    all_tools = []
-    
-    # Process each source
+    # Process each source in parallel; results come back in list order
     extract_dir = '/workspace/extract'
+    sources = [
+        ('topai_tools_extraction.json', process_topai_tools),
+        ('aitools_fyi_extraction.json', process_aitools_fyi),
+        ('toolify_ai_extraction.json', process_toolify_ai),
+        ('theresanaiforthat_extraction.json', process_theresanaiforthat)
+    ]
     
-    # TopAI Tools
-    topai_file = os.path.join(extract_dir, 'topai_tools_extraction.json')
-    if os.path.exists(topai_file):
-        all_tools.extend(process_topai_tools(topai_file))
-    
-    # AITools.fyi
-    aitools_file = os.path.join(extract_dir, 'aitools_fyi_extraction.json')
-    if os.path.exists(aitools_file):
-        all_tools.extend(process_aitools_fyi(aitools_file))
-    
-    # Toolify.ai
-    toolify_file = os.path.join(extract_dir, 'toolify_ai_extraction.json')
-    if os.path.exists(toolify_file):
-        all_tools.extend(process_toolify_ai(toolify_file))
+    tasks = []
+    for filename, processor in sources:
+        file_path = os.path.join(extract_dir, filename)
+        if os.path.exists(file_path):
+            tasks.append(ExtractionTask(filename, processor, (file_path,)))
     
-    # TheresAnAIForThat.com
-    theresanai_file = os.path.join(extract_dir, 'theresanaiforthat_extraction.json')
-    if os.path.exists(theresanai_file):
-        all_tools.extend(process_theresanaiforthat(theresanai_file))
+    cache = ParseCache(enabled=use_cache)
+    all_tools = merge_results(run_extraction(tasks, workers, cache))
+    print(cache.summary())
     
     print(f"\nTotal tools collected: {len(all_tools)}")
     
@@ -299,4 +281,5 @@ def main():
         print(f"  {source}: {count} tools")
 
 if __name__ == "__main__":
-    main()
+    options = parse_options()
+    main(options.workers, not options.no_cache)
@@ -9,6 +9,8 @@ import re
 from datetime import datetime
 from typing import List, Dict, Any
 
+from url_canonical import clean_url
+
 def load_extracted_data():
     """Load the extracted data from the JSON file"""
     try:
@@ -42,19 +44,6 @@ def clean_description(description: str) -> str:
     
     return cleaned
 
-def clean_url(url: str) -> str:
-    """Clean and normalize URLs"""
-    if not url:
-        return ""
-    
-    # Ensure URLs have proper protocol
-    if url.startswith('http://') or url.startswith('https://'):
-        return url
-    elif url.startswith('//'):
-        return f"https:{url}"
-    else:
-        return f"https://{url}"
-
 def process_tools_data(extracted_data: Dict) -> List[Dict[str, Any]]:
     """Process the extracted tools data into the requested format"""
     tools_list = []
@@ -3,53 +3,38 @@
 Fixed script to process and combine AI tools data from multiple GitHub repositories.
 """
 
+import argparse
 import json
 import re
 from typing import List, Dict, Any
 
+from parse_cache import ParseCache, add_cache_argument
+from markdown_ingest import iter_markdown_lines
+from raw_content_stream import iter_tool_records
+from tool_tokenizer import decode_string
+
 def parse_e2b_data(file_path: str) -> List[Dict[str, Any]]:
     """Parse the e2b-dev/awesome-ai-agents data with error handling."""
     tools = []
     
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        # The file contains raw JSON, let's parse it directly
-        data = json.loads(content)
-        raw_content = data.get('raw_content', '')
-        
-        if not raw_content:
-            print("No raw_content found in e2b data")
-            return tools
-        
-        # Parse the nested JSON
-        try:
-            json_data = json.loads(raw_content)
-        except json.JSONDecodeError as e:
-            print(f"Error parsing nested JSON in e2b data: {e}")
-            # Try to fix common JSON issues
-            raw_content_fixed = raw_content.replace('\\n', ' ').replace('\\"', '"')
-            try:
-                json_data = json.loads(raw_content_fixed)
-            except json.JSONDecodeError:
-                print("Could not fix JSON parsing, extracting manually...")
-                return extract_e2b_tools_manually(raw_content)
-        
-        ai_agents = json_data.get('data', {}).get('ai_agents', [])
-        
-        for agent in ai_agents:
+        # Stream agents straight out of the raw_content wrapper instead of
+        # decoding the wrapper and then the nested JSON document in memory
+        for agent in iter_tool_records(file_path, name_keys=('tool_name',)):
             tool = {
                 'name': agent.get('tool_name', ''),
                 'url': agent.get('tool_url', ''),
                 'categories': agent.get('category', []),
-                'description': agent.get('description', '').replace('\\n', '\n'),
+                'description': (agent.get('description') or '').replace('\\n', '\n'),
                 'additional_links': agent.get('links', []),
                 'source_repository': 'e2b-dev/awesome-ai-agents'
             }
             
             if tool['name']:  # Only add if tool has a name
                 tools.append(tool)
+        
+        if not tools:
+            print("No ai_agents found in e2b raw_content")
                 
     except Exception as e:
         print(f"Error parsing e2b data: {e}")
@@ -114,85 +99,58 @@ def parse_partharay_data(file_path: str) -> List[Dict[str, Any]]:
             return extract_partharay_tools_manually(raw_content)
         
         extracted_info = json_data.get('data', {}).get('extracted_information', '')
-        
-        # Parse the extracted information to identify tools
-        tool_entries = re.findall(r'- \*\*(.*?)\*\*: (.*?)(?=\\n- \*\*|\\n\\n|\Z)', extracted_info, re.DOTALL)
-        
-        for tool_name, description in tool_entries:
-            tool = {
-                'name': tool_name.strip(),
-                'url': '',  # URL not provided in this format
-                'categories': ['Generative AI'],  # Default category
-                'description': description.strip().replace('\\n', '\n'),
-                'additional_links': [],
-                'source_repository': 'ParthaPRay/Curated-List-of-Generative-AI-Tools'
-            }
-            
-            # Attempt to categorize based on description keywords
-            desc_lower = description.lower()
-            categories = ['Generative AI']
-            
-            if any(keyword in desc_lower for keyword in ['code', 'coding', 'programming', 'developer']):
-                categories.append('Coding')
-            if any(keyword in desc_lower for keyword in ['llm', 'language model']):
-                categories.append('Language Models')
-            if any(keyword in desc_lower for keyword in ['agent', 'autonomous']):
-                categories.append('AI Agents')
-            if any(keyword in desc_lower for keyword in ['framework', 'platform']):
-                categories.append('Framework')
-            if any(keyword in desc_lower for keyword in ['video', 'image', 'visual']):
-                categories.append('Multimedia')
-            if any(keyword in desc_lower for keyword in ['data', 'analysis', 'analytics']):
-                categories.append('Data Analysis')
-                
-            tool['categories'] = categories
-            
-            if tool['name']:  # Only add if tool has a name
-                tools.append(tool)
+        tools = partharay_tools_from_markdown(extracted_info)
                 
     except Exception as e:
         print(f"Error parsing ParthaPRay data: {e}")
         
     return tools
 
+def partharay_tools_from_markdown(markdown: str) -> List[Dict[str, Any]]:
+    """Build ParthaPRay tool objects from the `- **Name**: description` bullets."""
+    tools = []
+    
+    for entry in iter_markdown_lines(markdown.splitlines()):
+        tool = {
+            'name': entry['name'],
+            'url': entry['link'],
+            'categories': ['Generative AI'],  # Default category
+            'description': entry['description'],
+            'additional_links': [],
+            'source_repository': 'ParthaPRay/Curated-List-of-Generative-AI-Tools'
+        }
+        
+        # Attempt to categorize based on description keywords
+        desc_lower = entry['description'].lower()
+        categories = ['Generative AI']
+        
+        if any(keyword in desc_lower for keyword in ['code', 'coding', 'programming', 'developer']):
+            categories.append('Coding')
+        if any(keyword in desc_lower for keyword in ['llm', 'language model']):
+            categories.append('Language Models')
+        if any(keyword in desc_lower for keyword in ['agent', 'autonomous']):
+            categories.append('AI Agents')
+        if any(keyword in desc_lower for keyword in ['framework', 'platform']):
+            categories.append('Framework')
+        if any(keyword in desc_lower for keyword in ['video', 'image', 'visual']):
+            categories.append('Multimedia')
+        if any(keyword in desc_lower for keyword in ['data', 'analysis', 'analytics']):
+            categories.append('Data Analysis')
+            
+        tool['categories'] = categories
+        tools.append(tool)
+    
+    return tools
+
 def extract_partharay_tools_manually(raw_content: str) -> List[Dict[str, Any]]:
     """Manually extract tools from ParthaPRay data."""
     tools = []
     
     try:
         # Look for the extracted_information field
-        info_match = re.search(r'"extracted_information":\s*"([^"]+(?:\\.[^"]*)*)"', raw_content)
+        info_match = re.search(r'"extracted_information":\s*"((?:[^"\\]|\\.)*)"?', raw_content)
         if info_match:
-            extracted_info = info_match.group(1)
-            
-            # Parse tool entries
-            tool_entries = re.findall(r'- \*\*(.*?)\*\*: (.*?)(?=\\n- \*\*|\\n\\n|\Z)', extracted_info, re.DOTALL)
-            
-            for tool_name, description in tool_entries:
-                tool = {
-                    'name': tool_name.strip(),
-                    'url': '',
-                    'categories': ['Generative AI'],
-                    'description': description.strip().replace('\\n', '\n'),
-                    'additional_links': [],
-                    'source_repository': 'ParthaPRay/Curated-List-of-Generative-AI-Tools'
-                }
-                
-                # Categorize based on description
-                desc_lower = description.lower()
-                categories = ['Generative AI']
-                
-                if any(keyword in desc_lower for keyword in ['code', 'coding', 'programming']):
-                    categories.append('Coding')
-                if any(keyword in desc_lower for keyword in ['agent', 'autonomous']):
-                    categories.append('AI Agents')
-                if any(keyword in desc_lower for keyword in ['framework', 'platform']):
-                    categories.append('Framework')
-                
-                tool['categories'] = categories
-                
-                if tool['name']:
-                    tools.append(tool)
+            tools = partharay_tools_from_markdown(decode_string(info_match.group(1)))
     except Exception as e:
         print(f"Error in manual ParthaPRay extraction: {e}")
     
@@ -214,13 +172,57 @@ def combine_and_deduplicate_tools(tools_lists: List[List[Dict[str, Any]]]) -> Li
     
     return all_tools
 
-def main():
+def extract_e2b_names(file_path: str) -> List[Dict[str, Any]]:
+    """Fallback: basic e2b tool objects from "tool_name" fields in the raw text."""
+    with open(file_path, 'r') as f:
+        e2b_content = f.read()
+    
+    e2b_names = re.findall(r'"tool_name":\s*"([^"]+)"', e2b_content)
+    print(f"Found {len(e2b_names)} tool names in e2b data")
+    
+    return [
+        {
+            'name': name,
+            'url': '',
+            'categories': ['AI Tools'],
+            'description': '',
+            'additional_links': [],
+            'source_repository': 'e2b-dev/awesome-ai-agents'
+        }
+        for name in e2b_names if name
+    ]
+
+def extract_partharay_names(file_path: str) -> List[Dict[str, Any]]:
+    """Fallback: basic ParthaPRay tool objects from **Name**: markers in the raw text."""
+    with open(file_path, 'r') as f:
+        partharay_content = f.read()
+    
+    partharay_names = re.findall(r'\*\*(.*?)\*\*:', partharay_content)
+    print(f"Found {len(partharay_names)} tool names in ParthaPRay data")
+    
+    return [
+        {
+            'name': name.strip(),
+            'url': '',
+            'categories': ['Generative AI'],
+            'description': '',
+            'additional_links': [],
+            'source_repository': 'ParthaPRay/Curated-List-of-Generative-AI-Tools'
+        }
+        for name in partharay_names if name
+    ]
+
+def main(use_cache: bool = True):
     """Main function to process and combine all tool data."""
     print("Processing GitHub AI tools data...")
     
-    # Parse data from both repositories
-    e2b_tools = parse_e2b_data('/workspace/extract/e2b_awesome_ai_agents.json')
-    partharay_tools = parse_partharay_data('/workspace/extract/partharay_generative_ai_tools.json')
+    e2b_file = '/workspace/extract/e2b_awesome_ai_agents.json'
+    partharay_file = '/workspace/extract/partharay_generative_ai_tools.json'
+    cache = ParseCache(enabled=use_cache)
+    
+    # Parse data from both repositories (unchanged files come from the parse cache)
+    e2b_tools = cache.load_or_parse(e2b_file, parse_e2b_data)
+    partharay_tools = cache.load_or_parse(partharay_file, parse_partharay_data)
     
     print(f"Extracted {len(e2b_tools)} tools from e2b-dev repository")
     print(f"Extracted {len(partharay_tools)} tools from ParthaPRay repository")
@@ -231,45 +233,13 @@ def main():
         
         # Try reading the files as simple text and extract patterns
         try:
-            with open('/workspace/extract/e2b_awesome_ai_agents.json', 'r') as f:
-                e2b_content = f.read()
-            
-            with open('/workspace/extract/partharay_generative_ai_tools.json', 'r') as f:
-                partharay_content = f.read()
-            
-            # Extract tool names from both files using simple patterns
-            e2b_names = re.findall(r'"tool_name":\s*"([^"]+)"', e2b_content)
-            partharay_names = re.findall(r'\*\*(.*?)\*\*:', partharay_content)
-            
-            print(f"Found {len(e2b_names)} tool names in e2b data")
-            print(f"Found {len(partharay_names)} tool names in ParthaPRay data")
-            
-            # Create basic tool objects
-            for name in e2b_names:
-                if name:
-                    e2b_tools.append({
-                        'name': name,
-                        'url': '',
-                        'categories': ['AI Tools'],
-                        'description': '',
-                        'additional_links': [],
-                        'source_repository': 'e2b-dev/awesome-ai-agents'
-                    })
-            
-            for name in partharay_names:
-                if name:
-                    partharay_tools.append({
-                        'name': name.strip(),
-                        'url': '',
-                        'categories': ['Generative AI'],
-                        'description': '',
-                        'additional_links': [],
-                        'source_repository': 'ParthaPRay/Curated-List-of-Generative-AI-Tools'
-                    })
-                    
+            e2b_tools = cache.load_or_parse(e2b_file, extract_e2b_names)
+            partharay_tools = cache.load_or_parse(partharay_file, extract_partharay_names)
         except Exception as e:
             print(f"Error in alternative parsing: {e}")
     
+    print(cache.summary())
+    
     # Combine and deduplicate
     all_tools = combine_and_deduplicate_tools([e2b_tools, partharay_tools])
     
@@ -325,4 +295,6 @@ def main():
     print("Processing complete!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Process the e2b and ParthaPRay GitHub tool lists")
+    add_cache_argument(parser)
+    main(not parser.parse_args().no_cache)
\ No newline at end of file
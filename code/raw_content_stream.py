@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Streaming reader for double-encoded extract files.
+
+Most scrapes in extract/ are a JSON object whose "raw_content" string holds
+another JSON document. Instead of loading the wrapper, then the inner string,
+then the decoded inner document, this module decodes the inner document
+straight from the outer string's escape sequences and yields tool records
+one at a time, so memory stays flat regardless of file size.
+
+Some inner documents are themselves a wrapper whose "extracted_information"
+string holds a markdown README; iter_inner_text decodes that second layer
+the same way, and iter_text_lines splits the decoded chunks into lines.
+
+iter_json_array streams the elements of one array member of a plain JSON
+object (the tools of a data/ source file) the same way.
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator
+
+from tool_tokenizer import RECORD_NAME_KEYS, RecordStreamParser, decode_string
+
+CHUNK_SIZE = 64 * 1024
+
+# Runs of characters inside a JSON string that can be decoded as-is
+_OUTER_RUN = re.compile(r'(?:[^"\\]|\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4}))*')
+
+_JSON_DECODER = json.JSONDecoder()
+_JSON_SEPARATORS = re.compile(r'[\s:,]*')
+
+
+def iter_field_text(chunks: Iterable[str], field: str) -> Iterator[str]:
+    """Yield the decoded text of the first string value of field in JSON text given in chunks."""
+    marker = '"' + field + '"'
+    chunks = iter(chunks)
+
+    # Locate the opening quote of the field's string value
+    buffer = ''
+    while True:
+        chunk = next(chunks, '')
+        if not chunk:
+            return
+        buffer += chunk
+        match = re.search(re.escape(marker) + r'\s*:\s*"', buffer)
+        if match:
+            buffer = buffer[match.end():]
+            break
+        # Keep just enough to match a marker split across reads
+        buffer = buffer[-(len(marker) + 16):]
+
+    while True:
+        pos = 0
+        while pos < len(buffer):
+            end = _OUTER_RUN.match(buffer, pos).end()
+            if end > pos:
+                text = decode_string(buffer[pos:end])
+                if end == len(buffer) and text and '\ud800' <= text[-1] <= '\udbff':
+                    # Hold back a high surrogate until its pair arrives
+                    if text[:-1]:
+                        yield text[:-1]
+                    pos = end - 6
+                    break
+                yield text
+                pos = end
+                continue
+
+            if buffer[pos] == '"':
+                return
+            escape = buffer[pos:pos + 6]
+            if len(escape) < 2 or (escape[1] == 'u' and len(escape) < 6):
+                # Escape sequence split across reads
+                break
+            # Invalid escape - keep the escaped character literally
+            yield escape[1]
+            pos += 2
+
+        chunk = next(chunks, '')
+        if not chunk:
+            return
+        buffer = buffer[pos:] + chunk
+
+
+def iter_raw_content(file_path: str, chunk_size: int = CHUNK_SIZE,
+                     field: str = 'raw_content') -> Iterator[str]:
+    """Yield the decoded text of the wrapper's raw_content string in chunks."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        yield from iter_field_text(iter(lambda: f.read(chunk_size), ''), field)
+
+
+def iter_inner_text(file_path: str, field: str = 'extracted_information',
+                    chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Yield the decoded text of a string field of the wrapper's inner document in chunks."""
+    return iter_field_text(iter_raw_content(file_path, chunk_size), field)
+
+
+def iter_text_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """Split text given in chunks into lines, keeping their newlines."""
+    pending = ''
+    for chunk in chunks:
+        lines = (pending + chunk).split('\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line + '\n'
+    if pending:
+        yield pending
+
+
+def iter_tool_records(file_path: str, chunk_size: int = CHUNK_SIZE,
+                      name_keys=RECORD_NAME_KEYS) -> Iterator[Dict[str, Any]]:
+    """Stream tool records out of a raw_content wrapper file."""
+    parser = RecordStreamParser(name_keys)
+    for text in iter_raw_content(file_path, chunk_size):
+        yield from parser.feed(text)
+    yield from parser.feed('', final=True)
+
+
+def iter_json_array(filepath: str, key: str = 'tools', chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """Yield the elements of the `key` array of a file's top-level JSON object.
+
+    Elements are decoded one at a time by the json module's decoder from a
+    buffer holding only the current element and the rest of the last chunk
+    read. The object's other members are decoded whole and skipped.
+    """
+    with open(filepath, 'r', encoding='utf-8') as f:
+        buffer, pos = '', 0
+        state = 'object'
+        while True:
+            pos = _JSON_SEPARATORS.match(buffer, pos).end()
+            if pos < len(buffer):
+                char = buffer[pos]
+                if state == 'object':
+                    if char != '{':
+                        raise ValueError("top level is not a JSON object")
+                    pos += 1
+                    state = 'key'
+                    continue
+                if (state == 'key' and char == '}') or (state == 'array' and char == ']'):
+                    return
+                if state == 'matched' and char == '[':
+                    pos += 1
+                    state = 'array'
+                    continue
+                try:
+                    value, end = _JSON_DECODER.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    end = len(buffer)
+                # A value running to the end of the buffer may continue in the next chunk
+                if end < len(buffer):
+                    pos = end
+                    if state == 'array':
+                        yield value
+                    elif state == 'key':
+                        state = 'matched' if value == key else 'value'
+                    else:
+                        state = 'key'
+                    continue
+
+            chunk = f.read(chunk_size)
+            if not chunk:
+                if pos < len(buffer):
+                    # Decode the last value or raise its error
+                    value, _ = _JSON_DECODER.raw_decode(buffer, pos)
+                    if state == 'array':
+                        yield value
+                return
+            buffer, pos = buffer[pos:] + chunk, 0
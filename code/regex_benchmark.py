@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Pathological-input performance harness for the extraction regexes in code/.
+
+Finds every regular expression the parsers use (literal patterns passed to
+re.*, module-level re.compile constants and pattern lists that are looped
+over), runs each one against generated worst-case inputs at growing sizes
+and reports how the matching time grows. Patterns whose time grows faster
+than linearly, or that do not finish within the time budget, are flagged,
+and the run exits with status 1 if any are.
+
+A compiled pattern is timed the way its code uses it: the methods called on
+the name it is bound to are collected, and a pattern only ever anchored
+with .match or .fullmatch is timed with that call instead of a full
+finditer scan.
+
+Usage:
+    python regex_benchmark.py [--max-size 10MB] [--timeout 30] [--json report.json]
+"""
+
+import argparse
+import ast
+import json
+import math
+import multiprocessing
+import os
+import re
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+CODE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+RE_FUNCTIONS = {'compile', 'search', 'match', 'fullmatch', 'findall', 'finditer', 'sub', 'subn', 'split'}
+
+# Calls that only try the pattern at one position
+ANCHORED_FUNCTIONS = ('match', 'fullmatch')
+
+# Exponent above which a pattern is reported as superlinear
+SUPERLINEAR_EXPONENT = 1.5
+
+# Measurements faster than this are too noisy to fit
+MIN_FIT_SECONDS = 0.002
+
+
+def _repeat_to(unit: str, size: int, prefix: str = '') -> str:
+    """Repeat a unit until the text reaches the requested size."""
+    count = max(1, (size - len(prefix)) // len(unit))
+    return prefix + unit * count
+
+
+# Worst-case input generators: size in characters -> text
+INPUT_GENERATORS: Dict[str, Callable[[int], str]] = {
+    # A quote that never closes
+    'unclosed_quote': lambda n: _repeat_to('a', n, '{"name": "'),
+    # Object fields with no closing brace, so [^}]*? runs to the end every time
+    'missing_braces': lambda n: _repeat_to('"name": "Tool", "link": "https://x.ai", ', n, '{'),
+    # Category sections whose tools array is never closed
+    'unclosed_arrays': lambda n: _repeat_to('"category": "Video", "tools": [{"name": "Tool", ', n),
+    # Bullet entries without the ": " separator or a blank-line terminator
+    'unterminated_bullets': lambda n: _repeat_to('- **Tool description ', n),
+    # Markdown links that never close
+    'unclosed_links': lambda n: _repeat_to('[Tool](https://tool.ai ', n),
+    # Runs of escapes and quotes
+    'escape_runs': lambda n: _repeat_to('\\"\\\\n', n, '"'),
+    # A well-formed scrape written on a single line
+    'single_line_scrape': lambda n: _repeat_to(
+        '{"name": "Tool", "title": "An AI tool.", "description": "Does things with AI.", '
+        '"offer_free_version": true, "link": "https://tool.ai", "category": "Video"}, ', n, '['),
+}
+
+
+class PatternSite:
+    """A regex found in the parsers, with every place that uses it."""
+
+    def __init__(self, pattern: str, flags: int):
+        self.pattern = pattern
+        self.flags = flags
+        # re functions and compiled-pattern methods the pattern is used with
+        self.functions: List[str] = []
+        self.locations: List[str] = []
+
+    @property
+    def key(self) -> Tuple[str, int]:
+        return (self.pattern, self.flags)
+
+    @property
+    def function(self) -> str:
+        """Call to time: the anchored one if that is all the code uses, else a full scan."""
+        used = [function for function in self.functions if function != 'compile']
+        if used and all(function in ANCHORED_FUNCTIONS for function in used):
+            return 'fullmatch' if all(function == 'fullmatch' for function in used) else 'match'
+        return 'finditer'
+
+
+def _evaluate_flags(node: Optional[ast.AST]) -> int:
+    """Evaluate an expression such as re.DOTALL | re.IGNORECASE."""
+    if node is None:
+        return 0
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitOr):
+        return _evaluate_flags(node.left) | _evaluate_flags(node.right)
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id == 're':
+        return int(getattr(re, node.attr, 0))
+    return 0
+
+
+def _flags_argument(call: ast.Call, function: str) -> Optional[ast.AST]:
+    """Return the flags argument of a re.* call, if any."""
+    for keyword in call.keywords:
+        if keyword.arg == 'flags':
+            return keyword.value
+    position = {'compile': 1, 'sub': 4, 'subn': 4, 'split': 3}.get(function, 2)
+    if len(call.args) > position:
+        return call.args[position]
+    return None
+
+
+def _string_values(node: ast.AST) -> List[str]:
+    """String constants of a literal, or of a list/tuple of literals."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return [node.value]
+    if isinstance(node, (ast.List, ast.Tuple)):
+        return [value for element in node.elts for value in _string_values(element)]
+    return []
+
+
+def _scope_bindings(scope: ast.AST) -> Dict[str, List[str]]:
+    """Map names bound to pattern literals in a scope, following for-loops."""
+    bindings: Dict[str, List[str]] = {}
+    for node in ast.walk(scope):
+        if isinstance(node, ast.Assign):
+            values = _string_values(node.value)
+            if values:
+                for target in node.targets:
+                    if isinstance(target, ast.Name):
+                        bindings.setdefault(target.id, []).extend(values)
+    for node in ast.walk(scope):
+        if (isinstance(node, ast.For) and isinstance(node.target, ast.Name)
+                and isinstance(node.iter, ast.Name) and node.iter.id in bindings):
+            bindings.setdefault(node.target.id, []).extend(bindings[node.iter.id])
+    return bindings
+
+
+def _compiled_methods(tree: ast.AST) -> Dict[str, List[str]]:
+    """Methods called on each name in a module, e.g. {'_STRING_BODY': ['match']}."""
+    methods: Dict[str, List[str]] = {}
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                and isinstance(node.func.value, ast.Name) and node.func.attr in RE_FUNCTIONS):
+            used = methods.setdefault(node.func.value.id, [])
+            if node.func.attr not in used:
+                used.append(node.func.attr)
+    return methods
+
+
+def _compiled_names(scope: ast.AST) -> Dict[int, List[str]]:
+    """Names each re.compile call in a scope is assigned to, keyed by the call's id()."""
+    names: Dict[int, List[str]] = {}
+    for node in ast.walk(scope):
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Call):
+            targets = [target.id for target in node.targets if isinstance(target, ast.Name)]
+            names.setdefault(id(node.value), []).extend(targets)
+    return names
+
+
+def discover_patterns(code_dir: str = CODE_DIR) -> List[PatternSite]:
+    """Find every regex used by the parsers in code_dir."""
+    sites: Dict[Tuple[str, int], PatternSite] = {}
+
+    for filename in sorted(os.listdir(code_dir)):
+        if not filename.endswith('.py') or filename == os.path.basename(__file__):
+            continue
+        with open(os.path.join(code_dir, filename), 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename)
+        methods = _compiled_methods(tree)
+        compiled_names = _compiled_names(tree)
+
+        scopes = [tree] + [node for node in ast.walk(tree)
+                           if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))]
+        for scope in scopes:
+            bindings = _scope_bindings(scope)
+            for node in ast.walk(scope):
+                if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                        and isinstance(node.func.value, ast.Name) and node.func.value.id == 're'
+                        and node.func.attr in RE_FUNCTIONS and node.args):
+                    continue
+                argument = node.args[0]
+                if isinstance(argument, ast.Name):
+                    patterns = bindings.get(argument.id, [])
+                elif isinstance(argument, ast.BinOp):
+                    # Patterns assembled at runtime, e.g. re.escape(x) + r'...'
+                    continue
+                else:
+                    patterns = _string_values(argument)
+
+                function = node.func.attr
+                flags = _evaluate_flags(_flags_argument(node, function))
+                if function == 'compile':
+                    names = compiled_names.get(id(node), [])
+                    # Unbound compiled patterns (passed on, stored in containers) count as scanned
+                    functions = [method for name in names for method in methods.get(name, [])] or ['finditer']
+                else:
+                    functions = [function]
+                for pattern in patterns:
+                    site = sites.get((pattern, flags))
+                    if site is None:
+                        site = sites[(pattern, flags)] = PatternSite(pattern, flags)
+                    site.functions.extend(used for used in functions if used not in site.functions)
+                    location = f"{filename}:{node.lineno}"
+                    if location not in site.locations:
+                        site.locations.append(location)
+
+    return list(sites.values())
+
+
+def _time_pattern(pattern: str, flags: int, function: str, text: str) -> float:
+    """Time one full scan of text with the pattern."""
+    regex = re.compile(pattern, flags)
+    start = time.perf_counter()
+    if function in ANCHORED_FUNCTIONS:
+        getattr(regex, function)(text)
+    else:
+        for _ in regex.finditer(text):
+            pass
+    return time.perf_counter() - start
+
+
+def _run_series(pattern: str, flags: int, function: str, input_name: str,
+                sizes: List[int], results) -> None:
+    """Worker: time the pattern at each size, reporting as it goes."""
+    generator = INPUT_GENERATORS[input_name]
+    for size in sizes:
+        results.put((size, _time_pattern(pattern, flags, function, generator(size))))
+    results.put(None)
+
+
+def growth_exponent(timings: List[Tuple[int, float]]) -> Optional[float]:
+    """Least-squares slope of log(time) against log(size)."""
+    points = [(math.log(size), math.log(seconds)) for size, seconds in timings
+              if seconds >= MIN_FIT_SECONDS]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    denominator = sum((x - mean_x) ** 2 for x, _ in points)
+    if denominator == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / denominator
+
+
+def benchmark_site(site: PatternSite, input_name: str, sizes: List[int], timeout: float) -> Dict[str, Any]:
+    """Time one pattern on one input family in a killable subprocess."""
+    results = multiprocessing.Queue()
+    worker = multiprocessing.Process(
+        target=_run_series,
+        args=(site.pattern, site.flags, site.function, input_name, sizes, results)
+    )
+    worker.start()
+
+    timings: List[Tuple[int, float]] = []
+    deadline = time.monotonic() + timeout
+    timed_out = False
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            timed_out = True
+            break
+        try:
+            item = results.get(timeout=remaining)
+        except Exception:
+            timed_out = True
+            break
+        if item is None:
+            break
+        timings.append(item)
+
+    if timed_out:
+        worker.terminate()
+    worker.join()
+
+    exponent = growth_exponent(timings)
+    superlinear = timed_out or (exponent is not None and exponent > SUPERLINEAR_EXPONENT)
+    return {
+        'input': input_name,
+        'timings': [{'size': size, 'seconds': round(seconds, 6)} for size, seconds in timings],
+        'timed_out': timed_out,
+        'growth_exponent': round(exponent, 2) if exponent is not None else None,
+        'superlinear': superlinear
+    }
+
+
+def parse_size(value: str) -> int:
+    """Parse sizes such as 4096, 64KB or 10MB."""
+    match = re.fullmatch(r'\s*(\d+)\s*([kKmM]?)[bB]?\s*', value)
+    if not match:
+        raise argparse.ArgumentTypeError(f"Invalid size: {value}")
+    multiplier = {'': 1, 'k': 1024, 'm': 1024 * 1024}[match.group(2).lower()]
+    return int(match.group(1)) * multiplier
+
+
+def build_sizes(min_size: int, max_size: int, factor: int = 4) -> List[int]:
+    """Geometric series of input sizes from min_size up to max_size."""
+    sizes = []
+    size = min_size
+    while size < max_size:
+        sizes.append(size)
+        size *= factor
+    sizes.append(max_size)
+    return sizes
+
+
+def main() -> int:
+    """Benchmark every discovered pattern and report superlinear ones; returns the exit status."""
+    parser = argparse.ArgumentParser(description="Time the code/ regexes on worst-case inputs")
+    parser.add_argument('--min-size', type=parse_size, default=parse_size('1KB'))
+    parser.add_argument('--max-size', type=parse_size, default=parse_size('1MB'),
+                        help="largest input size, e.g. 10MB for the nightly check")
+    parser.add_argument('--timeout', type=float, default=20.0,
+                        help="seconds allowed per pattern and input family")
+    parser.add_argument('--inputs', nargs='+', choices=sorted(INPUT_GENERATORS),
+                        default=sorted(INPUT_GENERATORS))
+    parser.add_argument('--json', dest='json_path', help="write the full report to this file")
+    args = parser.parse_args()
+
+    sites = discover_patterns()
+    sizes = build_sizes(args.min_size, args.max_size)
+    print(f"Found {len(sites)} distinct patterns in {CODE_DIR}")
+    print(f"Input sizes: {', '.join(str(size) for size in sizes)}")
+
+    report = []
+    flagged = 0
+    for index, site in enumerate(sites, 1):
+        print(f"\n[{index}/{len(sites)}] {site.pattern[:90]!r}")
+        print(f"  used at: {', '.join(site.locations)} (timed with {site.function})")
+        results = []
+        for input_name in args.inputs:
+            result = benchmark_site(site, input_name, sizes, args.timeout)
+            results.append(result)
+
+            largest = result['timings'][-1] if result['timings'] else None
+            status = 'TIMEOUT' if result['timed_out'] else (
+                'SUPERLINEAR' if result['superlinear'] else 'ok')
+            exponent = result['growth_exponent']
+            exponent_text = f"n^{exponent:.2f}" if exponent is not None else "n/a"
+            largest_text = f"{largest['seconds']:.4f}s @ {largest['size']}" if largest else "no result"
+            print(f"  {input_name:22s} {exponent_text:>8s}  {largest_text:28s} {status}")
+
+        superlinear = any(result['superlinear'] for result in results)
+        flagged += superlinear
+        report.append({
+            'pattern': site.pattern,
+            'flags': site.flags,
+            'function': site.function,
+            'locations': site.locations,
+            'superlinear': superlinear,
+            'results': results
+        })
+
+    print(f"\n{flagged} of {len(sites)} patterns show superlinear growth")
+    for entry in report:
+        if entry['superlinear']:
+            print(f"  {', '.join(entry['locations'])}: {entry['pattern'][:80]!r}")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'sizes': sizes, 'patterns': report}, f, indent=2, ensure_ascii=False)
+        print(f"\nReport saved to {args.json_path}")
+
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
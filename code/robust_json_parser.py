@@ -8,63 +8,26 @@ import json
 import re
 from typing import Dict, List, Any, Optional
 
-def fix_json_escape_issues(content: str) -> str:
-    """Fix common JSON escape character issues"""
-    # Fix backslash issues in Japanese text and other problematic strings
-    content = re.sub(r'\\(?!["\\/bfnrtux])', r'\\\\', content)
-    
-    # Fix specific problematic patterns we've seen
-    content = content.replace('\\*', '*')
-    content = content.replace('\\"', '"')
-    
-    # Fix unterminated strings by finding and completing them
-    # Look for strings that start with " but don't have a closing "
-    lines = content.split('\n')
-    fixed_lines = []
-    
-    for line in lines:
-        # If line has unmatched quotes, try to fix it
-        quote_count = line.count('"') - line.count('\\"')
-        if quote_count % 2 != 0:
-            # Odd number of quotes - try to close the string properly
-            if line.strip().endswith(',') or line.strip().endswith('{') or line.strip().endswith('}'):
-                line = line.rstrip() + '"'
-            elif not line.strip().endswith('"'):
-                line = line + '"'
-        fixed_lines.append(line)
-    
-    return '\n'.join(fixed_lines)
+from raw_content_stream import iter_tool_records
+from tool_tokenizer import recover_tool_records
 
 def extract_tools_with_regex(content: str) -> List[Dict[str, Any]]:
-    """Extract tools using regex patterns when JSON parsing fails"""
+    """Extract tools in a single tokenizer pass when JSON parsing fails"""
     tools = []
     
-    # Pattern to match complete tool objects
-    tool_pattern = r'\{\s*"name":\s*"([^"]*)"[^}]*?"title":\s*"([^"]*)"[^}]*?"description":\s*"([^"]*)"[^}]*?"offer_free_version":\s*([^,}]*)[^}]*?"link":\s*"([^"]*)"[^}]*?\}'
-    
-    matches = re.findall(tool_pattern, content, re.DOTALL)
-    
-    for match in matches:
-        name, title, description, free_version, link = match
-        
-        # Clean up the free_version value
-        free_version = free_version.strip().strip('"').strip(',')
-        if free_version.lower() == 'true':
-            free_version = 'Yes'
-        elif free_version.lower() == 'false':
-            free_version = 'No'
-        elif free_version.lower() in ['unknown', '"unknown"']:
-            free_version = 'Unknown'
-        else:
-            free_version = 'Unknown'
+    for record in recover_tool_records(content, name_keys=('name',)):
+        # Only complete tool objects carry a link field
+        if 'link' not in record:
+            continue
         
+        category = record.get('category')
         tool = {
-            'name': name.strip(),
-            'title': title.strip(),
-            'description': description.strip(),
-            'link': link.strip(),
-            'free_version': free_version,
-            'category': 'Unknown'  # Will be determined by context
+            'name': str(record.get('name') or '').strip(),
+            'title': str(record.get('title') or '').strip(),
+            'description': str(record.get('description') or '').strip(),
+            'link': str(record.get('link') or '').strip(),
+            'free_version': normalize_free_version(record.get('offer_free_version')),
+            'category': category if isinstance(category, str) and category else 'Unknown'
         }
         tools.append(tool)
     
@@ -74,70 +37,53 @@ def extract_categories_and_tools(content: str) -> Dict[str, List[Dict]]:
     """Extract tools organized by categories"""
     result = {}
     
-    # Look for category sections in the format: "Category Name": [...]
-    category_pattern = r'"([^"]+)":\s*\[\s*\{([^]]+)\]\s*\}'
-    
-    category_matches = re.finditer(category_pattern, content, re.DOTALL)
-    
-    for category_match in category_matches:
-        category_name = category_match.group(1)
-        category_content = category_match.group(2)
-        
-        # Skip if this doesn't look like a tool category
-        if not re.search(r'"name":', category_content):
-            continue
-        
-        # Extract tools from this category
-        tools = extract_tools_with_regex('{' + category_content + '}')
-        
-        # Set category for all tools
-        for tool in tools:
-            tool['category'] = category_name
-        
-        if tools:
-            result[category_name] = tools
+    for tool in extract_tools_with_regex(content):
+        # Tools outside any category section are not grouped
+        if tool['category'] != 'Unknown':
+            result.setdefault(tool['category'], []).append(tool)
     
     return result
 
+def normalize_free_version(value: Any) -> str:
+    """Map offer_free_version values to Yes/No/Unknown"""
+    value = str(value).strip().strip('"').lower()
+    if value in ('true', 'yes', '✅'):
+        return 'Yes'
+    if value in ('false', 'no', '❌'):
+        return 'No'
+    return 'Unknown'
+
 def extract_from_chunked_content(file_path: str, chunk_size: int = 20000) -> List[Dict[str, Any]]:
-    """Extract tools by reading file in chunks to handle large files"""
-    all_tools = []
+    """Extract tools by streaming the file in chunks to handle large files"""
+    seen_names = set()
+    unique_tools = []
     
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+            is_wrapped = f.read(len('{"raw_content":')) == '{"raw_content":'
         
-        # Try to extract the JSON content from the wrapper
-        if content.startswith('{"raw_content":'):
-            # This is a wrapped JSON - extract the inner content
-            try:
-                wrapper = json.loads(content)
-                if 'raw_content' in wrapper:
-                    content = wrapper['raw_content']
-                    # Now we have the actual content, but it might still be JSON-encoded
-                    if content.startswith('{'):
-                        try:
-                            content = json.loads(content)
-                            if isinstance(content, dict) and 'data' in content:
-                                content = json.dumps(content)
-                        except:
-                            pass  # Content is already a string
-            except:
-                pass  # Fall back to regex extraction
-        
-        # Use regex to find tool entries
-        tools = extract_tools_with_regex(content)
-        all_tools.extend(tools)
-        
-        # Also try to extract category-organized data
-        categories_tools = extract_categories_and_tools(content)
-        for category, category_tools in categories_tools.items():
-            all_tools.extend(category_tools)
+        if is_wrapped:
+            # Decode the inner document straight from the wrapper, one record at a time
+            records = (
+                {
+                    'name': str(record.get('name', '')).strip(),
+                    'title': str(record.get('title') or '').strip(),
+                    'description': str(record.get('description') or '').strip(),
+                    'link': str(record.get('link') or '').strip(),
+                    'free_version': normalize_free_version(record.get('offer_free_version')),
+                    'category': record.get('category') or 'Unknown'
+                }
+                for record in iter_tool_records(file_path, chunk_size)
+            )
+        else:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            records = extract_tools_with_regex(content)
+            for category_tools in extract_categories_and_tools(content).values():
+                records.extend(category_tools)
         
         # Remove duplicates based on name
-        seen_names = set()
-        unique_tools = []
-        for tool in all_tools:
+        for tool in records:
             name_key = tool['name'].lower().strip()
             if name_key and name_key not in seen_names:
                 seen_names.add(name_key)
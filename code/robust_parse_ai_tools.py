@@ -8,6 +8,10 @@ import os
 import re
 from typing import List, Dict, Any
 
+from parallel_extraction import ExtractionTask, merge_results, parse_options, run_extraction
+from parse_cache import ParseCache
+from tool_tokenizer import iter_markdown_links, recover_tool_records
+
 def safe_json_loads(content: str) -> Dict[str, Any]:
     """Safely load JSON content with error handling."""
     try:
@@ -17,43 +21,42 @@ def safe_json_loads(content: str) -> Dict[str, Any]:
         return {}
 
 def extract_tools_from_raw_content(content: str, source: str) -> List[Dict[str, Any]]:
-    """Extract tools from raw content using regex patterns."""
+    """Extract tools from raw content in a single linear pass."""
     tools = []
     
-    # Pattern to match tool entries in various formats
-    patterns = [
-        # Pattern for name, description, link structure
-        r'"name":\s*"([^"]+)"[^}]*"description":\s*"([^"]*)"[^}]*"link":\s*"([^"]*)"[^}]*"category":\s*"([^"]*)"',
-        # Alternative pattern
-        r'"name":\s*"([^"]+)"[^}]*"link":\s*"([^"]*)"[^}]*"description":\s*"([^"]*)"[^}]*"category":\s*"([^"]*)"',
-        # Pattern for markdown-like structure
-        r'\[([^\]]+)\]\(([^)]+)\)[^-]*-\s*([^\\n]+)',
-    ]
+    # JSON tool objects, recovered even from broken or truncated content
+    for record in recover_tool_records(content, name_keys=('name',)):
+        if not all(key in record for key in ('description', 'link', 'category')):
+            continue
+        
+        name = str(record.get('name') or '').strip()
+        description = str(record.get('description') or '').strip()
+        link = str(record.get('link') or '').strip()
+        category = record.get('category')
+        category = category.strip() if isinstance(category, str) else 'Unknown'
+        
+        if name and link and not link.startswith('null'):
+            tools.append({
+                'name': name,
+                'description': description,
+                'link': link,
+                'category': category,
+                'source': source
+            })
     
-    for pattern in patterns:
-        matches = re.findall(pattern, content, re.IGNORECASE | re.DOTALL)
-        for match in matches:
-            if len(match) >= 3:
-                if len(match) == 4:  # name, description, link, category
-                    name, description, link, category = match
-                elif len(match) == 3:  # name, link, description (markdown style)
-                    name, link, description = match
-                    category = "Unknown"
-                
-                # Clean up the extracted data
-                name = name.strip()
-                description = description.strip()
-                link = link.strip()
-                category = category.strip() if len(match) == 4 else "Unknown"
-                
-                if name and link and not link.startswith('null'):
-                    tools.append({
-                        'name': name,
-                        'description': description,
-                        'link': link,
-                        'category': category,
-                        'source': source
-                    })
+    # Markdown-like structure: [Name](link) - description
+    for name, link, description in iter_markdown_links(content):
+        name = name.strip()
+        link = link.strip()
+        
+        if name and link and not link.startswith('null'):
+            tools.append({
+                'name': name,
+                'description': description.strip(),
+                'link': link,
+                'category': "Unknown",
+                'source': source
+            })
     
     return tools
 
@@ -181,7 +184,20 @@ def manual_extraction_patterns(content: str, source: str) -> List[Dict[str, Any]
     
     return tools
 
-def main():
+def extract_repository(file_path: str, source: str) -> List[Dict[str, Any]]:
+    """Extract tools from one repository file, falling back to manual patterns."""
+    tools = extract_from_file_content(file_path, source)
+    
+    # If no tools found, try manual extraction
+    if not tools:
+        print(f"  No structured tools found in {os.path.basename(file_path)}, trying manual extraction...")
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        tools = manual_extraction_patterns(content, source)
+    
+    return tools
+
+def main(workers: int = None, use_cache: bool = True):
     """Main function to process all repositories and create consolidated JSON."""
     print("Starting AI tools extraction with robust parsing...")
     
@@ -195,29 +211,22 @@ def main():
         ('jamesmurdza_awesome_ai_devtools.json', 'jamesmurdza/awesome-ai-devtools')
     ]
     
-    all_tools = []
     extract_dir = '/workspace/extract'
     
-    # Process each repository
+    # Process the repositories in parallel; results come back in list order
+    tasks = []
     for filename, source in repositories:
         file_path = os.path.join(extract_dir, filename)
-        print(f"Processing {filename}...")
-        
         if os.path.exists(file_path):
-            tools = extract_from_file_content(file_path, source)
-            
-            # If no tools found, try manual extraction
-            if not tools:
-                print(f"  No structured tools found, trying manual extraction...")
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                tools = manual_extraction_patterns(content, source)
-            
-            all_tools.extend(tools)
-            print(f"  Extracted {len(tools)} tools from {filename}")
+            tasks.append(ExtractionTask(filename, extract_repository, (file_path, source)))
         else:
             print(f"  File not found: {filename}")
     
+    print(f"Processing {len(tasks)} repositories...")
+    cache = ParseCache(enabled=use_cache)
+    all_tools = merge_results(run_extraction(tasks, workers, cache))
+    print(cache.summary())
+    
     print(f"Total tools extracted: {len(all_tools)}")
     
     # Clean and deduplicate tools
@@ -300,4 +309,5 @@ def main():
         print(f"Error saving to {output_file}: {e}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    options = parse_options()
+    main(options.workers, not options.no_cache)
\ No newline at end of file
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+In-process pipeline of stages connected by bounded queues.
+
+The consolidation steps used to run one after another, each finishing
+before the next one started. Pipeline runs every stage in its own thread,
+reading from the previous stage's queue and writing to the next one's, so
+reading sources, deduplication, categorization and scoring overlap and the
+first tools reach the consumer while later ones are still being parsed.
+
+A stage is a function from an iterator of items to an iterable of items,
+the same shape as the generator chain in consolidate_ai_tools, so a
+generator function works as a stage unchanged. Items move between stages
+in lists of batch_size, to keep queue and thread-switch overhead per item
+small, and each queue holds at most queue_size batches: a stage that gets
+ahead blocks until the next one catches up (backpressure), so memory is
+bounded by the queues whatever the speed of each stage.
+
+Every stage records a StageStats: items in and out, wall time, and the
+time spent waiting for input and for room in its output queue. Wall time
+minus the waits is the stage's busy time; the stage with the most busy
+time is the bottleneck, and in the steady state the pipeline runs at its
+pace. report() formats the table.
+
+Stages are threads, so pure-Python stages share the GIL: they overlap with
+file reads, compression and each other's waits, but CPU-bound stages
+still take turns (see parallel_extraction for process-level parallelism).
+
+Usage:
+    python stage_pipeline.py [--count 20000] [--delay 0.05]
+"""
+
+import argparse
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Items per batch passed between stages
+BATCH_SIZE = 500
+# Batches each queue holds before the stage writing to it blocks
+QUEUE_SIZE = 8
+# Seconds between checks for a cancelled pipeline while blocked on a queue
+POLL_INTERVAL = 0.1
+
+_END = object()
+
+Stage = Tuple[str, Callable[[Iterator[Any]], Iterable[Any]]]
+
+
+class _Cancelled(BaseException):
+    """Raised in a stage blocked on a queue once the pipeline is cancelled.
+
+    A BaseException, so stages that catch Exception to skip bad records
+    do not swallow it.
+    """
+
+
+class StageStats:
+    """Counters and timings of one pipeline stage."""
+
+    __slots__ = ('name', 'items_in', 'items_out', 'seconds', 'input_wait', 'output_wait')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items_in = 0
+        self.items_out = 0
+        self.seconds = 0.0
+        self.input_wait = 0.0
+        self.output_wait = 0.0
+
+    @property
+    def busy(self) -> float:
+        """Seconds spent working rather than waiting on a queue."""
+        return max(0.0, self.seconds - self.input_wait - self.output_wait)
+
+    @property
+    def throughput(self) -> float:
+        """Items out per busy second: what the stage could sustain on its own."""
+        return self.items_out / self.busy if self.busy else 0.0
+
+
+class Pipeline:
+    """Runs stages in threads, connected by bounded queues.
+
+    Iterate run(source) to get the last stage's output in the calling
+    thread; that consumer is timed as the final stage, sink_name. An
+    exception in any stage cancels the others and is re-raised to the
+    consumer, and a consumer that stops early cancels the stages too.
+    """
+
+    def __init__(self, stages: Sequence[Stage], queue_size: int = QUEUE_SIZE, batch_size: int = BATCH_SIZE):
+        self.stages = list(stages)
+        self.queue_size = max(1, queue_size)
+        self.batch_size = max(1, batch_size)
+        self.stats: List[StageStats] = []
+        self._cancelled = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._error_lock = threading.Lock()
+
+    def run(self, source: Iterable[Any], source_name: str = 'source', sink_name: str = 'output') -> Iterator[Any]:
+        """Items from source through every stage, in order."""
+        self._cancelled.clear()
+        self._error = None
+        self.stats = [StageStats(source_name)] + [StageStats(name) for name, _ in self.stages]
+        queues = [queue.Queue(self.queue_size) for _ in self.stats]
+        threads = [threading.Thread(target=self._run_stage, name=f"pipeline-{source_name}", daemon=True,
+                                    args=(self.stats[0], lambda _: source, None, queues[0]))]
+        for index, (name, function) in enumerate(self.stages, 1):
+            threads.append(threading.Thread(target=self._run_stage, name=f"pipeline-{name}", daemon=True,
+                                            args=(self.stats[index], function, queues[index - 1], queues[index])))
+        for thread in threads:
+            thread.start()
+        return self._consume(queues[-1], threads, StageStats(sink_name))
+
+    def _consume(self, inbox: queue.Queue, threads: List[threading.Thread], stats: StageStats) -> Iterator[Any]:
+        self.stats.append(stats)
+        start = time.perf_counter()
+        try:
+            yield from self._receive(inbox, stats)
+        except _Cancelled:
+            pass
+        finally:
+            self._cancelled.set()
+            for thread in threads:
+                thread.join()
+            stats.items_out = stats.items_in
+            stats.seconds = time.perf_counter() - start
+        if self._error is not None:
+            raise self._error
+
+    def _run_stage(self, stats: StageStats, function: Callable, inbox: Optional[queue.Queue],
+                   outbox: queue.Queue):
+        start = time.perf_counter()
+        try:
+            batch = []
+            for item in function(self._receive(inbox, stats) if inbox is not None else None):
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    self._put(outbox, batch, stats)
+                    stats.items_out += len(batch)
+                    batch = []
+            if batch:
+                self._put(outbox, batch, stats)
+                stats.items_out += len(batch)
+            self._put(outbox, _END, stats)
+        except _Cancelled:
+            pass
+        except BaseException as error:
+            with self._error_lock:
+                if self._error is None:
+                    self._error = error
+            self._cancelled.set()
+        finally:
+            stats.seconds = time.perf_counter() - start
+
+    def _receive(self, inbox: queue.Queue, stats: StageStats) -> Iterator[Any]:
+        while True:
+            batch = self._get(inbox, stats)
+            if batch is _END:
+                return
+            stats.items_in += len(batch)
+            yield from batch
+
+    def _get(self, inbox: queue.Queue, stats: StageStats) -> Any:
+        start = time.perf_counter()
+        try:
+            while True:
+                try:
+                    return inbox.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    if self._cancelled.is_set():
+                        raise _Cancelled()
+        finally:
+            stats.input_wait += time.perf_counter() - start
+
+    def _put(self, outbox: queue.Queue, batch: Any, stats: StageStats):
+        start = time.perf_counter()
+        try:
+            while True:
+                try:
+                    outbox.put(batch, timeout=POLL_INTERVAL)
+                    return
+                except queue.Full:
+                    if self._cancelled.is_set():
+                        raise _Cancelled()
+        finally:
+            stats.output_wait += time.perf_counter() - start
+
+    def bottleneck(self) -> Optional[StageStats]:
+        """The stage with the most busy time in the last run."""
+        return max(self.stats, key=lambda stats: stats.busy, default=None)
+
+    def report(self) -> List[str]:
+        """Per-stage throughput table of the last run, one line per row."""
+        lines = [f"{'stage':<12} {'in':>9} {'out':>9} {'busy s':>8} {'wait in':>8} {'wait out':>8} {'items/s':>10}"]
+        for stats in self.stats:
+            lines.append(f"{stats.name:<12} {stats.items_in:>9,} {stats.items_out:>9,} {stats.busy:>8.2f} "
+                         f"{stats.input_wait:>8.2f} {stats.output_wait:>8.2f} {stats.throughput:>10,.0f}")
+        slowest = self.bottleneck()
+        if slowest is not None:
+            lines.append(f"Bottleneck: {slowest.name} ({slowest.busy:.2f}s busy)")
+        return lines
+
+
+def run_stages(source: Iterable[Any], stages: Sequence[Stage]) -> Iterator[Any]:
+    """The same stages chained as plain generators in the calling thread."""
+    items = iter(source)
+    for _, function in stages:
+        items = iter(function(items))
+    return items
+
+
+def benchmark(count: int, delay: float, batch_size: int = BATCH_SIZE) -> dict:
+    """Three stages that each wait `delay` seconds per batch, as file and
+    network reads do, run one after another and as a pipeline."""
+
+    def slow_stage(items: Iterator[int]) -> Iterator[int]:
+        for index, item in enumerate(items):
+            if index % batch_size == 0:
+                time.sleep(delay)
+            yield item
+
+    stages = [('read', slow_stage), ('parse', slow_stage), ('write', slow_stage)]
+
+    start = time.perf_counter()
+    sequential = list(run_stages(range(count), stages))
+    sequential_seconds = time.perf_counter() - start
+
+    pipeline = Pipeline(stages, batch_size=batch_size)
+    start = time.perf_counter()
+    pipelined = list(pipeline.run(range(count)))
+    pipelined_seconds = time.perf_counter() - start
+
+    return {
+        'count': count,
+        'sequential_seconds': sequential_seconds,
+        'pipelined_seconds': pipelined_seconds,
+        'slowest_stage_seconds': pipeline.bottleneck().busy,
+        'report': pipeline.report(),
+        'matches': pipelined == sequential
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pipelined stages against running them in sequence")
+    parser.add_argument('--count', type=int, default=20_000, help="items passed through the stages")
+    parser.add_argument('--delay', type=float, default=0.05, help="seconds each stage waits per batch")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="items per batch between stages")
+    options = parser.parse_args()
+
+    result = benchmark(options.count, options.delay, options.batch_size)
+    print(f"Passed {result['count']:,} items through 3 stages")
+    print(f"  in sequence: {result['sequential_seconds']:.2f}s")
+    print(f"  pipelined: {result['pipelined_seconds']:.2f}s "
+          f"(slowest stage {result['slowest_stage_seconds']:.2f}s busy)")
+    for line in result['report']:
+        print(f"    {line}")
+    print("✓ Same items as in sequence" if result['matches'] else "✗ Items differ from the sequence")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Persistent SQLite registry of canonical tools, merged one source at a time.
+
+Rebuilding the catalogue reloads and deduplicates every source on each
+refresh. ToolRegistry keeps the deduplicated tools in an SQLite file
+instead, and merge() folds in one source batch using only indexed lookups,
+so its cost follows the size of the batch, not of the registry.
+
+An incoming tool is the same as a registered one when, in this order:
+
+    identity   its lowercased name and domain block match (unique index,
+               the exact dedup key of consolidate_ai_tools)
+    link       its canonical URL matches (unique index; tools without a
+               link store NULL and are never matched on it)
+    near       a MinHash near-duplicate of its name or description is
+               registered (see near_duplicates); the LSH bands of every
+               registered tool are rows of an indexed table, so candidates
+               are one query away
+
+A matched tool keeps its first listing's fields and gains a provenance row
+for the source; the number of distinct sources listing it feeds its
+popularity score. Matching on canonical URLs, and counting the sources of
+near-duplicates as listings, make the registry slightly stricter than
+consolidate_ai_tools' rebuild (1,789 against 1,808 unique tools on the
+bundled sources). Unmatched tools are inserted, categorized and scored.
+Only the tools a batch touched are rescored. Every source also records the
+digest of the file it came from, so unchanged sources can be skipped.
+
+Tools are never removed: the registry accumulates every source merged into
+it. Delete the file to rebuild from scratch, e.g. after changing the
+near-duplicate settings, since band hashes depend on them.
+
+Usage:
+    python tool_registry.py [--count 100000] [--batch 2000]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import string
+import struct
+import tempfile
+import time
+from array import array
+from collections import namedtuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from domain_blocking import blocking_key
+from near_duplicates import NearDuplicateIndex, link_agreement, link_site, similarity, stable_hash
+from popularity_scoring import default_scorer
+from url_canonical import canonicalize
+
+REGISTRY_FILE = os.environ.get('TOOL_REGISTRY', 'data/tool_registry.db')
+
+SCHEMA_VERSION = 3
+# Tools looked up per query when rescoring or reading back
+QUERY_BATCH = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tools (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    description TEXT NOT NULL,
+    link TEXT,
+    domain TEXT NOT NULL,
+    block TEXT NOT NULL,
+    category TEXT NOT NULL,
+    source TEXT NOT NULL,
+    listings INTEGER NOT NULL DEFAULT 1,
+    popularity_score REAL NOT NULL DEFAULT 0,
+    name_signature BLOB,
+    description_signature BLOB
+);
+CREATE UNIQUE INDEX IF NOT EXISTS tools_identity ON tools (name_key, block);
+CREATE UNIQUE INDEX IF NOT EXISTS tools_link ON tools (link);
+CREATE INDEX IF NOT EXISTS tools_domain ON tools (domain);
+
+CREATE TABLE IF NOT EXISTS bands (
+    bucket INTEGER NOT NULL,
+    tool_id INTEGER NOT NULL,
+    PRIMARY KEY (bucket, tool_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS provenance (
+    tool_id INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    name TEXT NOT NULL,
+    link TEXT NOT NULL,
+    match TEXT NOT NULL,
+    PRIMARY KEY (tool_id, source)
+);
+CREATE INDEX IF NOT EXISTS provenance_source ON provenance (source);
+
+CREATE TABLE IF NOT EXISTS sources (
+    source TEXT PRIMARY KEY,
+    digest TEXT,
+    tools INTEGER NOT NULL
+);
+"""
+
+# Name or description, band number, band hash
+_BUCKET = struct.Struct('<BBq')
+
+MergeResult = namedtuple('MergeResult', ['source', 'tools', 'added', 'matched', 'seconds'])
+
+
+def _text(tool: Any, key: str) -> str:
+    value = tool.get(key, '')
+    if isinstance(value, list):
+        return ', '.join(str(item) for item in value)
+    return value if isinstance(value, str) else str(value or '')
+
+
+def _signature(blob: Optional[bytes]) -> Optional[array]:
+    if blob is None:
+        return None
+    signature = array('I')
+    signature.frombytes(blob)
+    return signature
+
+
+def bucket_keys(bands: Tuple[Optional[List[int]], Optional[List[int]]]) -> List[int]:
+    """One integer per LSH bucket of a tool's (name bands, description bands).
+
+    Name or description, band number and band hash fold into a single
+    key, so the bucket lookup is one indexed IN query (SQLite does not use
+    an index for row-value IN lists). A rare collision only adds a
+    candidate, which the similarity check then rejects. The keys are
+    stored, so they are stable digests, not hash().
+    """
+    return [stable_hash(_BUCKET.pack(kind, band, band_hash)) for kind, kind_bands in enumerate(bands)
+            if kind_bands is not None for band, band_hash in enumerate(kind_bands)]
+
+
+def _chunks(values: List[Any], size: int = QUERY_BATCH) -> Iterator[List[Any]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class ToolRegistry:
+    """Deduplicated tools in an SQLite file, with per-source provenance."""
+
+    COLUMNS = ('id', 'name', 'description', 'link', 'domain', 'category', 'source', 'listings', 'popularity_score')
+    # Link-less tools store NULL, so the unique link index holds any number of them
+    _SELECT = ', '.join("COALESCE(link, '')" if column == 'link' else column for column in COLUMNS)
+
+    def __init__(self, path: str = REGISTRY_FILE, fuzzy: bool = True,
+                 matcher: Optional[NearDuplicateIndex] = None):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.fuzzy = fuzzy
+        self.matcher = matcher or NearDuplicateIndex()
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        version = self.connection.execute('PRAGMA user_version').fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            raise ValueError(f"{path} has registry schema {version}, expected {SCHEMA_VERSION}; "
+                             f"delete it to rebuild")
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+            self.connection.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
+
+    def __enter__(self) -> 'ToolRegistry':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute('SELECT COUNT(*) FROM tools').fetchone()[0]
+
+    def source_digest(self, source: str) -> Optional[str]:
+        """Digest recorded by the last merge of source, if any."""
+        row = self.connection.execute('SELECT digest FROM sources WHERE source = ?', (source,)).fetchone()
+        return row[0] if row else None
+
+    def _find(self, name_key: str, block: str, link: str,
+              signatures: Tuple[Optional[array], Optional[array]],
+              bands: Tuple[Optional[List[int]], Optional[List[int]]]) -> Tuple[Optional[int], str]:
+        """Id of the registered tool an incoming one matches and how, or (None, 'new')."""
+        execute = self.connection.execute
+        row = execute('SELECT id FROM tools WHERE name_key = ? AND block = ?', (name_key, block)).fetchone()
+        if row:
+            return row[0], 'identity'
+        if link:
+            row = execute('SELECT id FROM tools WHERE link = ?', (link,)).fetchone()
+            if row:
+                return row[0], 'link'
+        if not self.fuzzy:
+            return None, 'new'
+
+        keys = bucket_keys(bands)
+        if not keys:
+            return None, 'new'
+        candidates = execute(
+            f'SELECT id, link, name_signature, description_signature FROM tools WHERE id IN '
+            f'(SELECT tool_id FROM bands WHERE bucket IN ({",".join("?" * len(keys))}))', keys).fetchall()
+
+        name_signature, description_signature = signatures
+        best = None
+        site = link_site(link)
+        for tool_id, other_link, other_name, other_description in candidates:
+            name_similarity = similarity(name_signature, _signature(other_name))
+            description_similarity = similarity(description_signature, _signature(other_description))
+            links = link_agreement(site, link_site(other_link or ''))
+            if self.matcher.is_match(name_similarity, description_similarity, links):
+                # Same preference as NearDuplicateIndex: most similar, then earliest
+                rank = (-(name_similarity + description_similarity), tool_id)
+                if best is None or rank < best:
+                    best = rank
+        return (best[1], 'near') if best else (None, 'new')
+
+    def merge(self, source: str, tools: Iterable[Any], categorizer: Any = None,
+              digest: Optional[str] = None) -> MergeResult:
+        """Fold one source's tools into the registry in a single transaction.
+
+        tools are dicts, or anything with a dict-style get(), with name,
+        description, link and category. New tools are categorized with
+        categorizer.categorize_many when one is given, otherwise they keep
+        their source category. Every tool the batch added or listed again
+        is rescored.
+        """
+        start = time.perf_counter()
+        execute = self.connection.execute
+        count = 0
+        added: List[Tuple[int, Any]] = []
+        relisted: List[int] = []
+        with self.connection:
+            for tool in tools:
+                count += 1
+                name = _text(tool, 'name')
+                description = _text(tool, 'description')
+                canonical = canonicalize(_text(tool, 'link'))
+                name_key = name.lower().strip()
+                block = blocking_key(canonical.url)
+                signatures = self.matcher.signatures(name, description)
+                bands = self.matcher.bands(*signatures)
+
+                tool_id, match = self._find(name_key, block, canonical.url, signatures, bands)
+                if tool_id is None:
+                    tool_id = execute(
+                        'INSERT INTO tools (name, name_key, description, link, domain, block, category, source, '
+                        'name_signature, description_signature) VALUES (?,?,?,?,?,?,?,?,?,?)',
+                        (name, name_key, description, canonical.url or None, canonical.domain, block,
+                         _text(tool, 'category'), source,
+                         *(signature.tobytes() if signature is not None else None for signature in signatures))
+                    ).lastrowid
+                    self.connection.executemany('INSERT OR IGNORE INTO bands VALUES (?,?)',
+                                                [(key, tool_id) for key in bucket_keys(bands)])
+                    added.append((tool_id, tool))
+
+                listed = execute('INSERT OR IGNORE INTO provenance VALUES (?,?,?,?,?)',
+                                 (tool_id, source, name, canonical.url, match)).rowcount
+                if listed and match != 'new':
+                    execute('UPDATE tools SET listings = listings + 1 WHERE id = ?', (tool_id,))
+                    relisted.append(tool_id)
+
+            if added and categorizer is not None:
+                categories = categorizer.categorize_many([tool for _, tool in added])
+                self.connection.executemany('UPDATE tools SET category = ? WHERE id = ?',
+                                            [(category, tool_id) for (tool_id, _), category in zip(added, categories)])
+            self._rescore([tool_id for tool_id, _ in added] + relisted)
+            execute('INSERT INTO sources VALUES (?,?,?) ON CONFLICT (source) DO UPDATE '
+                    'SET digest = excluded.digest, tools = excluded.tools', (source, digest, count))
+
+        return MergeResult(source, count, len(added), count - len(added), time.perf_counter() - start)
+
+    def _rescore(self, tool_ids: List[int]):
+        scorer = default_scorer()
+        for chunk in _chunks(sorted(set(tool_ids))):
+            tools = self._fetch(chunk)
+            scores = scorer.score_many(tools)
+            self.connection.executemany('UPDATE tools SET popularity_score = ? WHERE id = ?',
+                                        [(score, tool['id']) for tool, score in zip(tools, scores)])
+
+    def _fetch(self, tool_ids: List[int]) -> List[Dict[str, Any]]:
+        cursor = self.connection.execute(
+            f'SELECT {self._SELECT} FROM tools WHERE id IN ({",".join("?" * len(tool_ids))}) ORDER BY id',
+            tool_ids)
+        return [dict(zip(self.COLUMNS, row)) for row in cursor]
+
+    def iter_tools(self) -> Iterator[Dict[str, Any]]:
+        """Every registered tool as a dict, in the order they were first seen."""
+        cursor = self.connection.execute(f'SELECT {self._SELECT} FROM tools ORDER BY id')
+        for row in cursor:
+            yield dict(zip(self.COLUMNS, row))
+
+    def category_counts(self) -> Dict[str, int]:
+        return dict(self.connection.execute('SELECT category, COUNT(*) FROM tools GROUP BY category'))
+
+    def source_counts(self) -> Dict[str, int]:
+        """Tools in the last merged batch of each source."""
+        return dict(self.connection.execute('SELECT source, tools FROM sources ORDER BY rowid'))
+
+    def provenance(self, tool_id: int) -> List[Dict[str, Any]]:
+        """Every source listing of a tool: source, name and link as listed, and how it matched."""
+        cursor = self.connection.execute(
+            'SELECT source, name, link, match FROM provenance WHERE tool_id = ? ORDER BY rowid', (tool_id,))
+        return [dict(zip(('source', 'name', 'link', 'match'), row)) for row in cursor]
+
+
+def _generated_tools(count: int, rng: random.Random, offset: int = 0) -> List[Dict[str, Any]]:
+    words = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9))) for _ in range(5000)]
+    tools = []
+    for i in range(offset, offset + count):
+        name = ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(6, 12))).capitalize()
+        tools.append({
+            "name": name,
+            "description": ' '.join(rng.choices(words, k=12)),
+            "link": f"https://{name.lower()}{i}.example.com",
+            "category": "Productivity"
+        })
+    return tools
+
+
+def benchmark(count: int, batch: int, seed: int = 0) -> dict:
+    """Fill a registry with `count` generated tools, then time merging a
+    scrape of `batch` tools, half of them already registered."""
+    rng = random.Random(seed)
+    existing = _generated_tools(count, rng)
+    with tempfile.TemporaryDirectory(prefix='tool_registry_') as directory:
+        with ToolRegistry(os.path.join(directory, 'registry.db')) as registry:
+            start = time.perf_counter()
+            for chunk in _chunks(existing, 10_000):
+                registry.merge('seed', chunk)
+            fill_seconds = time.perf_counter() - start
+
+            scrape = rng.sample(existing, batch // 2) + _generated_tools(batch - batch // 2, rng, offset=count)
+            result = registry.merge('new_directory', scrape)
+            return {
+                'count': count,
+                'fill_seconds': fill_seconds,
+                'batch': batch,
+                'merge_seconds': result.seconds,
+                'added': result.added,
+                'matched': result.matched,
+                'size': len(registry),
+                'size_bytes': os.path.getsize(registry.path)
+            }
+
+
+def stable_bucket_keys() -> bool:
+    """Whether a known tool still gets the bucket keys registries stored for it."""
+    matcher = NearDuplicateIndex()
+    signatures = matcher.signatures('Jasper', 'AI writing assistant that drafts blog posts and marketing copy')
+    return bucket_keys(matcher.bands(*signatures))[:2] == [8127275234132787871, -7489962291578323778]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark merging a source batch into a large tool registry")
+    parser.add_argument('--count', type=int, default=100_000, help="tools registered before the merge")
+    parser.add_argument('--batch', type=int, default=2000, help="tools in the merged source")
+    options = parser.parse_args()
+
+    result = benchmark(options.count, options.batch)
+    print(f"Registered {result['count']:,} tools in {result['fill_seconds']:.1f}s "
+          f"({result['size_bytes'] / 1e6:.0f} MB)")
+    print(f"Merged a source of {result['batch']:,} tools in {result['merge_seconds']:.2f}s: "
+          f"{result['added']:,} added, {result['matched']:,} matched")
+    expected = result['batch'] - result['batch'] // 2
+    print("✓ Every new tool added" if result['added'] == expected
+          else f"✗ Expected {expected:,} new tools, added {result['added']:,}")
+    print("✓ Bucket keys match the stored ones" if stable_bucket_keys()
+          else "✗ Bucket keys changed; registries built before need a rebuild")
+
+
+if __name__ == "__main__":
+    main()
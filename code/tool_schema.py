@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Declared schema and validating decoder for the canonical tool files.
+
+data/aiverse_tools_final.json, data/aiverse_tools_enhanced.json,
+tools_for_insertion.json and the 2024-2025 dataset all hold the same flat
+tool rows. ToolSchema declares those rows once, together with the validity
+rules the parsers used to check field by field:
+
+    name    non-empty, not starting with {, [ or " (a JSON fragment), at
+            most 100 characters
+    link    starting with http:// or https://, surrounding spaces aside
+
+Each parser used to check only part of these: parse_ai_tools took any link
+and any name, fixed_ai_tools_parser took quoted and overlong names. Every
+parser now applies all of them and prints its rejections per source and
+reason (python tool_schema.py checks the rejected cases).
+
+Each schema compiles into a generated function that type-checks a decoded
+row, applies the rules and builds the typed record in one pass, without
+generic per-field loops. Rows it rejects are re-checked field by field only
+to name the reason, and are counted per source in a ValidationReport instead
+of being dropped silently.
+"""
+
+import json
+import os
+from collections import Counter, namedtuple
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+MAX_NAME_LENGTH = 100
+
+_TYPE_CHECKS = {
+    'str': 'type({v}) is str',
+    'int': 'type({v}) is int',
+    'float': '(type({v}) is float or type({v}) is int)',
+    'bool': 'type({v}) is bool',
+}
+_TYPES = {'str': str, 'int': int, 'float': (int, float), 'bool': bool}
+
+Field = namedtuple('Field', ['name', 'type', 'required', 'nullable', 'default', 'rule', 'accept'])
+
+
+def field(name: str, type: str = 'str', required: bool = True, nullable: bool = False,
+          default: Any = None, rule: Optional[Callable[[Any], Optional[str]]] = None,
+          accept: Optional[str] = None) -> Field:
+    """Declare a field.
+
+    rule returns an error reason for an invalid value, or None. accept is an
+    optional inline expression over {v} that is only true for values the rule
+    accepts; the compiled validator tries it first and calls rule otherwise.
+    """
+    return Field(name, type, required, nullable, default, rule, accept)
+
+
+def name_rule(value: str) -> Optional[str]:
+    name = value.strip()
+    if not name:
+        return "name: empty"
+    if name.startswith(('{', '[', '"')):
+        return "name: JSON fragment"
+    if len(name) > MAX_NAME_LENGTH:
+        return "name: too long"
+    return None
+
+
+def link_rule(value: str) -> Optional[str]:
+    if not value.strip().startswith(('http://', 'https://')):
+        return "link: not an http(s) URL"
+    return None
+
+
+# Common valid values: a short name starting with a letter or digit, an
+# unpadded http(s) link
+NAME_FIELD = field('name', rule=name_rule, accept=f'(len({{v}}) <= {MAX_NAME_LENGTH} and {{v}}[:1].isalnum())')
+LINK_FIELD = field('link', rule=link_rule, accept="{v}.startswith(('http://', 'https://'))")
+
+
+class ValidationReport:
+    """Valid row count and invalid row counts per source and reason."""
+
+    def __init__(self):
+        self.valid = 0
+        self.invalid: Dict[str, Counter] = {}
+
+    def add_error(self, source: str, reason: str):
+        self.invalid.setdefault(source, Counter())[reason] += 1
+
+    @property
+    def invalid_total(self) -> int:
+        return sum(sum(reasons.values()) for reasons in self.invalid.values())
+
+    def summary(self) -> str:
+        lines = [f"{self.valid} valid rows, {self.invalid_total} invalid"]
+        for source, reasons in sorted(self.invalid.items()):
+            details = ', '.join(f"{reason} ({count})" for reason, count in reasons.most_common())
+            lines.append(f"  {source}: {details}")
+        return '\n'.join(lines)
+
+
+class ToolSchema:
+    """A declared row layout, its record type and its compiled validator."""
+
+    def __init__(self, type_name: str, fields: Tuple[Field, ...]):
+        self.fields = fields
+        self.record_type = namedtuple(type_name, [f.name for f in fields])
+        self.build = self._compile()
+
+    def _compile(self) -> Callable[[Any], Any]:
+        """Generate build(row): the typed record for a valid row, else None."""
+        required = [f'v{index}' for index, f in enumerate(self.fields) if f.required]
+        namespace = {
+            '_new': tuple.__new__,
+            '_record': self.record_type,
+            '_required': itemgetter(*[f.name for f in self.fields if f.required])
+        }
+        fetch = [f"        {', '.join(required)}{',' if len(required) == 1 else ''} = _required(row)"]
+        checks, values = [], []
+        for index, f in enumerate(self.fields):
+            v = f'v{index}'
+            if not f.required:
+                fetch.append(f"        {v} = row.get({f.name!r})")
+
+            check = _TYPE_CHECKS[f.type].format(v=v)
+            if f.rule is not None:
+                namespace[f'_rule{index}'] = f.rule
+                rule = f'_rule{index}({v}) is None'
+                if f.accept:
+                    rule = f'({f.accept.format(v=v)} or {rule})'
+                check = f'{check} and {rule}'
+            if f.nullable or not f.required:
+                check = f'({v} is None or {check})'
+            checks.append(check)
+
+            value = f'float({v})' if f.type == 'float' else v
+            if f.nullable or not f.required:
+                if f.default is not None:
+                    value = f'({value} if {v} is not None else {f.default!r})'
+                elif f.type == 'float':
+                    value = f'({value} if {v} is not None else None)'
+            values.append(value)
+
+        source = '\n'.join([
+            "def build(row):",
+            "    try:",
+            *fetch,
+            "    except (KeyError, TypeError, AttributeError):",
+            "        return None",
+            "    if not (" + '\n            and '.join(checks) + "):",
+            "        return None",
+            f"    return _new(_record, ({', '.join(values)},))",
+        ])
+        exec(compile(source, f'<{self.record_type.__name__} validator>', 'exec'), namespace)
+        return namespace['build']
+
+    def row_error(self, row: Any) -> Optional[str]:
+        """Reason a decoded row is invalid, or None."""
+        if not isinstance(row, dict):
+            return "row: not an object"
+        for f in self.fields:
+            if f.name not in row:
+                if f.required:
+                    return f"{f.name}: missing"
+                continue
+            value = row[f.name]
+            if value is None:
+                if f.nullable or not f.required:
+                    continue
+                return f"{f.name}: null"
+            if not isinstance(value, _TYPES[f.type]) or (f.type != 'bool' and isinstance(value, bool)):
+                return f"{f.name}: expected {f.type}"
+            if f.rule is not None:
+                reason = f.rule(value)
+                if reason:
+                    return reason
+        return None
+
+    def is_valid(self, row: Any) -> bool:
+        return self.build(row) is not None
+
+    def validate(self, row: Any, report: Optional[ValidationReport] = None, label: str = '') -> bool:
+        """Whether a row is valid, counting it in report under its source (or label)."""
+        if self.build(row) is not None:
+            if report is not None:
+                report.valid += 1
+            return True
+        if report is not None:
+            source = row.get('source') if isinstance(row, dict) else None
+            report.add_error(source if isinstance(source, str) and source else label,
+                             self.row_error(row) or "row: invalid")
+        return False
+
+    def to_row(self, record) -> Dict[str, Any]:
+        """Plain dict for a record, leaving out optional fields that are unset."""
+        return {f.name: value for f, value in zip(self.fields, record) if f.required or value is not None}
+
+    def iter_records(self, rows: Iterable[Any], report: Optional[ValidationReport] = None,
+                     label: str = '') -> Iterator[Any]:
+        """Yield a record for each valid row, counting the invalid ones in report."""
+        build = self.build
+        for row in rows:
+            record = build(row)
+            if record is not None:
+                if report is not None:
+                    report.valid += 1
+                yield record
+            elif report is not None:
+                source = row.get('source') if isinstance(row, dict) else None
+                report.add_error(source if isinstance(source, str) and source else label,
+                                 self.row_error(row) or "row: invalid")
+
+    def load(self, file_path: str) -> Tuple[Dict[str, Any], List[Any], ValidationReport]:
+        """(metadata, records, report) for a tools file.
+
+        Accepts a bare array of rows or an object with a "tools" array; the
+        object's other members are returned as metadata.
+        """
+        report = ValidationReport()
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            rows = data.pop('tools', [])
+            metadata = data
+        else:
+            rows, metadata = data, {}
+        if not isinstance(rows, list):
+            raise ValueError(f"{file_path}: 'tools' is not a list")
+        records = list(self.iter_records(rows, report, os.path.basename(file_path)))
+        return metadata, records, report
+
+
+CANONICAL_TOOL_SCHEMA = ToolSchema('CanonicalTool', (
+    field('id', 'int'),
+    NAME_FIELD,
+    field('description'),
+    LINK_FIELD,
+    field('category'),
+    field('logo_url', nullable=True),
+    field('screenshot_url', nullable=True),
+    field('featured', 'bool', required=False, default=False),
+    field('popularity_score', 'float', required=False, default=0.0),
+    field('source', required=False),
+    field('created_at', required=False),
+    field('updated_at', required=False),
+))
+
+CanonicalTool = CANONICAL_TOOL_SCHEMA.record_type
+
+# Rows produced by the extract parsers, before ids and scores are assigned
+PARSED_TOOL_SCHEMA = ToolSchema('ParsedTool', (
+    NAME_FIELD,
+    field('description'),
+    LINK_FIELD,
+    field('category'),
+    field('source'),
+))
+
+
+def load_canonical_tools(file_path: str) -> Tuple[Dict[str, Any], List[CanonicalTool], ValidationReport]:
+    """Decode and validate a canonical tools file in one pass."""
+    return CANONICAL_TOOL_SCHEMA.load(file_path)
+
+
+def main():
+    # Rows the parsers' own checks let through before they shared these rules
+    cases = [
+        ('name starting with a quote', {'name': '"Jasper', 'link': 'https://jasper.ai'}, "name: JSON fragment"),
+        ('name starting with a brace', {'name': '{"name": "Jasper"', 'link': 'https://jasper.ai'},
+         "name: JSON fragment"),
+        ('name over 100 characters', {'name': 'Jasper ' * 20, 'link': 'https://jasper.ai'}, "name: too long"),
+        ('link without a scheme', {'name': 'Jasper', 'link': 'www.jasper.ai'}, "link: not an http(s) URL"),
+        ('relative link', {'name': 'Jasper', 'link': '/tools/jasper'}, "link: not an http(s) URL"),
+        ('valid row', {'name': 'Jasper', 'link': 'https://jasper.ai'}, None),
+    ]
+    report = ValidationReport()
+    failures = 0
+    for label, fields, expected in cases:
+        row = {'description': 'AI writing assistant', 'category': 'Writing', 'source': 'self-check', **fields}
+        PARSED_TOOL_SCHEMA.validate(row, report)
+        reason = PARSED_TOOL_SCHEMA.row_error(row)
+        if reason == expected and PARSED_TOOL_SCHEMA.is_valid(row) == (expected is None):
+            print(f"✓ {label}: {reason or 'valid'}")
+        else:
+            failures += 1
+            print(f"✗ {label}: expected {expected or 'valid'}, got {reason or 'valid'}")
+    print(report.summary())
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Quota-aware top-N selection with bounded heaps.
+
+Picking the final dataset used to mean sorting every candidate, grouping
+the sorted list by category, taking a share of each category and then
+filtering the picked tools out of the full list again. QuotaSelector picks
+the same tools from a stream without ever sorting it:
+
+    1. every category gets its best `min_per_category` tools (never more
+       than its maximum), categories ordered by their best tool
+    2. the remaining slots go to the best of the other tools, skipping
+       categories that already hold `max_per_category` tools
+
+It keeps two kinds of bounded min-heaps, the worst kept tool on top:
+
+    reserve   per category, the best `min_per_category` tools
+    top       the best `limit` tools with at most `max_per_category` per
+              category; a tool that beats the worst of a full category
+              replaces that tool, otherwise it replaces the worst overall
+
+Every tool step 2 picks is in the capped top heap, so at most about
+2 * limit tools are held and each candidate costs O(log limit). Only the
+kept tools are sorted, when select() is called. Ties rank in arrival
+order, like a stable sort.
+
+min_per_category is an int, a dict of per-category counts, or EVEN_SHARE:
+max(1, limit // categories seen), which shrinks as new categories arrive.
+max_per_category is None (no cap), an int, or a dict (missing categories
+are not capped).
+
+Usage:
+    python tool_selection.py [--count 1000000] [--limit 50000] [--categories 24]
+"""
+
+import argparse
+import heapq
+import random
+import time
+from collections import defaultdict
+from itertools import compress, islice, repeat
+from operator import gt, itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Union
+
+# min_per_category value for an equal share of the limit per category
+EVEN_SHARE = 'even'
+
+# Items extend() ranks and filters in one go
+BATCH_SIZE = 10000
+
+# Heaps are rebuilt without their evicted entries once these exceed twice the live size
+_COMPACT_SLACK = 64
+
+Quota = Union[int, str, Dict[str, int], None]
+
+
+class _Bottom:
+    """Ranks below everything: the floor of a category any item may enter."""
+
+    def __lt__(self, other: Any) -> bool:
+        return True
+
+    def __gt__(self, other: Any) -> bool:
+        return False
+
+
+_BOTTOM = _Bottom()
+
+
+def popularity(tool: Any) -> Any:
+    """Default ranking key: the popularity score of a tool dict or record."""
+    return tool.get('popularity_score', 0)
+
+
+def tool_category(tool: Any) -> str:
+    return tool.get('category', '')
+
+
+def quota_maximum(max_per_category: Quota, category: str, limit: int) -> int:
+    cap = max_per_category
+    if isinstance(cap, dict):
+        cap = cap.get(category)
+    return limit if cap is None else min(cap, limit)
+
+
+def quota_minimum(min_per_category: Quota, max_per_category: Quota, category: str,
+                  limit: int, categories: int) -> int:
+    """Reserved items for a category, given the number of categories seen."""
+    quota = min_per_category
+    if quota == EVEN_SHARE:
+        quota = max(1, limit // max(1, categories))
+    elif isinstance(quota, dict):
+        quota = quota.get(category, 0)
+    return min(quota or 0, quota_maximum(max_per_category, category, limit))
+
+
+def _push(heap: List[Tuple], entry: Tuple, size: int):
+    if len(heap) < size:
+        heapq.heappush(heap, entry)
+    elif entry > heap[0]:
+        heapq.heapreplace(heap, entry)
+
+
+class QuotaSelector:
+    """Selects `limit` items by rank with per-category minimum and maximum counts.
+
+    Items are added one at a time (add, extend) and select() returns the
+    reserved items category by category, then the rest by rank.
+    """
+
+    def __init__(self, limit: int, key: Callable[[Any], Any] = popularity,
+                 category: Callable[[Any], str] = tool_category,
+                 min_per_category: Quota = 0, max_per_category: Quota = None):
+        self.limit = limit
+        self.key = key
+        self.category = category
+        self.min_per_category = min_per_category
+        self.max_per_category = max_per_category
+        self.count = 0
+        # Entries are (rank, -arrival, category, item), so ties rank in arrival order
+        self._reserve: Dict[str, List[Tuple]] = {}
+        self._reserve_sizes: Dict[str, int] = {}
+        self._caps: Dict[str, int] = {}
+        # Capped top `limit`: evicted entries stay in the heaps until they
+        # surface, so membership is the set of live arrival numbers
+        self._top: List[Tuple] = []
+        self._top_by_category: Dict[str, List[Tuple]] = {}
+        self._top_counts: Dict[str, int] = defaultdict(int)
+        self._live = set()
+
+    def maximum(self, category: str) -> int:
+        return quota_maximum(self.max_per_category, category, self.limit)
+
+    def minimum(self, category: str) -> int:
+        return quota_minimum(self.min_per_category, self.max_per_category, category,
+                             self.limit, len(self._reserve))
+
+    def add(self, item: Any):
+        entry = (self.key(item), -self.count, self.category(item), item)
+        self.count += 1
+        self._add_entry(entry)
+
+    def extend(self, items: Iterable[Any], batch_size: int = BATCH_SIZE):
+        """Add many items, batch_size at a time.
+
+        Ranks and categories of a batch are computed with map(), and items
+        that rank no higher than their category's floor at the start of the
+        batch are dropped without building an entry. Floors only rise, so
+        this never drops an item that add() would keep.
+        """
+        iterator = iter(items)
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                return
+            ranks = list(map(self.key, batch))
+            categories = list(map(self.category, batch))
+            first = self.count
+            self.count += len(batch)
+            floors = {}
+            for category in self._reserve:
+                floor = self._floor(category)
+                if floor is not None:
+                    floors[category] = floor
+            passed = map(gt, ranks, map(floors.get, categories, repeat(_BOTTOM)))
+            for index in compress(range(len(batch)), passed):
+                self._add_entry((ranks[index], -(first + index), categories[index], batch[index]))
+
+    def _floor(self, category: str) -> Any:
+        """Highest rank the heaps turn away for a category, or None if any rank may enter."""
+        size = self._reserve_sizes[category]
+        reserve = self._reserve[category]
+        if 0 < size and len(reserve) < size:
+            return None
+        reserve_floor = reserve[0][0] if size else None
+        top_floor = None
+        if self._caps[category] > 0:
+            capped = self._top_by_category.get(category)
+            if len(self._live) >= self.limit:
+                # Also below the category's minimum while it is full
+                top_floor = self._top[0][0]
+            elif capped is not None and self._top_counts[category] >= self._caps[category]:
+                top_floor = capped[0][0]
+            else:
+                return None
+        if reserve_floor is None:
+            return top_floor
+        if top_floor is None:
+            return reserve_floor
+        return min(reserve_floor, top_floor)
+
+    def _add_entry(self, entry: Tuple):
+        rank, _, category, _ = entry
+        reserve = self._reserve.get(category)
+        if reserve is None:
+            reserve = self._add_category(category)
+        # Later items lose ties, so an item must rank strictly above a
+        # heap's minimum to enter a full heap
+        size = self._reserve_sizes[category]
+        if len(reserve) < size:
+            heapq.heappush(reserve, entry)
+        elif size and rank > reserve[0][0]:
+            heapq.heapreplace(reserve, entry)
+
+        # Every heap's minimum is live, so most items are turned away by one comparison
+        capped = self._top_by_category.get(category)
+        if capped is None:
+            if len(self._live) >= self.limit and rank <= self._top[0][0]:
+                return
+        elif self._top_counts[category] >= self._caps[category] and rank <= capped[0][0]:
+            return
+        self._add_top(entry)
+
+    def _add_category(self, category: str) -> List[Tuple]:
+        heap = self._reserve[category] = []
+        self._caps[category] = cap = self.maximum(category)
+        if 0 < cap < self.limit:
+            self._top_by_category[category] = []
+        if self.min_per_category == EVEN_SHARE:
+            # A new category lowers every category's share
+            for other_category, other in self._reserve.items():
+                size = self._reserve_sizes[other_category] = self.minimum(other_category)
+                while len(other) > size:
+                    heapq.heappop(other)
+        else:
+            self._reserve_sizes[category] = self.minimum(category)
+        return heap
+
+    def _drop_evicted(self, heap: List[Tuple]):
+        live = self._live
+        while heap and -heap[0][1] not in live:
+            heapq.heappop(heap)
+
+    def _add_top(self, entry: Tuple):
+        category = entry[2]
+        if self._caps[category] <= 0:
+            return
+        top = self._top
+        live = self._live
+        counts = self._top_counts
+        capped = self._top_by_category.get(category)
+        if capped is not None and counts[category] >= self._caps[category]:
+            # A full category: the item can only replace its worst
+            if entry <= capped[0]:
+                return
+            evicted = heapq.heapreplace(capped, entry)
+            heapq.heappush(top, entry)
+        elif len(live) >= self.limit:
+            if entry <= top[0]:
+                return
+            evicted = heapq.heapreplace(top, entry)
+            if capped is not None:
+                heapq.heappush(capped, entry)
+        else:
+            evicted = None
+            heapq.heappush(top, entry)
+            if capped is not None:
+                heapq.heappush(capped, entry)
+        live.add(-entry[1])
+        counts[category] += 1
+
+        if evicted is not None:
+            # The evicted entry's other copy leaves its heap lazily, but
+            # every heap's minimum is kept live for the tests in _add_entry
+            live.discard(-evicted[1])
+            counts[evicted[2]] -= 1
+            self._drop_evicted(top)
+            evicted_capped = self._top_by_category.get(evicted[2])
+            if evicted_capped is not None:
+                self._drop_evicted(evicted_capped)
+        if len(top) > 2 * self.limit + _COMPACT_SLACK:
+            self._top = self._compacted(top)
+        if capped is not None and len(capped) > 2 * counts[category] + _COMPACT_SLACK:
+            self._top_by_category[category] = self._compacted(capped)
+
+    def _compacted(self, heap: List[Tuple]) -> List[Tuple]:
+        live = self._live
+        heap = [entry for entry in heap if -entry[1] in live]
+        heapq.heapify(heap)
+        return heap
+
+    def select(self) -> List[Any]:
+        """The selected items: reserves by category, best category first, then the rest by rank."""
+        selected: List[Tuple] = []
+        groups = sorted((sorted(heap, reverse=True) for heap in self._reserve.values() if heap), reverse=True)
+        for entries in groups:
+            selected.extend(entries)
+        del selected[self.limit:]
+
+        taken = {-entry[1] for entry in selected}
+        counts: Dict[str, int] = defaultdict(int)
+        for entry in selected:
+            counts[entry[2]] += 1
+        live = self._live
+        for entry in sorted((entry for entry in self._top if -entry[1] in live), reverse=True):
+            if len(selected) >= self.limit:
+                break
+            if -entry[1] in taken or counts[entry[2]] >= self.maximum(entry[2]):
+                continue
+            selected.append(entry)
+            counts[entry[2]] += 1
+        return [entry[3] for entry in selected]
+
+
+def select_top(items: Iterable[Any], limit: int, key: Callable[[Any], Any] = popularity,
+               category: Callable[[Any], str] = tool_category,
+               min_per_category: Quota = 0, max_per_category: Quota = None) -> List[Any]:
+    """The `limit` best items under the category quotas (see QuotaSelector)."""
+    selector = QuotaSelector(limit, key, category, min_per_category, max_per_category)
+    selector.extend(items)
+    return selector.select()
+
+
+def select_sorted(items: Iterable[Any], limit: int, key: Callable[[Any], Any] = popularity,
+                  category: Callable[[Any], str] = tool_category,
+                  min_per_category: Quota = 0, max_per_category: Quota = None) -> List[Any]:
+    """Reference selection with a full sort, for checking QuotaSelector."""
+    ranked = sorted(items, key=key, reverse=True)
+    by_category: Dict[str, List[Any]] = {}
+    for item in ranked:
+        by_category.setdefault(category(item), []).append(item)
+
+    selected = []
+    for name, members in by_category.items():
+        selected.extend(members[:quota_minimum(min_per_category, max_per_category, name,
+                                               limit, len(by_category))])
+    del selected[limit:]
+
+    taken = {id(item) for item in selected}
+    counts: Dict[str, int] = defaultdict(int)
+    for item in selected:
+        counts[category(item)] += 1
+    for item in ranked:
+        if len(selected) >= limit:
+            break
+        if id(item) in taken or counts[category(item)] >= quota_maximum(max_per_category, category(item), limit):
+            continue
+        selected.append(item)
+        counts[category(item)] += 1
+    return selected
+
+
+def benchmark(count: int, limit: int, categories: int, max_share: float = 0.1, seed: int = 0) -> dict:
+    """Select `limit` of `count` generated candidates with even-share minimums and a cap."""
+    rng = random.Random(seed)
+    names = [f"category-{i}" for i in range(categories)]
+    # Skewed category sizes and one-decimal scores, so quotas bind and ties are common
+    weights = [1.0 / (i + 1) for i in range(categories)]
+    candidates = [(round(rng.random() * 10, 1), category)
+                  for category in rng.choices(names, weights, k=count)]
+    options = dict(key=itemgetter(0), category=itemgetter(1), min_per_category=EVEN_SHARE,
+                   max_per_category=max(1, int(limit * max_share)))
+
+    start = time.perf_counter()
+    selected = select_top(candidates, limit, **options)
+    heap_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = select_sorted(candidates, limit, **options)
+    sort_seconds = time.perf_counter() - start
+
+    return {
+        'count': count,
+        'limit': limit,
+        'selected': len(selected),
+        'heap_seconds': heap_seconds,
+        'sort_seconds': sort_seconds,
+        'matches': [id(item) for item in selected] == [id(item) for item in expected]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark quota-aware top-N selection against a full sort")
+    parser.add_argument('--count', type=int, default=1_000_000, help="candidates to select from")
+    parser.add_argument('--limit', type=int, default=50_000, help="items to select")
+    parser.add_argument('--categories', type=int, default=24, help="distinct categories")
+    options = parser.parse_args()
+
+    result = benchmark(options.count, options.limit, options.categories)
+    print(f"Selected {result['selected']:,} of {result['count']:,} candidates")
+    print(f"  bounded heaps: {result['heap_seconds']:.2f}s "
+          f"({result['count'] / result['heap_seconds']:,.0f} candidates/s)")
+    print(f"  full sort:     {result['sort_seconds']:.2f}s")
+    print("✓ Same selection as the full sort" if result['matches'] else "✗ Selection differs from the full sort")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Error-tolerant single-pass JSON tokenizer for recovering tool records.
+
+Replaces the DOTALL regex cascades (`"name":\\s*"([^"]+)"[^}]*?...`) that
+rescanned the same bytes once per pattern and backtracked on malformed
+input. The tokenizer visits every character at most a constant number of
+times, so recovery is linear in the input size even for broken, truncated
+or single-line scrapes.
+
+Usage:
+    python tool_tokenizer.py [--length 1000000]
+"""
+
+import argparse
+import json
+import re
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Keys that identify an object inside an array as a tool record
+RECORD_NAME_KEYS = ('name', 'tool_name')
+
+# One token: punctuation, a string (closing quote optional) or a scalar
+_TOKEN = re.compile(
+    r'\s*(?:'
+    r'([{}\[\]:,])'
+    r'|"((?:[^"\\\n]|\\.)*)(")?'
+    r'|(-?\d[\d.eE+\-]*|true|false|null)'
+    r')'
+)
+# The rest of a string cut off at the end of a chunk, resumed after the quote
+_STRING_BODY = re.compile(r'((?:[^"\\\n]|\\.)*)(")?')
+_WHITESPACE = re.compile(r'\s*')
+_INVALID_ESCAPE = re.compile(r'\\(?!["\\/bfnrtu])')
+_FIELD_NAME = re.compile(r'^[a-z0-9_]+$')
+
+_LITERALS = {'true': True, 'false': False, 'null': None}
+
+# Frame slots
+_CONTAINER, _KEY, _PENDING, _EXPECT_KEY, _IS_RECORD, _CATEGORY = range(6)
+
+
+def decode_string(raw: str) -> str:
+    """Decode the body of a JSON string, dropping invalid escape backslashes."""
+    try:
+        return json.loads('"' + raw + '"')
+    except json.JSONDecodeError:
+        raw = _INVALID_ESCAPE.sub('', raw)
+        try:
+            return json.loads('"' + raw + '"')
+        except json.JSONDecodeError:
+            return raw
+
+
+def _decode_scalar(raw: str) -> Any:
+    """Decode a number or literal token."""
+    if raw in _LITERALS:
+        return _LITERALS[raw]
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        return raw
+
+
+class RecordStreamParser:
+    """Incremental, error-tolerant parser that yields tool records.
+
+    Every object that appears as an array element and carries a name key is
+    emitted as soon as it closes and is never attached to its parent, so only
+    the scalars of the enclosing objects are kept in memory. Records inherit
+    the category of the section they appear in when they have none.
+    """
+
+    def __init__(self, name_keys=RECORD_NAME_KEYS):
+        self.name_keys = name_keys
+        self.buffer = ''
+        self.stack: List[list] = []
+        self.open_records = 0
+        # Body pieces of a string still open at the end of the last chunk
+        self.string_parts: Optional[List[str]] = None
+
+    def feed(self, text: str, final: bool = False) -> Iterator[Dict[str, Any]]:
+        """Consume a chunk of document text and yield completed records.
+
+        With final=False, a token cut off at the end of the chunk is kept
+        and completed by the next call. A string cut off that way is resumed
+        where the scan stopped rather than rematched from its opening quote,
+        so a long string fed in small chunks is still scanned once.
+        """
+        buffer = self.buffer + text if self.buffer else text
+        pos = 0
+        length = len(buffer)
+
+        if self.string_parts is not None:
+            pos = self._resume_string(buffer, final)
+            if self.string_parts is not None:
+                self.buffer = buffer[pos:]
+                return
+
+        while pos < length:
+            match = _TOKEN.match(buffer, pos)
+            if match is None:
+                start = _WHITESPACE.match(buffer, pos).end()
+                if start == length:
+                    pos = start
+                    break
+                if (not final and length - start < 5
+                        and any(literal.startswith(buffer[start:]) for literal in _LITERALS)):
+                    break
+                # Stray character - skip it and resync
+                pos = start + 1
+                continue
+
+            punct, string, closed, scalar = match.groups()
+            if not final and scalar and match.end() == length:
+                # A number or literal that may continue in the next chunk
+                break
+            pos = match.end()
+
+            if punct is not None:
+                record = self._punct(punct)
+                if record is not None:
+                    yield record
+            elif string is not None:
+                if closed:
+                    self._value(decode_string(string), is_string=True)
+                elif not final and length - pos <= 1:
+                    # Open at the end of the chunk (a trailing escape
+                    # backslash stays in the buffer): continue it next time
+                    self.string_parts = [string]
+                    break
+                # An unterminated string is skipped whole, never rescanned
+            else:
+                self._value(_decode_scalar(scalar), is_string=False)
+
+        self.buffer = buffer[pos:]
+
+    def _resume_string(self, buffer: str, final: bool) -> int:
+        """Continue the string left open by the last chunk; return where it ends."""
+        match = _STRING_BODY.match(buffer)
+        body, closed = match.groups()
+        pos = match.end()
+        if closed:
+            self.string_parts.append(body)
+            self._value(decode_string(''.join(self.string_parts)), is_string=True)
+            self.string_parts = None
+        elif not final and len(buffer) - pos <= 1:
+            self.string_parts.append(body)
+        else:
+            # Ended by a newline or the document - skipped whole, as above
+            self.string_parts = None
+        return pos
+
+    def _punct(self, punct: str) -> Optional[Dict[str, Any]]:
+        """Apply a structural character."""
+        stack = self.stack
+        if punct == '{' or punct == '[':
+            parent = stack[-1] if stack else None
+            key = None
+            category = ''
+            if parent is not None:
+                if isinstance(parent[_CONTAINER], dict):
+                    key = parent[_PENDING]
+                    category = self._section_category(parent)
+                else:
+                    category = parent[_CATEGORY]
+            if punct == '[' and key and not _FIELD_NAME.match(key):
+                # Arrays keyed by a prose category name, e.g. tools_by_category
+                category = key
+            container = {} if punct == '{' else []
+            stack.append([container, key, None, punct == '{', False, category])
+        elif punct == '}' or punct == ']':
+            if stack:
+                frame = stack.pop()
+                if frame[_IS_RECORD]:
+                    self.open_records -= 1
+                return self._close(frame)
+        elif punct == ',':
+            if stack and isinstance(stack[-1][_CONTAINER], dict):
+                stack[-1][_PENDING] = None
+                stack[-1][_EXPECT_KEY] = True
+        # ':' needs no action - the key was recorded when it was read
+        return None
+
+    def _value(self, value: Any, is_string: bool):
+        """Attach a scalar to the innermost container."""
+        if not self.stack:
+            return
+        frame = self.stack[-1]
+        container = frame[_CONTAINER]
+        if isinstance(container, list):
+            container.append(value)
+        elif frame[_EXPECT_KEY]:
+            if is_string:
+                frame[_PENDING] = value
+            frame[_EXPECT_KEY] = False
+        elif frame[_PENDING] is not None:
+            key = frame[_PENDING]
+            container[key] = value
+            if (value and key in self.name_keys and not frame[_IS_RECORD]
+                    and len(self.stack) > 1 and isinstance(self.stack[-2][_CONTAINER], list)):
+                frame[_IS_RECORD] = True
+                self.open_records += 1
+
+    def _close(self, frame: list) -> Optional[Dict[str, Any]]:
+        """Attach or emit a container that has just been closed."""
+        value = frame[_CONTAINER]
+        if not self.stack:
+            return None
+        parent = self.stack[-1]
+
+        if isinstance(parent[_CONTAINER], list):
+            if isinstance(value, dict) and not self.open_records:
+                if frame[_IS_RECORD]:
+                    category = parent[_CATEGORY]
+                    if category and 'category' not in value:
+                        value['category'] = category
+                    return value
+                # Containers such as {"category": ..., "tools": [...]}
+                return None
+            parent[_CONTAINER].append(value)
+        elif parent[_PENDING] is not None:
+            parent[_CONTAINER][parent[_PENDING]] = value
+        return None
+
+    @staticmethod
+    def _section_category(frame: list) -> str:
+        """Category of an object frame, falling back to its section's."""
+        category = frame[_CONTAINER].get('category')
+        if isinstance(category, str) and category:
+            return category
+        return frame[_CATEGORY]
+
+
+def recover_tool_records(content: str, name_keys=RECORD_NAME_KEYS) -> List[Dict[str, Any]]:
+    """Recover every tool object from broken or truncated JSON text in one pass."""
+    return list(RecordStreamParser(name_keys).feed(content, final=True))
+
+
+# Markdown links: [Name](url) - description, or | [Name](url) | description |
+_MARKDOWN_LINK = re.compile(r'\[([^\[\]\n]+)\]\(([^()\[\]\s]+)\)')
+# Table cells that hold no description
+_EMPTY_CELLS = frozenset(('', '.', '-'))
+
+
+def _starts_cell(content: str, start: int) -> bool:
+    """Whether only spaces separate position start from a preceding table pipe."""
+    position = start - 1
+    while position >= 0 and content[position] in ' \t':
+        position -= 1
+    return position >= 0 and content[position] == '|'
+
+
+def iter_markdown_links(content: str) -> Iterator[Tuple[str, str, str]]:
+    """Yield (name, link, description) for `[Name](url) - description` entries
+    and GFM table rows `| [Name](url) | description | ... |`.
+
+    The description runs from the first dash after the link to the end of the
+    line (a real or an escaped newline) or the next link, whichever is first.
+    In a table row whose first cell is the link, it is the first following
+    cell with text instead. Each character is scanned a constant number of
+    times.
+    """
+    next_newline = -1
+    next_escaped = -1
+    matches = _MARKDOWN_LINK.finditer(content)
+    current = next(matches, None)
+
+    while current is not None:
+        following = next(matches, None)
+        end = current.end()
+
+        if next_newline != len(content) and next_newline < end:
+            next_newline = content.find('\n', end)
+            if next_newline == -1:
+                next_newline = len(content)
+        if next_escaped != len(content) and next_escaped < end:
+            next_escaped = content.find('\\n', end)
+            if next_escaped == -1:
+                next_escaped = len(content)
+
+        limit = min(next_newline, next_escaped)
+        if following is not None:
+            limit = min(limit, following.start())
+
+        rest = content[end:limit].lstrip(' \t')
+        if rest.startswith('|') and _starts_cell(content, current.start()):
+            cells = (cell.strip(' \t\\') for cell in rest.split('|'))
+            description = next((cell for cell in cells if cell not in _EMPTY_CELLS), '')
+            if description:
+                yield current.group(1), current.group(2), description
+        else:
+            dash = content.find('-', end, limit)
+            if dash != -1:
+                description = content[dash + 1:limit].strip()
+                if description:
+                    yield current.group(1), current.group(2), description
+
+        current = following
+
+
+def benchmark(length: int) -> dict:
+    """Feed a record with a `length`-character description one byte at a time."""
+    description = ('An AI tool that writes \\"quoted\\" copy, caf\\u00e9 menus '
+                   'and C:\\\\paths for you. ' * (length // 60 + 1))[:length]
+    while description.endswith('\\'):
+        description = description[:-1]
+    document = ('{"categories": [{"category": "Writing", "tools": [{"name": "Long Tool", '
+                f'"description": "{description}", "link": "https://long.example.com"}}]}}]}}')
+    expected = recover_tool_records(document)
+
+    start = time.perf_counter()
+    parser = RecordStreamParser()
+    records = []
+    for character in document:
+        records.extend(parser.feed(character))
+    records.extend(parser.feed('', final=True))
+    seconds = time.perf_counter() - start
+
+    return {
+        'length': len(description),
+        'seconds': seconds,
+        'matches': records == expected and len(records) == 1
+                   and records[0]['description'] == decode_string(description)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that long strings fed byte by byte parse in linear time")
+    parser.add_argument('--length', type=int, default=1_000_000, help="characters in the long string")
+    options = parser.parse_args()
+
+    result = benchmark(options.length)
+    print(f"Fed a {result['length']:,}-character string one byte at a time in {result['seconds']:.2f}s")
+    print("✓ Same record as a single feed" if result['matches'] else "✗ Record differs from a single feed")
+
+
+if __name__ == "__main__":
+    main()
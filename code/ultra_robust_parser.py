@@ -8,62 +8,42 @@ import os
 import re
 from typing import List, Dict, Any
 
+from json_repair import repair_truncated_json
+from tool_schema import PARSED_TOOL_SCHEMA, ValidationReport
+from tool_tokenizer import recover_tool_records
+
 def repair_json(json_str: str) -> str:
-    """Attempt to repair truncated/malformed JSON."""
-    # Remove trailing incomplete entries
-    json_str = json_str.strip()
-    
-    # If it ends abruptly, try to close it properly
-    if not json_str.endswith('}'):
-        # Find the last complete object
-        brace_count = 0
-        last_complete_pos = -1
-        
-        for i, char in enumerate(json_str):
-            if char == '{':
-                brace_count += 1
-            elif char == '}':
-                brace_count -= 1
-                if brace_count == 0:
-                    last_complete_pos = i
-        
-        if last_complete_pos > 0:
-            json_str = json_str[:last_complete_pos + 1]
-    
-    return json_str
+    """Attempt to repair truncated/malformed JSON.
+
+    Cuts the document back to its last complete element (tracking strings
+    and escapes, so braces inside descriptions are not counted) and closes
+    the arrays and objects still open there.
+    """
+    return repair_truncated_json(json_str)
 
 def extract_tools_with_regex(content: str, source: str) -> List[Dict[str, Any]]:
-    """Extract tools using regex patterns as a fallback."""
+    """Recover tools from malformed JSON as a fallback.
+
+    Uses the single-pass tokenizer instead of a regex cascade, so broken or
+    truncated input is scanned once in linear time.
+    """
     tools = []
     
-    # Pattern to match tool objects in JSON
-    tool_patterns = [
-        # Basic tool pattern with name, description, link
-        r'"name":\s*"([^"]+)"[^}]*?"description":\s*"([^"]*?)"[^}]*?"link":\s*"([^"]*?)"',
-        # Alternative pattern with category
-        r'"name":\s*"([^"]+)"[^}]*?"description":\s*"([^"]*?)"[^}]*?"link":\s*"([^"]*?)"[^}]*?"category":\s*"([^"]*?)"',
-        # Pattern for category + tools structure
-        r'"category":\s*"([^"]+)"[^}]*?"tools":\s*\[(.*?)\]',
-    ]
-    
-    # Extract using different patterns
-    for pattern in tool_patterns:
-        matches = re.findall(pattern, content, re.DOTALL)
-        for match in matches:
-            if len(match) >= 3:
-                name = match[0].strip()
-                description = match[1].strip() if len(match) > 1 else ""
-                link = match[2].strip() if len(match) > 2 else ""
-                category = match[3].strip() if len(match) > 3 else "Unknown"
-                
-                if name and link and link.startswith('http'):
-                    tools.append({
-                        'name': name,
-                        'description': description,
-                        'link': link,
-                        'category': category,
-                        'source': source
-                    })
+    for record in recover_tool_records(content, name_keys=('name',)):
+        name = str(record.get('name') or '').strip()
+        description = str(record.get('description') or '').strip()
+        link = str(record.get('link') or '').strip()
+        category = record.get('category')
+        category = category.strip() if isinstance(category, str) and category.strip() else 'Unknown'
+        
+        if name and link and link.startswith('http'):
+            tools.append({
+                'name': name,
+                'description': description,
+                'link': link,
+                'category': category,
+                'source': source
+            })
     
     return tools
 
@@ -91,7 +71,9 @@ def extract_from_partial_json(file_path: str, source: str) -> List[Dict[str, Any
                 nested_data = json.loads(repaired_json)
                 tools.extend(extract_from_structured_data(nested_data, source))
             except:
-                # Still failed, use regex extraction
+                pass
+            if not tools:
+                # Still failed or unknown layout, use regex extraction
                 tools.extend(extract_tools_with_regex(raw_content, source))
         
     except Exception as e:
@@ -186,29 +168,10 @@ def validate_and_clean_tool(tool: Dict[str, Any]) -> Dict[str, Any]:
         'source': source
     }
 
-def is_valid_tool(tool: Dict[str, Any]) -> bool:
-    """Check if a tool entry is valid."""
-    # Check required fields
-    name = tool.get('name', '').strip()
-    link = tool.get('link', '').strip()
-    
-    # Must have name and link
-    if not name or not link:
-        return False
-    
-    # Link must be valid URL
-    if not link.startswith(('http://', 'https://')):
-        return False
-    
-    # Name should not be JSON-like
-    if name.startswith(('{', '[', '"')):
-        return False
-    
-    # Name should not be too long (likely a parsing error)
-    if len(name) > 100:
-        return False
-    
-    return True
+def is_valid_tool(tool: Dict[str, Any], report: ValidationReport = None) -> bool:
+    """Check if a tool entry is valid (see tool_schema), counting a rejected
+    one per source and reason in report."""
+    return PARSED_TOOL_SCHEMA.validate(tool, report, 'unknown')
 
 def main():
     """Main extraction function."""
@@ -243,11 +206,12 @@ def main():
     # Clean and validate tools
     cleaned_tools = []
     seen_keys = set()
+    report = ValidationReport()
     
     for tool in all_tools:
         cleaned_tool = validate_and_clean_tool(tool)
         
-        if is_valid_tool(cleaned_tool):
+        if is_valid_tool(cleaned_tool, report):
             # Create unique key for deduplication
             key = f"{cleaned_tool['name'].lower()}|{cleaned_tool['link'].lower()}"
             
@@ -255,6 +219,7 @@ def main():
                 seen_keys.add(key)
                 cleaned_tools.append(cleaned_tool)
     
+    print(f"Validation: {report.summary()}")
     print(f"Tools after cleaning and validation: {len(cleaned_tools)}")
     
     # Create final output
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Shared URL canonicalization for every pipeline stage.
+
+One canonical form for tool links, replacing the per-script clean_url
+helpers that disagreed on trailing slashes, fragments, // prefixes and
+tracking parameters:
+
+    - surrounding whitespace is stripped; scheme-less and //-prefixed
+      links get https
+    - scheme and host are lowercased, internationalized hosts are IDNA
+      encoded, default ports are dropped
+    - fragments and tracking parameters (utm_*, ref, ...) are dropped,
+      other query parameters keep their order
+    - trailing slashes are dropped from the path
+
+canonicalize() also returns the host (without www.) and the registrable
+domain (public suffix plus one label), so a link is parsed once per
+distinct string. The suffixes come from public_suffix_list.dat, the
+publicsuffix.org list as downloaded (refresh it with
+curl -o code/public_suffix_list.dat https://publicsuffix.org/list/public_suffix_list.dat),
+plus the hosting platforms in public_suffix_local.dat that it lacks. Results are kept in a bounded
+LRU cache, keyed by both the input and the canonical URL, so
+canonicalizing an already canonical link is a cache hit.
+
+Usage:
+    python url_canonical.py [--count 1000000] [--distinct 200000]
+"""
+
+import argparse
+import os
+import random
+import re
+import time
+import urllib.parse
+from collections import OrderedDict, namedtuple
+from typing import Iterable, Optional
+
+PUBLIC_SUFFIX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'public_suffix_list.dat')
+LOCAL_SUFFIX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'public_suffix_local.dat')
+
+CACHE_SIZE = 1 << 16
+
+# Query parameters that only track where a visitor came from
+TRACKING_PARAMETERS = frozenset(('ref', 'ref_src', 'referrer', 'fbclid', 'gclid', 'msclkid', 'mc_cid', 'mc_eid'))
+TRACKING_PREFIXES = ('utm_',)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+_SCHEME = re.compile(r'[a-zA-Z][a-zA-Z0-9+.-]*://')
+# Common case parsed without urlsplit: http(s), ASCII host, no credentials
+_SIMPLE_URL = re.compile(r'(https?)://([A-Za-z0-9.-]+)(?::(\d{1,5}))?(/[^?#]*)?(?:\?([^#]*))?(?:#.*)?', re.IGNORECASE)
+
+CanonicalURL = namedtuple('CanonicalURL', ['url', 'host', 'domain', 'path'])
+
+EMPTY_URL = CanonicalURL('', '', '', '')
+
+
+class PublicSuffixList:
+    """Public suffix rules: plain (co.uk), wildcard (*.ck) and exception (!www.ck)."""
+
+    def __init__(self, rules: Iterable[str]):
+        self.rules = set()
+        self.wildcards = set()
+        self.exceptions = set()
+        for rule in rules:
+            rule = rule.strip().lower()
+            if not rule or rule.startswith('//'):
+                continue
+            # Hosts are IDNA encoded before lookup, so the rules are too
+            rule = _encode_host(rule.split()[0])
+            if rule.startswith('!'):
+                self.exceptions.add(rule[1:])
+            elif rule.startswith('*.'):
+                self.wildcards.add(rule[2:])
+            else:
+                self.rules.add(rule)
+
+    @classmethod
+    def load(cls, *file_paths: str) -> 'PublicSuffixList':
+        """Rules of every file, by default the bundled list and the local additions."""
+        lines = []
+        for file_path in file_paths or (PUBLIC_SUFFIX_FILE, LOCAL_SUFFIX_FILE):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                lines.extend(f)
+        return cls(lines)
+
+    def public_suffix(self, host: str) -> str:
+        """Longest public suffix of a lowercase host; the last label if no rule matches."""
+        labels = host.split('.')
+        for start in range(len(labels)):
+            candidate = '.'.join(labels[start:])
+            if candidate in self.exceptions:
+                return '.'.join(labels[start + 1:])
+            if candidate in self.rules:
+                return candidate
+            if start + 1 < len(labels) and '.'.join(labels[start + 1:]) in self.wildcards:
+                return candidate
+        return labels[-1]
+
+    def registrable_domain(self, host: str) -> str:
+        """Public suffix plus one label, e.g. app.jasper.ai -> jasper.ai.
+
+        A host that is itself a public suffix, or an IP address, is returned as is.
+        """
+        host = host.strip('.').lower()
+        if not host or host.replace('.', '').isdigit() or ':' in host:
+            return host
+        suffix = self.public_suffix(host)
+        if suffix == host:
+            return host
+        owner = host[:-len(suffix) - 1].rsplit('.', 1)[-1]
+        return f"{owner}.{suffix}"
+
+
+_default_suffixes: Optional[PublicSuffixList] = None
+
+
+def default_suffixes() -> PublicSuffixList:
+    """The bundled public suffix list, loaded on first use."""
+    global _default_suffixes
+    if _default_suffixes is None:
+        _default_suffixes = PublicSuffixList.load()
+    return _default_suffixes
+
+
+def registrable_domain(host: str) -> str:
+    return default_suffixes().registrable_domain(host)
+
+
+def _is_tracking(parameter: str) -> bool:
+    name = parameter.split('=', 1)[0].lower()
+    return name in TRACKING_PARAMETERS or name.startswith(TRACKING_PREFIXES)
+
+
+def _encode_host(host: str) -> str:
+    if host.isascii():
+        return host
+    try:
+        return host.encode('idna').decode('ascii')
+    except UnicodeError:
+        return host
+
+
+class URLCanonicalizer:
+    """Canonicalizes links, remembering the last cache_size distinct results."""
+
+    def __init__(self, cache_size: int = CACHE_SIZE, suffixes: Optional[PublicSuffixList] = None):
+        self.cache_size = cache_size
+        self.suffixes = suffixes
+        self._cache: OrderedDict = OrderedDict()
+        # Registrable domain per host; hosts repeat across many links
+        self._domains: dict = {}
+        self.hits = 0
+        self.misses = 0
+
+    def canonicalize(self, url: str, source_domain: Optional[str] = None) -> CanonicalURL:
+        """Canonical URL, host and registrable domain of a link.
+
+        A link starting with / is resolved against source_domain when one
+        is given.
+        """
+        if not url:
+            return EMPTY_URL
+        if source_domain and url.startswith('/') and not url.startswith('//'):
+            url = urllib.parse.urljoin(f"https://{source_domain}", url)
+
+        cache = self._cache
+        result = cache.get(url)
+        if result is not None:
+            self.hits += 1
+            try:
+                cache.move_to_end(url)
+            except KeyError:
+                # Evicted by another thread of a stage pipeline since the get
+                pass
+            return result
+
+        self.misses += 1
+        result = self._parse(url)
+        cache[url] = result
+        if result.url != url:
+            cache[result.url] = result
+        while len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return result
+
+    def _parse(self, url: str) -> CanonicalURL:
+        url = url.strip()
+        if not url:
+            return EMPTY_URL
+        if url.startswith('//'):
+            url = f"https:{url}"
+        elif not _SCHEME.match(url):
+            url = f"https://{url}"
+
+        match = _SIMPLE_URL.fullmatch(url)
+        if match and (match.group(3) is None or int(match.group(3)) <= 65535):
+            scheme, host, port, path, query = match.groups()
+            scheme = scheme.lower()
+            host = host.lower().rstrip('.')
+            netloc = host
+            if port and int(port) != DEFAULT_PORTS[scheme]:
+                netloc = f"{host}:{int(port)}"
+        else:
+            try:
+                parts = urllib.parse.urlsplit(url)
+                host = parts.hostname or ''
+                port = parts.port
+            except ValueError:
+                # Unparseable (e.g. a bad port): keep the text, without a domain
+                return CanonicalURL(url, '', '', '')
+
+            scheme = parts.scheme.lower()
+            host = _encode_host(host.rstrip('.'))
+            netloc = host
+            if ':' in host:
+                netloc = f"[{host}]"
+            if port is not None and port != DEFAULT_PORTS.get(scheme):
+                netloc = f"{netloc}:{port}"
+            if parts.username:
+                credentials = parts.username if parts.password is None else f"{parts.username}:{parts.password}"
+                netloc = f"{credentials}@{netloc}"
+            path, query = parts.path, parts.query
+
+        path = path.rstrip('/') if path else ''
+        if query:
+            query = '&'.join(parameter for parameter in query.split('&') if parameter and not _is_tracking(parameter))
+
+        canonical = f"{scheme}://{netloc}{path}"
+        if query:
+            canonical = f"{canonical}?{query}"
+
+        domain = self._domains.get(host)
+        if domain is None:
+            if len(self._domains) >= self.cache_size:
+                self._domains.clear()
+            domain = self._domains[host] = (self.suffixes or default_suffixes()).registrable_domain(host)
+        short_host = host[4:] if host.startswith('www.') else host
+        return CanonicalURL(canonical, short_host, domain, path)
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return f"URL cache: {self.hits} hits, {self.misses} misses ({rate:.0%} hit rate)"
+
+
+_default_canonicalizer = URLCanonicalizer()
+
+
+def canonicalize(url: str, source_domain: Optional[str] = None) -> CanonicalURL:
+    """Canonical URL, host and registrable domain of a link (shared cache)."""
+    return _default_canonicalizer.canonicalize(url, source_domain)
+
+
+def clean_url(url: str, source_domain: Optional[str] = None) -> str:
+    """Canonical form of a link"""
+    return _default_canonicalizer.canonicalize(url, source_domain).url
+
+
+def extract_domain(url: str) -> str:
+    """Host of a link without www., e.g. for logo lookups"""
+    return _default_canonicalizer.canonicalize(url).host
+
+
+def benchmark(count: int, distinct: int, cache_size: int = CACHE_SIZE, seed: int = 0) -> dict:
+    """Canonicalize `count` generated links drawn from `distinct` different ones."""
+    rng = random.Random(seed)
+    hosts = [f"{rng.choice(('', 'www.', 'app.', 'WWW.'))}tool{i}.{rng.choice(('ai', 'com', 'io', 'co.uk'))}"
+             for i in range(max(1, distinct // 4))]
+    suffixes = ('', '/', '/pricing', '?utm_source=list&id=3', '#features', '/docs/?ref=producthunt')
+    pool = [f"{rng.choice(('https://', 'http://', '//', ''))}{rng.choice(hosts)}{rng.choice(suffixes)}"
+            for _ in range(distinct)]
+    urls = [rng.choice(pool) for _ in range(count)]
+
+    canonicalizer = URLCanonicalizer(cache_size)
+    start = time.perf_counter()
+    for url in urls:
+        canonicalizer.canonicalize(url)
+    elapsed = time.perf_counter() - start
+    return {
+        'count': count,
+        'distinct': distinct,
+        'seconds': elapsed,
+        'urls_per_second': count / elapsed if elapsed else float('inf'),
+        'summary': canonicalizer.summary()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark URL canonicalization throughput")
+    parser.add_argument('--count', type=int, default=1_000_000, help="links to canonicalize")
+    parser.add_argument('--distinct', type=int, default=200_000, help="distinct links among them")
+    parser.add_argument('--cache-size', type=int, default=CACHE_SIZE, help="LRU cache entries")
+    options = parser.parse_args()
+
+    result = benchmark(options.count, options.distinct, options.cache_size)
+    print(f"Canonicalized {result['count']:,} links ({result['distinct']:,} distinct) "
+          f"in {result['seconds']:.2f}s: {result['urls_per_second']:,.0f} links/s")
+    print(result['summary'])
+
+
+if __name__ == "__main__":
+    main()
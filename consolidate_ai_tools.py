@@ -4,17 +4,62 @@ AI Tools Data Consolidation Script
 Consolidates and curates exactly 1,000 AI tools from multiple JSON files.
 """
 
+import argparse
+import glob
+import heapq
 import json
+import os
 import re
-import urllib.parse
+import sys
+import zlib
 from collections import defaultdict
-from typing import Dict, List, Any, Set, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from operator import attrgetter, itemgetter
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Set, Tuple
 import logging
 
+from tool_record import ToolRecord
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'code'))
+from category_classifier import CategoryClassifier
+from domain_blocking import blocking_key
+from duplicate_clusters import cluster_labels, golden_records, near_duplicate_pairs
+from external_sort import ExternalSorter, write_shards
+from keyword_categorizer import BATCH_SIZE as CATEGORIZE_BATCH_SIZE, CategoryRule, KeywordCategorizer
+from near_duplicates import (PLACEHOLDER_DESCRIPTIONS, NearDuplicateIndex, confirm_candidates, earlier_candidates, iter_near_unique,
+                             keep_first_of_duplicates, link_site)
+from parallel_extraction import default_workers
+from parse_cache import ParseCache, add_cache_argument, file_digest
+from popularity_scoring import default_scorer
+from raw_content_stream import iter_json_array
+from stage_pipeline import Pipeline
+from tool_registry import REGISTRY_FILE, ToolRegistry
+from tool_selection import EVEN_SHARE, select_top
+from url_canonical import clean_url
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Number of tools in the final dataset
+TARGET_TOOLS = 1000
+
+# Source datasets, in merge order
+SOURCE_FILES = [
+    'data/primary_github_tools.json',
+    'data/directory_sites_tools.json',
+    'data/additional_github_tools.json',
+    'data/blog_review_tools.json',
+    'data/remaining_github_tools.json'
+]
+
+# Shards per worker in sharded mode, so one slow shard does not hold up the rest
+SHARDS_PER_WORKER = 4
+# Tools per near-duplicate confirmation task in sharded mode
+CONFIRM_CHUNK_SIZE = 2000
+
+
 # Define standard categories mapping
 CATEGORY_MAPPING = {
     # Artificial Intelligence
@@ -92,6 +137,7 @@ CATEGORY_MAPPING = {
     # Writing
     'writing': 'Writing',
     'writing assistant': 'Writing',
+    'copywriting': 'Writing',
     'text': 'Writing',
     'translation & transcript': 'Writing',
     
@@ -139,33 +185,6 @@ CATEGORY_MAPPING = {
     'general ai tools': 'Artificial Intelligence',
 }
 
-def clean_url(url: str) -> str:
-    """Clean and normalize URL"""
-    if not url:
-        return ""
-    
-    url = url.strip()
-    if not url.startswith(('http://', 'https://')):
-        url = 'https://' + url
-    
-    # Remove trailing slashes and fragments
-    url = url.rstrip('/')
-    if '#' in url:
-        url = url.split('#')[0]
-    
-    return url
-
-def extract_domain(url: str) -> str:
-    """Extract domain from URL"""
-    try:
-        parsed = urllib.parse.urlparse(url)
-        domain = parsed.netloc.lower()
-        if domain.startswith('www.'):
-            domain = domain[4:]
-        return domain
-    except:
-        return ""
-
 def clean_text(text: str) -> str:
     """Clean and normalize text"""
     if not text:
@@ -177,98 +196,85 @@ def clean_text(text: str) -> str:
     
     return text
 
+# Keyword groups matched in the name and description, in priority order,
+# when the source category has no mapping
+KEYWORD_CATEGORIES = [
+    ('Artificial Intelligence', ['ai', 'artificial intelligence', 'machine learning', 'deep learning', 'neural', 'llm', 'gpt', 'chatbot', 'assistant']),
+    ('Developer Tools', ['code', 'programming', 'developer', 'api', 'github', 'framework', 'sdk', 'scraping']),
+    ('Design', ['design', 'image', 'art', 'logo', 'creative', 'visual', 'photo', 'graphic']),
+    ('Writing', ['writing', 'text', 'content', 'blog', 'essay', 'copy']),
+    ('Marketing', ['marketing', 'seo', 'advertising', 'campaign', 'promotion']),
+]
+
+DEFAULT_CATEGORY = 'Productivity'
+
+# Mapping keys found in the source category come first, then the keyword groups
+CATEGORY_RULES = (
+    [CategoryRule((key,), mapped_category, ('category',)) for key, mapped_category in CATEGORY_MAPPING.items()]
+    + [CategoryRule(keywords, category, ('name', 'description')) for category, keywords in KEYWORD_CATEGORIES]
+)
+
+CATEGORIZER = KeywordCategorizer(CATEGORY_RULES, default=DEFAULT_CATEGORY, exact_categories=CATEGORY_MAPPING)
+
+# Trained with: python code/category_classifier.py train --output data/category_model.json
+CATEGORY_MODEL_FILE = 'data/category_model.json'
+CATEGORIZERS = ('rules', 'model', 'hybrid')
+
+def build_categorizer(mode: str = 'rules', model_file: str = CATEGORY_MODEL_FILE) -> Any:
+    """Categorizer for consolidation: the keyword rules, the trained classifier,
+    or the rules with the classifier for tools no rule matches (hybrid)"""
+    if mode == 'rules':
+        return CATEGORIZER
+    classifier = CategoryClassifier.load(model_file)
+    if mode == 'model':
+        return classifier
+    if mode == 'hybrid':
+        return KeywordCategorizer(CATEGORY_RULES, default=DEFAULT_CATEGORY,
+                                  exact_categories=CATEGORY_MAPPING, fallback=classifier)
+    raise ValueError(f"Unknown categorizer: {mode}")
+
 def categorize_tool(tool: Dict[str, Any]) -> str:
     """Categorize tool based on existing category and description"""
-    
-    # Get existing category
-    category = tool.get('category', '')
-    if isinstance(category, list):
-        category = ', '.join(category) if category else ''
-    
-    category = category.lower().strip()
-    
-    # Check direct mapping
-    if category in CATEGORY_MAPPING:
-        return CATEGORY_MAPPING[category]
-    
-    # Check for partial matches in category
-    for key, mapped_category in CATEGORY_MAPPING.items():
-        if key in category:
-            return mapped_category
-    
-    # Check description for keywords
-    description = tool.get('description', '').lower()
-    name = tool.get('name', '').lower()
-    
-    # AI and ML keywords
-    ai_keywords = ['ai', 'artificial intelligence', 'machine learning', 'deep learning', 'neural', 'llm', 'gpt', 'chatbot', 'assistant']
-    if any(keyword in description or keyword in name for keyword in ai_keywords):
-        return 'Artificial Intelligence'
-    
-    # Development keywords
-    dev_keywords = ['code', 'programming', 'developer', 'api', 'github', 'framework', 'sdk']
-    if any(keyword in description or keyword in name for keyword in dev_keywords):
-        return 'Developer Tools'
-    
-    # Design keywords
-    design_keywords = ['design', 'image', 'art', 'logo', 'creative', 'visual', 'photo', 'graphic']
-    if any(keyword in description or keyword in name for keyword in design_keywords):
-        return 'Design'
-    
-    # Writing keywords
-    writing_keywords = ['writing', 'text', 'content', 'blog', 'essay', 'copy']
-    if any(keyword in description or keyword in name for keyword in writing_keywords):
-        return 'Writing'
-    
-    # Marketing keywords
-    marketing_keywords = ['marketing', 'seo', 'advertising', 'campaign', 'promotion']
-    if any(keyword in description or keyword in name for keyword in marketing_keywords):
-        return 'Marketing'
-    
-    # Default category
-    return 'Productivity'
+    return CATEGORIZER.categorize(tool)
+
+# Reclassifications reviewed when the rules moved to whole-word matching
+RECLASSIFICATIONS_FILE = 'data/category_reclassifications.json'
+
+def check_reclassifications(reviewed_file: str = RECLASSIFICATIONS_FILE) -> int:
+    """Categorize every source tool with the rules, by whole words and by
+    substrings (as categorize_tool matched before), and log the tools whose
+    category differs. Tools with a placeholder description, which only a
+    substring hit like 'ai' in "available" ever categorized, and the
+    reviewed reclassifications in reviewed_file are expected; returns the
+    number of unexpected ones"""
+    with open(reviewed_file, 'r', encoding='utf-8') as f:
+        reviewed = {(item['name'], item['from'], item['to']) for item in json.load(f)['reclassifications']}
+    
+    tools = [{'name': fields[0], 'description': fields[1], 'link': fields[2], 'category': fields[3]}
+             for filepath in SOURCE_FILES for fields in load_source_tools(filepath)]
+    changed = placeholders = 0
+    unexpected = []
+    for tool, category in zip(tools, CATEGORIZER.categorize_many(tools)):
+        previous = CATEGORIZER.substring_categorize(tool)
+        if previous == category:
+            continue
+        changed += 1
+        if tool['description'].lower().strip() in PLACEHOLDER_DESCRIPTIONS:
+            placeholders += 1
+        elif (tool['name'], previous, category) not in reviewed:
+            unexpected.append((tool['name'], previous, category))
+    
+    for name, previous, category in unexpected:
+        logger.warning(f"Unreviewed reclassification: {name}: {previous} -> {category}")
+    logger.info(f"{changed} of {len(tools)} source tools reclassified: {placeholders} with placeholder "
+                f"descriptions, {changed - placeholders - len(unexpected)} reviewed, {len(unexpected)} unexpected")
+    print("✓ Only expected reclassifications" if not unexpected
+          else f"✗ {len(unexpected)} unreviewed reclassifications (see {reviewed_file})")
+    return len(unexpected)
 
 def calculate_popularity_score(tool: Dict[str, Any]) -> float:
-    """Calculate popularity score for tool prioritization"""
-    score = 0.0
-    
-    # Base score for having required fields
-    if tool.get('name'):
-        score += 1.0
-    if tool.get('description'):
-        score += 1.0
-    if tool.get('link'):
-        score += 1.0
-    
-    # Bonus for description quality
-    description = tool.get('description', '')
-    if len(description) > 50:
-        score += 0.5
-    if len(description) > 100:
-        score += 0.5
-    
-    # Bonus for well-known domains
-    popular_domains = [
-        'openai.com', 'anthropic.com', 'google.com', 'microsoft.com', 
-        'adobe.com', 'notion.so', 'canva.com', 'figma.com', 'slack.com',
-        'github.com', 'huggingface.co', 'chatgpt.com', 'claude.ai'
-    ]
-    
-    url = tool.get('link', '')
-    domain = extract_domain(url)
-    if any(popular in domain for popular in popular_domains):
-        score += 2.0
-    
-    # Bonus for certain categories
-    category = tool.get('category', '')
-    if 'AI' in category or 'Artificial Intelligence' in category:
-        score += 0.5
-    
-    # Penalty for missing or poor quality data
-    if not description or len(description) < 20:
-        score -= 0.5
-    
-    return max(0.0, score)
+    """Calculate popularity score for tool prioritization (0-10, see code/popularity_scoring.py)"""
+    return default_scorer().score_many([tool])[0]
 
 def load_json_file(filepath: str) -> Dict[str, Any]:
     """Load JSON file with error handling"""
@@ -279,120 +285,436 @@ def load_json_file(filepath: str) -> Dict[str, Any]:
         logger.error(f"Error loading {filepath}: {e}")
         return {"tools": [], "metadata": {}}
 
-def consolidate_ai_tools():
-    """Main function to consolidate AI tools data"""
-    
-    logger.info("Starting AI tools data consolidation...")
+def normalize_source_tool(tool: Dict[str, Any], filepath: str, position: int, digest: str) -> Optional[Tuple]:
+    """ToolRecord field tuple (name, description, link, category, source,
+    position, digest) for the source tool at `position` in its file, whose
+    contents have the given digest, or None if it has no name or link"""
+    name = clean_text(tool.get('name', ''))
+    link = clean_url(tool.get('link', tool.get('website', tool.get('url', ''))))
+    
+    if name and link:
+        description = clean_text(tool.get('description', tool.get('title', '')))
+        return (name, description, link, tool.get('category', ''), filepath, position, digest)
+    return None
+
+def load_source_tools(filepath: str) -> List[Tuple]:
+    """Load one source file and normalize its tools into ToolRecord field tuples,
+    which the parse cache can store."""
+    data = load_json_file(filepath)
+    tools = data.get('tools', [])
+    digest = file_digest(filepath) if tools else ''
+    
+    normalized_tools = []
+    for position, tool in enumerate(tools):
+        fields = normalize_source_tool(tool, filepath, position, digest)
+        if fields:
+            normalized_tools.append(fields)
+    
+    return normalized_tools
+
+def iter_source_tools(filepath: str, digest: Optional[str] = None) -> Iterator[Tuple]:
+    """Stream one source file's tools as ToolRecord field tuples, reading it in
+    chunks so the whole file is never held in memory (digest is the file's,
+    when the caller already has it)"""
+    try:
+        if digest is None:
+            digest = file_digest(filepath)
+        for position, tool in enumerate(iter_json_array(filepath, 'tools')):
+            fields = normalize_source_tool(tool, filepath, position, digest)
+            if fields:
+                yield fields
+    except Exception as e:
+        logger.error(f"Error loading {filepath}: {e}")
+
+def tool_identifier(tool: ToolRecord) -> str:
+    """Exact dedup key; app.jasper.ai and jasper.ai share the block jasper.ai"""
+    return f"{tool.name.lower().strip()}|{tool.block}"
+
+def count_listing_sources(tools: Iterable[ToolRecord]) -> Dict[str, int]:
+    """Number of distinct sources listing each tool identifier"""
+    source_bits: Dict[str, int] = {}
+    masks: Dict[str, int] = defaultdict(int)
+    for tool in tools:
+        bit = source_bits.setdefault(tool.source, 1 << len(source_bits))
+        masks[tool_identifier(tool)] |= bit
+    return {identifier: bin(mask).count('1') for identifier, mask in masks.items()}
+
+def iter_unique_tools(tools: Iterable[ToolRecord], seen_tools: Set[str]) -> Iterator[ToolRecord]:
+    """Drop tools whose name was already seen in the same domain block"""
+    for tool in tools:
+        identifier = tool_identifier(tool)
+        
+        if identifier not in seen_tools:
+            seen_tools.add(identifier)
+            yield tool
+
+def cluster_duplicates(tools: List[ToolRecord], fuzzy_dedup: bool = True) -> List[ToolRecord]:
+    """Merge every cluster of duplicates into one golden record
+    
+    Tools with the same name and domain block are duplicates, and with
+    fuzzy_dedup so are near-duplicates; duplicates of duplicates join the
+    same cluster (see duplicate_clusters). Each golden record has the
+    earliest listing's name and link, the best-scored description, the union
+    of the categories, and one listing per distinct source.
+    """
+    pairs = near_duplicate_pairs(tools) if fuzzy_dedup else ()
+    labels = cluster_labels(len(tools), [map(tool_identifier, tools)], pairs)
+    
+    golden_tools = []
+    for record in golden_records(tools, labels):
+        tool = ToolRecord(record['name'], record['description'], record['link'], record['categories'],
+                          record['sources'][0])
+        tool.listings = len(record['sources'])
+        golden_tools.append(tool)
+    return golden_tools
+
+def iter_enhanced_tools(tools: Iterable[ToolRecord], category_counts: Dict[str, int],
+                        categorizer: Any = CATEGORIZER,
+                        listings: Optional[Dict[str, int]] = None) -> Iterator[ToolRecord]:
+    """Categorize and score tools, counting them per category
+    
+    listings maps tool identifiers to the number of sources listing them
+    (count_listing_sources), for the popularity score.
+    """
+    batch = []
+    for tool in tools:
+        batch.append(tool)
+        if len(batch) >= CATEGORIZE_BATCH_SIZE:
+            yield from _enhance_batch(batch, category_counts, categorizer, listings)
+            batch = []
+    if batch:
+        yield from _enhance_batch(batch, category_counts, categorizer, listings)
+
+def _enhance_batch(batch: List[ToolRecord], category_counts: Dict[str, int],
+                   categorizer: Any, listings: Optional[Dict[str, int]]) -> List[ToolRecord]:
+    # One automaton pass (or sparse matrix product) categorizes the whole batch
+    for tool, category in zip(batch, categorizer.categorize_many(batch)):
+        tool.set_category(category)
+        category_counts[tool.category] += 1
+        if listings:
+            tool.listings = listings.get(tool_identifier(tool), 1)
+    
+    # Score the batch in one call; logo, screenshot and featured derive from it on output
+    return default_scorer().rescore(batch)
+
+def select_diverse_tools(enhanced_tools: Iterable[Any], limit: int = TARGET_TOOLS,
+                         max_per_category: Optional[int] = None,
+                         key: Any = attrgetter('popularity_score'), category: Any = attrgetter('category')) -> List[Any]:
+    """Pick the final tools: the best of every category first, then the best of the rest
+    
+    Every category gets an even share of `limit` (at least one tool), and
+    no category gets more than max_per_category. Works on a stream: only
+    about 2 * limit tools are held, in bounded heaps (see tool_selection).
+    """
+    return select_top(enhanced_tools, limit, key=key, category=category,
+                      min_per_category=EVEN_SHARE, max_per_category=max_per_category)
+
+def iter_ranked(tools: Iterable[ToolRecord], ranking: ExternalSorter) -> Iterator[ToolRecord]:
+    """Pass tools through, adding each one's output form to the full ranking"""
+    for tool in tools:
+        ranking.add(tool.to_output(0))
+        yield tool
+
+def write_ranking(ranking: ExternalSorter, directory: str) -> List[str]:
+    """Write every ranked tool, best first, as numbered JSON shards with ranks as ids"""
+    for stale_shard in glob.glob(os.path.join(directory, 'ranking_*.json')):
+        os.remove(stale_shard)
     
-    # Load all JSON files
-    files = [
-        'data/primary_github_tools.json',
-        'data/directory_sites_tools.json', 
-        'data/additional_github_tools.json',
-        'data/blog_review_tools.json',
-        'data/remaining_github_tools.json'
-    ]
-    
-    all_tools = []
-    source_stats = {}
+    def iter_numbered() -> Iterator[Dict[str, Any]]:
+        for rank, tool in enumerate(ranking, 1):
+            tool['id'] = rank
+            yield tool
     
+    return write_shards(iter_numbered(), directory, prefix='ranking')
+
+def merge_into_registry(registry: ToolRegistry, files: List[str], categorizer: Any) -> Dict[str, int]:
+    """Merge every changed source file into the registry; unchanged ones are skipped"""
     for filepath in files:
-        logger.info(f"Loading {filepath}...")
-        data = load_json_file(filepath)
-        tools = data.get('tools', [])
-        
-        # Normalize tool data structure
-        normalized_tools = []
-        for tool in tools:
-            normalized_tool = {
-                'name': clean_text(tool.get('name', '')),
-                'description': clean_text(tool.get('description', tool.get('title', ''))),
-                'link': clean_url(tool.get('link', tool.get('website', tool.get('url', '')))),
-                'category': tool.get('category', ''),
-                'source': filepath,
-                'original_data': tool
-            }
-            
-            if normalized_tool['name'] and normalized_tool['link']:
-                normalized_tools.append(normalized_tool)
-        
-        all_tools.extend(normalized_tools)
-        source_stats[filepath] = len(normalized_tools)
-        logger.info(f"Loaded {len(normalized_tools)} tools from {filepath}")
-    
-    logger.info(f"Total tools loaded: {len(all_tools)}")
+        if not os.path.isfile(filepath):
+            logger.error(f"Error loading {filepath}: no such file")
+            continue
+        digest = file_digest(filepath)
+        if registry.source_digest(filepath) == digest:
+            logger.info(f"{filepath} unchanged since the last merge, skipped")
+            continue
+        result = registry.merge(filepath, (ToolRecord(*fields) for fields in iter_source_tools(filepath, digest)),
+                                categorizer, digest)
+        logger.info(f"Merged {result.tools} tools from {filepath} in {result.seconds:.2f}s: "
+                    f"{result.added} new, {result.matched} already registered")
+    return registry.source_counts()
+
+def iter_registry_records(registry: ToolRegistry) -> Iterator[ToolRecord]:
+    """Registered tools as records, with their stored category, listings and score"""
+    for tool in registry.iter_tools():
+        record = ToolRecord(tool['name'], tool['description'], tool['link'], tool['category'], tool['source'],
+                            domain=tool['domain'])
+        record.listings = tool['listings']
+        record.popularity_score = tool['popularity_score']
+        yield record
+
+def shard_of(fields: Tuple, shards: int) -> int:
+    """Shard for a normalized tool: a hash of its domain block, so exact
+    duplicates and every source listing of a tool land in the same shard"""
+    return zlib.crc32(blocking_key(fields[2]).encode('utf-8')) % shards
+
+@lru_cache(maxsize=None)
+def _worker_categorizer(mode: str) -> Any:
+    return build_categorizer(mode)
+
+def map_shard(shard: List[Tuple[int, Tuple]], categorizer: str, fuzzy_dedup: bool) -> List[Tuple]:
+    """Map step of sharded consolidation, run in a worker process
+    
+    Takes (position, fields) pairs in load order and returns one row per
+    tool left after exact dedup: (position, category, popularity score,
+    listings, name signature, description signature, name bands,
+    description bands, link site), the last five only with fuzzy_dedup.
+    Listings and exact duplicates never cross shards, so both come out as
+    in the single-process path.
+    """
+    records = [ToolRecord(*fields) for _, fields in shard]
+    position_of = {id(record): position for record, (position, _) in zip(records, shard)}
+    listings = count_listing_sources(records)
+    unique_tools = list(iter_unique_tools(records, set()))
+    positions = [position_of[id(tool)] for tool in unique_tools]
     
-    # Remove duplicates based on name and domain
-    seen_tools = set()
-    unique_tools = []
+    category_counts = defaultdict(int)
+    enhanced_tools = iter_enhanced_tools(unique_tools, category_counts, _worker_categorizer(categorizer), listings)
+    index = NearDuplicateIndex() if fuzzy_dedup else None
+    rows = []
+    for position, tool in zip(positions, enhanced_tools):
+        if index is not None:
+            signatures = index.signatures(tool.name, tool.description)
+            near_duplicate_keys = signatures + index.bands(*signatures) + (link_site(tool.link),)
+        else:
+            near_duplicate_keys = (None, None, None, None, None)
+        rows.append((position, tool.category, tool.popularity_score, tool.listings) + near_duplicate_keys)
+    return rows
+
+_confirm_state: Dict[str, Any] = {}
+
+def _init_confirm(signatures: List[Tuple], candidates: List[List[int]], sites: List[Tuple[str, str]]):
+    _confirm_state['index'] = NearDuplicateIndex()
+    _confirm_state['signatures'] = signatures
+    _confirm_state['candidates'] = candidates
+    _confirm_state['sites'] = sites
+
+def _confirm_chunk(start: int, stop: int) -> List[List[int]]:
+    return confirm_candidates(_confirm_state['index'], _confirm_state['signatures'],
+                              _confirm_state['candidates'], range(start, stop), _confirm_state['sites'])
+
+def reduce_near_duplicates(rows: List[Tuple], workers: int) -> List[Tuple]:
+    """Drop near-duplicate rows with the same verdicts as iter_near_unique
+    
+    Candidate pairs come from one pass over the precomputed LSH bands; the
+    similarity checks, the expensive part, run across the workers; a last
+    in-order pass keeps a row unless it matches an earlier kept one.
+    """
+    signatures = [(row[4], row[5]) for row in rows]
+    sites = [row[8] for row in rows]
+    candidates = earlier_candidates(NearDuplicateIndex(), ((row[6], row[7]) for row in rows))
+    bounds = [(start, min(start + CONFIRM_CHUNK_SIZE, len(rows))) for start in range(0, len(rows), CONFIRM_CHUNK_SIZE)]
+    if workers > 1 and len(bounds) > 1:
+        # Forked workers inherit the signatures instead of receiving them per task
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_confirm,
+                                 initargs=(signatures, candidates, sites)) as pool:
+            chunks = list(pool.map(_confirm_chunk, *zip(*bounds)))
+    else:
+        _init_confirm(signatures, candidates, sites)
+        chunks = [_confirm_chunk(start, stop) for start, stop in bounds]
+        _confirm_state.clear()
+    confirmed = [matches for chunk in chunks for matches in chunk]
+    return [row for row, kept in zip(rows, keep_first_of_duplicates(confirmed)) if kept]
+
+def record_from_row(all_fields: List[Tuple], row: Tuple) -> ToolRecord:
+    """The ToolRecord of a sharded-mode row, with its category and score"""
+    tool = ToolRecord(*all_fields[row[0]])
+    tool.set_category(row[1])
+    tool.popularity_score = row[2]
+    tool.listings = row[3]
+    return tool
+
+def consolidate_sharded(normalized_tools: List[Tuple], workers: int, categorizer: str,
+                        fuzzy_dedup: bool) -> List[Tuple]:
+    """Dedup, categorize and score normalized tools across worker processes
+    
+    Tools are hash-partitioned by domain block; each shard is deduplicated,
+    categorized, scored and MinHashed in a worker (map), then the shards'
+    rows are merged back into load order and near-duplicates are dropped
+    across shards (reduce). Returns the surviving rows in load order.
+    """
+    shards = max(1, workers * SHARDS_PER_WORKER)
+    partitions: List[List[Tuple[int, Tuple]]] = [[] for _ in range(shards)]
+    for position, fields in enumerate(normalized_tools):
+        partitions[shard_of(fields, shards)].append((position, fields))
+    partitions = [partition for partition in partitions if partition]
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        shard_rows = list(pool.map(map_shard, partitions, [categorizer] * len(partitions),
+                                   [fuzzy_dedup] * len(partitions)))
+    # Rows are sorted by position within a shard, and positions are unique
+    rows = list(heapq.merge(*shard_rows))
+    if fuzzy_dedup:
+        rows = reduce_near_duplicates(rows, workers)
+    return rows
+
+def consolidate_ai_tools(use_cache: bool = True, stream: bool = False, limit: int = TARGET_TOOLS,
+                         fuzzy_dedup: bool = True, categorizer: str = 'rules',
+                         max_per_category: Optional[int] = None, ranking_dir: Optional[str] = None,
+                         workers: int = 1, pipeline: bool = False, registry_path: Optional[str] = None,
+                         cluster: bool = False):
+    """Main function to consolidate AI tools data
+    
+    With stream=True the sources are read in chunks and loading,
+    normalization, deduplication, categorization and scoring run as one
+    generator chain into the bounded-heap selection. Only the dedup keys and
+    the selection heaps stay in memory, so peak memory follows
+    `limit` rather than the size of the sources. The parse cache is not
+    used in that mode, since it stores whole files, and the sources are
+    read twice: first to count the sources listing each tool.
+    
+    With pipeline=True (stream mode), the steps of that chain run as
+    stages in their own threads, connected by bounded queues (see
+    stage_pipeline), and a per-stage throughput report is logged. Selection
+    needs every tool before it can finish, so writing the output still
+    starts after the last stage.
+    
+    Exact duplicates (same name and domain block) are dropped first; with
+    fuzzy_dedup, near-duplicate names and descriptions from different
+    sources ("Jasper", "Jasper AI") are dropped as well. With cluster=True
+    (whole-load mode, one process), duplicates are merged into golden
+    records instead of dropped (see cluster_duplicates).
+    
+    categorizer picks how tools are categorized (see build_categorizer);
+    max_per_category caps how many tools one category may contribute.
+    
+    With ranking_dir, every unique tool is also ranked by popularity with
+    an external merge sort and written there as JSON shards, so the full
+    ranking is not limited by memory either.
+    
+    With workers > 1 (whole-load mode only), everything after loading runs
+    as a map-reduce across that many processes (see consolidate_sharded),
+    with the same output as a single process.
+    
+    With registry_path, the sources are merged into a persistent SQLite
+    registry (see tool_registry) instead of deduplicated from scratch:
+    sources unchanged since their last merge are skipped, a changed one
+    costs time in proportion to its own size, and the final tools are
+    selected from everything registered so far.
+    """
     
-    for tool in all_tools:
-        # Create a unique identifier
-        name_clean = tool['name'].lower().strip()
-        domain = extract_domain(tool['link'])
-        identifier = f"{name_clean}|{domain}"
-        
-        if identifier not in seen_tools:
-            seen_tools.add(identifier)
-            unique_tools.append(tool)
+    logger.info("Starting AI tools data consolidation...")
     
-    logger.info(f"After deduplication: {len(unique_tools)} unique tools")
+    # Load all JSON files
+    files = SOURCE_FILES
     
-    # Categorize and enhance tools
-    enhanced_tools = []
+    source_stats = {}
+    seen_tools = set()
+    near_duplicates = NearDuplicateIndex()
     category_counts = defaultdict(int)
-    
-    for tool in unique_tools:
-        # Categorize tool
-        tool['category'] = categorize_tool(tool)
-        category_counts[tool['category']] += 1
+    tool_categorizer = build_categorizer(categorizer)
+    ranking = ExternalSorter(key=itemgetter('popularity_score'), reverse=True) if ranking_dir else None
+    
+    def iter_deduplicated(tools: Iterable[ToolRecord]) -> Iterator[ToolRecord]:
+        unique_tools = iter_unique_tools(tools, seen_tools)
+        return iter_near_unique(unique_tools, near_duplicates) if fuzzy_dedup else unique_tools
+    
+    def select_final(enhanced_tools: Iterable[ToolRecord]) -> List[ToolRecord]:
+        if ranking is not None:
+            enhanced_tools = iter_ranked(enhanced_tools, ranking)
+        return select_diverse_tools(enhanced_tools, limit, max_per_category)
+    
+    if registry_path:
+        with ToolRegistry(registry_path, fuzzy=fuzzy_dedup) as registry:
+            source_stats = merge_into_registry(registry, files, tool_categorizer)
+            logger.info(f"Registry {registry_path}: {len(registry)} unique tools")
+            category_counts.update(registry.category_counts())
+            final_tools = select_final(iter_registry_records(registry))
+    elif stream:
+        def iter_all_tools() -> Iterator[ToolRecord]:
+            for filepath in files:
+                logger.info(f"Streaming {filepath}...")
+                source_stats[filepath] = 0
+                for fields in iter_source_tools(filepath):
+                    source_stats[filepath] += 1
+                    yield ToolRecord(*fields)
+                logger.info(f"Loaded {source_stats[filepath]} tools from {filepath}")
         
-        # Calculate popularity score
-        tool['popularity_score'] = calculate_popularity_score(tool)
+        # A first pass counts the sources listing each tool, keeping only the keys
+        listings = count_listing_sources(ToolRecord(*fields) for filepath in files
+                                         for fields in iter_source_tools(filepath))
         
-        # Add metadata fields
-        domain = extract_domain(tool['link'])
-        tool['logo_url'] = f"https://logo.clearbit.com/{domain}" if domain else ""
-        tool['screenshot_url'] = f"https://image.thum.io/get/fullpage/{tool['link']}" if tool['link'] else ""
-        tool['featured'] = tool['popularity_score'] >= 3.0
+        if pipeline:
+            stages = [
+                ('dedup', iter_deduplicated),
+                ('enhance', lambda tools: iter_enhanced_tools(tools, category_counts, tool_categorizer, listings))
+            ]
+            if ranking is not None:
+                stages.append(('rank', lambda tools: iter_ranked(tools, ranking)))
+            runner = Pipeline(stages)
+            final_tools = select_diverse_tools(runner.run(iter_all_tools(), 'parse', 'select'), limit, max_per_category)
+            for line in runner.report():
+                logger.info(line)
+        else:
+            final_tools = select_final(iter_enhanced_tools(iter_deduplicated(iter_all_tools()), category_counts,
+                                                           tool_categorizer, listings))
         
-        enhanced_tools.append(tool)
-    
-    # Sort by popularity score and select top 1000
-    enhanced_tools.sort(key=lambda x: x['popularity_score'], reverse=True)
-    
-    # Ensure category diversity - take top tools from each category
-    final_tools = []
-    tools_by_category = defaultdict(list)
-    
-    for tool in enhanced_tools:
-        tools_by_category[tool['category']].append(tool)
-    
-    # Calculate how many tools per category to ensure diversity
-    target_categories = list(tools_by_category.keys())
-    min_per_category = max(1, 1000 // len(target_categories))
-    
-    # First pass: ensure minimum representation per category
-    for category in target_categories:
-        category_tools = tools_by_category[category][:min_per_category]
-        final_tools.extend(category_tools)
-    
-    # Second pass: fill remaining slots with highest scoring tools
-    remaining_slots = 1000 - len(final_tools)
-    used_tools = set(tool['name'] + tool['link'] for tool in final_tools)
-    
-    remaining_tools = [
-        tool for tool in enhanced_tools 
-        if (tool['name'] + tool['link']) not in used_tools
-    ]
-    
-    final_tools.extend(remaining_tools[:remaining_slots])
-    
-    # Ensure exactly 1000 tools
-    final_tools = final_tools[:1000]
+        logger.info(f"Total tools loaded: {sum(source_stats.values())}")
+        logger.info(f"After deduplication: {sum(category_counts.values())} unique tools")
+    else:
+        all_fields = []
+        cache = ParseCache(enabled=use_cache)
+        
+        for filepath in files:
+            logger.info(f"Loading {filepath}...")
+            if os.path.isfile(filepath):
+                # Unchanged source files are served from the parse cache
+                normalized_tools = cache.load_or_parse(filepath, load_source_tools)
+            else:
+                normalized_tools = load_source_tools(filepath)
+            
+            all_fields.extend(normalized_tools)
+            source_stats[filepath] = len(normalized_tools)
+            logger.info(f"Loaded {len(normalized_tools)} tools from {filepath}")
+        
+        logger.info(f"Total tools loaded: {len(all_fields)}")
+        logger.info(cache.summary())
+        
+        if workers > 1:
+            # Map over domain shards in the workers, reduce near-duplicates across them
+            rows = consolidate_sharded(all_fields, workers, categorizer, fuzzy_dedup)
+            logger.info(f"After deduplication: {len(rows)} unique tools")
+            for row in rows:
+                category_counts[row[1]] += 1
+            
+            if ranking is not None:
+                final_tools = select_final(record_from_row(all_fields, row) for row in rows)
+            else:
+                # Only the selected rows are turned back into records
+                selected_rows = select_diverse_tools(rows, limit, max_per_category, key=itemgetter(2), category=itemgetter(1))
+                final_tools = [record_from_row(all_fields, row) for row in selected_rows]
+        else:
+            all_tools = [ToolRecord(*fields) for fields in all_fields]
+            
+            if cluster:
+                # Golden records count their own listings
+                listings = None
+                unique_tools = cluster_duplicates(all_tools, fuzzy_dedup)
+            else:
+                # Remove duplicates based on name and domain, then near-duplicates
+                listings = count_listing_sources(all_tools)
+                unique_tools = list(iter_deduplicated(all_tools))
+            logger.info(f"After deduplication: {len(unique_tools)} unique tools")
+            
+            # Categorize and enhance tools, then keep the best per category and overall
+            enhanced_tools = iter_enhanced_tools(unique_tools, category_counts, tool_categorizer, listings)
+            final_tools = select_final(enhanced_tools)
     
     logger.info(f"Final dataset: {len(final_tools)} tools")
     
+    if ranking is not None:
+        shards = write_ranking(ranking, ranking_dir)
+        logger.info(f"Full ranking of {ranking.count} tools written to {len(shards)} shards in {ranking_dir}")
+    
     # Create final dataset structure
     final_dataset = {
         "metadata": {
@@ -403,7 +725,7 @@ def consolidate_ai_tools():
             "total_tools": len(final_tools),
             "source_files": files,
             "source_statistics": source_stats,
-            "categories": list(set(tool['category'] for tool in final_tools)),
+            "categories": list(set(tool.category for tool in final_tools)),
             "curation_criteria": [
                 "Tool popularity and recognition",
                 "Diversity across categories", 
@@ -417,19 +739,7 @@ def consolidate_ai_tools():
     
     # Format final tools
     for i, tool in enumerate(final_tools, 1):
-        formatted_tool = {
-            "id": i,
-            "name": tool['name'],
-            "description": tool['description'],
-            "link": tool['link'],
-            "category": tool['category'],
-            "logo_url": tool['logo_url'],
-            "screenshot_url": tool['screenshot_url'],
-            "featured": tool['featured'],
-            "popularity_score": round(tool['popularity_score'], 2),
-            "source": tool['source']
-        }
-        final_dataset['tools'].append(formatted_tool)
+        final_dataset['tools'].append(tool.to_output(i))
     
     # Save final dataset
     output_file = 'data/aiverse_tools_final.json'
@@ -554,4 +864,48 @@ def generate_report(dataset: Dict[str, Any], source_stats: Dict[str, int], categ
     logger.info("Consolidation report saved to data/consolidation_report.md")
 
 if __name__ == "__main__":
-    consolidate_ai_tools()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Consolidate the curated AI tools dataset")
+    add_cache_argument(parser)
+    parser.add_argument('--stream', action='store_true',
+                        help="stream the sources with memory bounded by --limit instead of loading them whole")
+    parser.add_argument('--limit', type=int, default=TARGET_TOOLS,
+                        help=f"number of tools in the final dataset (default {TARGET_TOOLS})")
+    parser.add_argument('--exact-dedup', action='store_true',
+                        help="only drop exact name and domain duplicates, not near-duplicates")
+    parser.add_argument('--categorizer', choices=CATEGORIZERS, default='rules',
+                        help="keyword rules, the trained classifier in data/category_model.json, "
+                             "or rules with the classifier for unmatched tools (default rules)")
+    parser.add_argument('--max-per-category', type=int,
+                        help="most tools any one category may contribute (default no cap)")
+    parser.add_argument('--ranking-dir',
+                        help="also write every unique tool, ranked by popularity, as JSON shards in this directory")
+    parser.add_argument('--workers', type=int, default=1,
+                        help=f"shard dedup, categorization and scoring across this many processes "
+                             f"(this machine: {default_workers()}; 1 runs in-process)")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="run the --stream steps as threaded stages connected by bounded queues "
+                             "and log each stage's throughput (implies --stream)")
+    parser.add_argument('--registry', nargs='?', const=REGISTRY_FILE,
+                        help=f"merge the sources into this SQLite tool registry and select from it, "
+                             f"skipping sources unchanged since their last merge (default {REGISTRY_FILE})")
+    parser.add_argument('--cluster', action='store_true',
+                        help="merge each cluster of duplicates into one golden record instead of keeping the first")
+    parser.add_argument('--check-categories', action='store_true',
+                        help=f"compare the keyword rules' categories of every source tool with substring "
+                             f"matching, and exit 1 on changes not reviewed in {RECLASSIFICATIONS_FILE}")
+    options = parser.parse_args()
+    if options.check_categories:
+        sys.exit(1 if check_reclassifications() else 0)
+    options.stream = options.stream or options.pipeline
+    if options.stream and options.workers > 1:
+        parser.error("--workers applies to whole-load mode, not --stream or --pipeline")
+    if options.cluster and (options.stream or options.workers > 1 or options.registry):
+        parser.error("--cluster applies to whole-load mode in one process")
+    if options.registry and (options.stream or options.workers > 1):
+        parser.error("--registry merges the sources itself; it cannot be combined with --stream, "
+                     "--pipeline or --workers")
+    consolidate_ai_tools(use_cache=not options.no_cache, stream=options.stream, limit=options.limit,
+                         fuzzy_dedup=not options.exact_dedup, categorizer=options.categorizer,
+                         max_per_category=options.max_per_category, ranking_dir=options.ranking_dir,
+                         workers=options.workers, pipeline=options.pipeline, registry_path=options.registry,
+                         cluster=options.cluster)
\ No newline at end of file
@@ -7,14 +7,21 @@ user-facing AI tools from various directories.
 """
 
 import json
+import os
 import re
+import sys
 import requests
 from datetime import datetime
 from typing import List, Dict, Any
 import time
-from urllib.parse import urlparse
 import logging
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'code'))
+from popularity_scoring import default_scorer
+from tool_schema import CANONICAL_TOOL_SCHEMA, load_canonical_tools
+from tool_selection import select_top
+from url_canonical import extract_domain
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -571,14 +578,15 @@ class ToolsDatasetEnhancer:
         """Load the current tools dataset."""
         logger.info(f"Loading current dataset from {filepath}")
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.current_tools = data.get('tools', [])
-                logger.info(f"Loaded {len(self.current_tools)} tools from current dataset")
-                
-                # Find the highest ID to continue from
-                if self.current_tools:
-                    self.next_id = max(tool.get('id', 0) for tool in self.current_tools) + 1
+            _, records, report = load_canonical_tools(filepath)
+            self.current_tools = [CANONICAL_TOOL_SCHEMA.to_row(record) for record in records]
+            logger.info(f"Loaded {len(self.current_tools)} tools from current dataset")
+            if report.invalid_total:
+                logger.warning(f"Skipped invalid rows: {report.summary()}")
+            
+            # Find the highest ID to continue from
+            if self.current_tools:
+                self.next_id = max(tool.get('id', 0) for tool in self.current_tools) + 1
                     
         except Exception as e:
             logger.error(f"Error loading current dataset: {e}")
@@ -629,11 +637,8 @@ class ToolsDatasetEnhancer:
 
     def generate_logo_url(self, link: str) -> str:
         """Generate logo URL using Clearbit API."""
-        try:
-            domain = urlparse(link).netloc.replace('www.', '')
-            return f"https://logo.clearbit.com/{domain}"
-        except:
-            return "https://logo.clearbit.com/default.com"
+        domain = extract_domain(link)
+        return f"https://logo.clearbit.com/{domain or 'default.com'}"
 
     def generate_screenshot_url(self, link: str) -> str:
         """Generate screenshot URL using Thum.io API."""
@@ -654,7 +659,7 @@ class ToolsDatasetEnhancer:
                 "logo_url": self.generate_logo_url(tool["link"]),
                 "screenshot_url": self.generate_screenshot_url(tool["link"]),
                 "featured": tool["featured"],
-                "popularity_score": tool["popularity_score"],
+                "curated_score": tool["popularity_score"],
                 "source": "premium_replacement"
             }
             prepared_tools.append(prepared_tool)
@@ -677,7 +682,7 @@ class ToolsDatasetEnhancer:
                 "logo_url": self.generate_logo_url(tool["link"]),
                 "screenshot_url": self.generate_screenshot_url(tool["link"]),
                 "featured": tool["featured"],
-                "popularity_score": tool["popularity_score"],
+                "curated_score": tool["popularity_score"],
                 "source": "additional_replacement"
             }
             prepared_tools.append(prepared_tool)
@@ -696,11 +701,14 @@ class ToolsDatasetEnhancer:
         # Combine all tools
         all_tools = self.current_tools + premium_tools + additional_tools
         
-        # Sort by popularity score (highest first)
-        all_tools.sort(key=lambda x: x.get('popularity_score', 0), reverse=True)
+        # The curated tools' hand-set scores are mapped onto the 0-10 scale;
+        # the current tools keep the scores consolidation gave them
+        default_scorer().rescore(premium_tools + additional_tools)
+        for tool in premium_tools + additional_tools:
+            del tool['curated_score']
         
-        # Take exactly 1000 tools
-        self.enhanced_tools = all_tools[:1000]
+        # Take exactly the 1000 highest scoring tools, best first
+        self.enhanced_tools = select_top(all_tools, 1000)
         
         # Reassign IDs to be sequential
         for i, tool in enumerate(self.enhanced_tools, 1):
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Compact tool record used by the consolidation step.
+
+consolidate_ai_tools used to carry one dict per tool, with the derived keys
+(popularity_score, logo_url, screenshot_url, featured) added to it as it
+went. ToolRecord has fixed slots instead: no per-instance __dict__, and the
+URL fields and the featured flag are computed from the stored fields when
+the tool is written out. category, source, domain and block repeat across
+thousands of tools, so they are interned and every record shares one copy
+of each distinct value.
+
+Records do not keep the source dict they were normalized from; position,
+the tool's index in its source file's tools array, points back to it, and
+original_data re-reads it from the file on demand (load_original_data
+does the same for many records with one pass per file). The pointer is only
+good for the file as it was read, so records also keep the file's SHA-256
+(source_digest, as parse_cache computes it), and a file that no longer
+matches gives no original data instead of another tool's.
+"""
+
+import os
+import sys
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'code'))
+from domain_blocking import blocking_key
+from parse_cache import file_digest
+from raw_content_stream import iter_json_array
+from url_canonical import extract_domain
+
+# On the 0-10 popularity scale (see code/popularity_scoring.py)
+FEATURED_SCORE = 3.9
+
+
+def _intern(value: Any) -> str:
+    if isinstance(value, list):
+        # Multi-category tools are matched on their joined category names
+        value = ', '.join(str(item) for item in value)
+    return sys.intern(value) if isinstance(value, str) else sys.intern(str(value or ''))
+
+
+class ToolRecord:
+    """One tool, from normalization through output."""
+
+    __slots__ = ('name', 'description', 'link', 'category', 'source', 'domain', 'block',
+                 'listings', 'popularity_score', 'position', 'source_digest')
+
+    def __init__(self, name: str, description: str, link: str, category: Any, source: str,
+                 position: Optional[int] = None, source_digest: Optional[str] = None,
+                 domain: Optional[str] = None):
+        self.name = name
+        self.description = description
+        self.link = link
+        self.category = _intern(category)
+        self.source = _intern(source)
+        self.domain = sys.intern(extract_domain(link) if domain is None else domain)
+        # Registrable domain, or host/owner on code hosts (see domain_blocking)
+        self.block = sys.intern(blocking_key(link))
+        # Number of sources listing this tool, counted before deduplication
+        self.listings = 1
+        self.popularity_score = 0.0
+        # Index of the tool in its source file's tools array, or None (e.g. a merged record)
+        self.position = position
+        # SHA-256 of the source file that position points into, or None if unknown
+        self.source_digest = sys.intern(source_digest) if source_digest else None
+
+    def set_category(self, category: str):
+        self.category = _intern(category)
+
+    @property
+    def logo_url(self) -> str:
+        return f"https://logo.clearbit.com/{self.domain}" if self.domain else ""
+
+    @property
+    def screenshot_url(self) -> str:
+        return f"https://image.thum.io/get/fullpage/{self.link}" if self.link else ""
+
+    @property
+    def featured(self) -> bool:
+        return self.popularity_score >= FEATURED_SCORE
+
+    @property
+    def original_data(self) -> Optional[Dict[str, Any]]:
+        """The tool's dict from its source file, re-read on each access; None if the
+        file has changed since the record was made."""
+        if self.position is None:
+            return None
+        return load_original_data([self]).get((self.source, self.position))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dict-style read access, so helpers written for tool dicts accept records."""
+        value = getattr(self, key, None)
+        return default if value is None else value
+
+    def to_output(self, tool_id: int) -> Dict[str, Any]:
+        """The tool as written to aiverse_tools_final.json."""
+        return {
+            "id": tool_id,
+            "name": self.name,
+            "description": self.description,
+            "link": self.link,
+            "category": self.category,
+            "logo_url": self.logo_url,
+            "screenshot_url": self.screenshot_url,
+            "featured": self.featured,
+            "popularity_score": round(self.popularity_score, 2),
+            "source": self.source
+        }
+
+    def __repr__(self) -> str:
+        return f"ToolRecord({self.name!r}, {self.link!r}, category={self.category!r})"
+
+
+def load_original_data(records: Iterable[ToolRecord]) -> Dict[Tuple[str, int], Dict[str, Any]]:
+    """Source dicts of many records, keyed by (source, position), reading each source file once.
+
+    Records whose source_digest no longer matches their file are left out,
+    since their position may now point at another tool.
+    """
+    wanted = defaultdict(set)
+    for record in records:
+        if record.position is not None:
+            wanted[record.source].add((record.position, record.source_digest))
+
+    originals = {}
+    for source, pointers in wanted.items():
+        current = None
+        if any(digest is not None for _, digest in pointers):
+            current = file_digest(source) if os.path.isfile(source) else ''
+        positions = {position for position, digest in pointers if digest is None or digest == current}
+        if not positions:
+            continue
+        last = max(positions)
+        for position, tool in enumerate(iter_json_array(source)):
+            if position in positions:
+                originals[(source, position)] = tool
+            if position >= last:
+                break
+    return originals
@@ -4,15 +4,21 @@ Update Supabase database with 2024-2025 AI tools while preserving featured secti
 This script replaces the tools database with curated 2024-2025 AI tools.
 """
 
-import json
 import os
+import sys
 from supabase import create_client, Client
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'code'))
+from tool_schema import CANONICAL_TOOL_SCHEMA, load_canonical_tools
+
 def load_dataset():
-    """Load the comprehensive 2024-2025 AI tools dataset"""
-    with open('/workspace/aiverse_tools_2024_2025_comprehensive.json', 'r', encoding='utf-8') as f:
-        return json.load(f)
+    """Load and validate the comprehensive 2024-2025 AI tools dataset"""
+    dataset, records, report = load_canonical_tools('/workspace/aiverse_tools_2024_2025_comprehensive.json')
+    if report.invalid_total:
+        print(f"⚠️  Skipped invalid rows: {report.summary()}")
+    dataset['tools'] = [CANONICAL_TOOL_SCHEMA.to_row(record) for record in records]
+    return dataset
 
 def initialize_supabase() -> Client:
     """Initialize Supabase client"""